@@ -2,18 +2,34 @@
 from __future__ import annotations
 
 import logging
+import time
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 
 from .const import (
     DOMAIN,
     CONF_SERIAL_NUMBER,
     CONF_ACCESS_CODE,
     CONF_PASSWORD,
+    CONF_UPDATE_INTERVAL,
+    CONF_STALE_GRACE_PERIOD,
+    CONF_GAS_USAGE,
+    CONF_TRACING,
+    CONF_WRITE_CONFIRMATION,
+    CONF_SKIP_UNCHANGED_WRITES,
+    DEFAULT_STALE_GRACE_PERIOD,
+    DEFAULT_WRITE_CONFIRMATION,
+    HUB,
+    SNAPSHOT_STORAGE_VERSION,
+    VALIDATION_SNAPSHOTS,
+    VALIDATION_SNAPSHOT_TTL,
 )
 from .coordinator import WorcesterWaveDataUpdateCoordinator
+from .gas_usage import WorcesterWaveGasUsage, gas_usage_store
+from .hub import async_get_hub
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,26 +45,104 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data.setdefault(DOMAIN, {})
 
-    # Create data update coordinator
-    coordinator = WorcesterWaveDataUpdateCoordinator(
-        hass,
-        serial_number=entry.data[CONF_SERIAL_NUMBER],
-        access_code=entry.data[CONF_ACCESS_CODE],
-        password=entry.data[CONF_PASSWORD],
-    )
+    # All entries share one hub and its I/O loop
+    hub = async_get_hub(hass)
+    await hub.async_register(entry.entry_id)
+    try:
+        await hub.async_set_tracing(entry.entry_id, entry.options.get(CONF_TRACING, False))
+
+        # Create data update coordinator
+        coordinator = WorcesterWaveDataUpdateCoordinator(
+            hass,
+            serial_number=entry.data[CONF_SERIAL_NUMBER],
+            access_code=entry.data[CONF_ACCESS_CODE],
+            password=entry.data[CONF_PASSWORD],
+            update_interval=entry.options.get(CONF_UPDATE_INTERVAL),
+            stale_grace_period=entry.options.get(
+                CONF_STALE_GRACE_PERIOD, DEFAULT_STALE_GRACE_PERIOD
+            ),
+            snapshot_store=_snapshot_store(hass, entry),
+            io_loop=hub.io_loop,
+            write_confirmation=entry.options.get(
+                CONF_WRITE_CONFIRMATION, DEFAULT_WRITE_CONFIRMATION
+            ),
+            skip_unchanged_writes=entry.options.get(CONF_SKIP_UNCHANGED_WRITES, True),
+        )
+
+        # Start from the config-flow probe's snapshot or the persisted one and
+        # refresh in the background, so setup never waits on the cloud handshake
+        seed = _pop_validation_snapshot(hass, entry)
+        if seed is not None:
+            coordinator.seed_snapshot(seed[1], fetched_at=seed[0])
+            _LOGGER.debug("Entities start from config flow snapshot")
+        elif await coordinator.async_restore_snapshot():
+            _LOGGER.debug("Entities start from restored snapshot")
+
+        # With data to show, the first poll can wait for this entry's phase slot
+        delay = 0.0
+        if coordinator.data:
+            delay = hub.poll_offset(
+                coordinator.serial_number, coordinator.update_interval.total_seconds()
+            )
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh_later(delay), f"{DOMAIN}_first_refresh"
+        )
+
+        # Store coordinator
+        hass.data[DOMAIN][entry.entry_id] = {
+            "coordinator": coordinator,
+        }
+
+        # Daily gas-usage recordings into long-term statistics
+        if entry.options.get(CONF_GAS_USAGE, True):
+            gas_usage = WorcesterWaveGasUsage(hass, entry, coordinator)
+            await gas_usage.async_load()
+            entry.async_on_unload(gas_usage.async_schedule())
+            hass.data[DOMAIN][entry.entry_id]["gas_usage"] = gas_usage
+
+        # Set up platforms
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        # A failed or retried setup must not keep the I/O loop running
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        if await hub.async_unregister(entry.entry_id):
+            hass.data[DOMAIN].pop(HUB, None)
+        raise
+
+    # Reload when options (poll interval, stale grace period, tracing,
+    # write confirmation, gas usage) change
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
-    # Fetch initial data so we have data when entities subscribe
-    await coordinator.async_config_entry_first_refresh()
+    return True
 
-    # Store coordinator
-    hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator,
-    }
 
-    # Set up platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _pop_validation_snapshot(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> tuple[float, dict] | None:
+    """Take the snapshot left by config flow validation, if still fresh."""
+    pending = hass.data[DOMAIN].get(VALIDATION_SNAPSHOTS)
+    if not pending:
+        return None
+    serial_number = str(entry.data[CONF_SERIAL_NUMBER]).replace(" ", "").strip()
+    seed = pending.pop(serial_number, None)
+    if seed is None or time.monotonic() - seed[0] > VALIDATION_SNAPSHOT_TTL:
+        return None
+    return seed
 
-    return True
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot")
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data when a config entry is deleted."""
+    await _snapshot_store(hass, entry).async_remove()
+    await gas_usage_store(hass, entry).async_remove()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -62,4 +156,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         
         hass.data[DOMAIN].pop(entry.entry_id)
 
+        # Last entry out stops the shared I/O loop
+        hub = hass.data[DOMAIN].get(HUB)
+        if hub is not None and await hub.async_unregister(entry.entry_id):
+            hass.data[DOMAIN].pop(HUB)
+
     return unload_ok
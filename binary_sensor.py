@@ -10,6 +10,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorDeviceClass,
 )
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
@@ -133,6 +134,7 @@ async def async_setup_entry(
                 sensor_config,
             )
         )
+    binary_sensors.append(WorcesterWaveStaleBinarySensor(coordinator, config_entry))
     
     async_add_entities(binary_sensors)
 
@@ -239,4 +241,49 @@ class WorcesterWaveBinarySensor(CoordinatorEntity, BinarySensorEntity):
         else:
             attrs["category"] = "system"
             
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class WorcesterWaveStaleBinarySensor(CoordinatorEntity, BinarySensorEntity):
+    """On while the coordinator is serving its last good snapshot."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_icon = "mdi:cloud-alert"
+
+    def __init__(
+        self,
+        coordinator: WorcesterWaveDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+
+        self._serial_number = config_entry.data[CONF_SERIAL_NUMBER]
+        self._attr_name = "Worcester Wave Data Stale"
+        self._attr_unique_id = f"{DOMAIN}_{self._serial_number}_data_stale"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._serial_number)},
+            name="Worcester Bosch Wave Thermostat",
+            manufacturer=MANUFACTURER,
+            model=MODEL,
+            sw_version="1.0",
+        )
+
+    @property
+    def is_on(self) -> bool:
+        """Return true while the data is stale."""
+        return self.coordinator.is_stale
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the snapshot age and grace period."""
+        age = self.coordinator.snapshot_age
+        return {
+            "grace_period": self.coordinator.stale_grace_period,
+            "stale_since_s": round(age) if self.coordinator.is_stale and age is not None else None,
+        }
@@ -7,7 +7,12 @@ import logging
 from typing import Any
 
 from homeassistant.components.climate import ClimateEntity
-from homeassistant.components.climate.const import HVACMode, ClimateEntityFeature, HVACAction
+from homeassistant.components.climate.const import (
+    ATTR_HVAC_MODE,
+    HVACMode,
+    ClimateEntityFeature,
+    HVACAction,
+)
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -142,7 +147,19 @@ class WorcesterWaveClimate(CoordinatorEntity, ClimateEntity):
             return
             
         _LOGGER.debug("Setting target temperature to %s", temperature)
-        
+
+        # A mode change in the same call goes out with the temperature as
+        # one transaction; "off" is itself a temperature, so it stays separate
+        hvac_mode = kwargs.get(ATTR_HVAC_MODE)
+        if hvac_mode in (HVACMode.HEAT, HVACMode.AUTO):
+            try:
+                await self.coordinator.async_set_mode_and_temperature(
+                    HVACMode(hvac_mode).value, temperature
+                )
+            except Exception as err:
+                _LOGGER.error("Failed to set HVAC mode and temperature: %s", err)
+            return
+
         try:
             await self.coordinator.async_set_temperature(temperature)
         except Exception as err:
@@ -207,6 +224,7 @@ class WorcesterWaveClimate(CoordinatorEntity, ClimateEntity):
             "program_remaining": data.get("PMR"),
             "current_time": data.get("CTD"),
             "time_remaining": data.get("CTR"),
+            "active_program": data.get("ACTIVE_PROGRAM"),
             
             # Diagnostic Data
             "reset_status": data.get("RS"),
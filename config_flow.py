@@ -1,11 +1,12 @@
 """Config flow for Worcester Bosch Wave integration."""
 
 import logging
+import time
 import voluptuous as vol
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 
@@ -14,10 +15,23 @@ from .const import (
     CONF_SERIAL_NUMBER,
     CONF_ACCESS_CODE,
     CONF_PASSWORD,
+    CONF_UPDATE_INTERVAL,
+    CONF_STALE_GRACE_PERIOD,
+    CONF_GAS_USAGE,
+    CONF_TRACING,
+    CONF_WRITE_CONFIRMATION,
+    CONF_SKIP_UNCHANGED_WRITES,
+    CONFIRM_ENDPOINT,
+    CONFIRM_STATUS,
+    DEFAULT_STALE_GRACE_PERIOD,
+    DEFAULT_WRITE_CONFIRMATION,
+    UPDATE_INTERVAL,
+    VALIDATION_SNAPSHOTS,
+    VALIDATION_SNAPSHOT_TTL,
+    VALIDATION_TIMEOUT,
     ERROR_CANNOT_CONNECT,
     ERROR_INVALID_AUTH,
 )
-from .worcester_bosch_wave.status import WaveStatus
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,11 +78,14 @@ async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str,
         # Build and use the XMPP client entirely in an executor to avoid blocking the event loop
         import asyncio as _asyncio
         def _sync_probe():
+            # Imported here: the protocol stack is only needed to connect
+            from .worcester_bosch_wave.status import WaveStatus
+
             loop = _asyncio.new_event_loop()
             try:
                 _asyncio.set_event_loop(loop)
                 client = WaveStatus(serial_number, access_code, password)
-                client.update()
+                client.update(timeout=VALIDATION_TIMEOUT)
                 return getattr(client, "data", None), getattr(client, "auth_failed", False)
             finally:
                 try:
@@ -87,12 +104,14 @@ async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str,
 
         _LOGGER.info("Successfully validated Worcester Bosch Wave connection")
 
-        # Return info that you want to store in the config entry
+        # Return info that you want to store in the config entry, plus the
+        # probe's snapshot (kept only once the entry is actually created)
         return {
             "title": f"Worcester Bosch Wave ({serial_number})",
             CONF_SERIAL_NUMBER: serial_number,
             CONF_ACCESS_CODE: access_code,
             CONF_PASSWORD: password,
+            "snapshot": (time.monotonic(), dict(data_result)),
         }
 
     except InvalidAuth:
@@ -105,11 +124,35 @@ async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str,
         raise CannotConnect()
 
 
+def _store_validation_snapshot(
+    hass: HomeAssistant, serial_number: str, snapshot: Tuple[float, dict]
+) -> None:
+    """Hand the probe's snapshot to the new entry so its first refresh does
+    not repeat the uiStatus handshake.
+
+    Entries older than VALIDATION_SNAPSHOT_TTL (never picked up, e.g. the
+    entry failed to set up) are dropped so decrypted status does not linger.
+    """
+    pending = hass.data.setdefault(DOMAIN, {}).setdefault(VALIDATION_SNAPSHOTS, {})
+    now = time.monotonic()
+    for serial in [s for s, (at, _) in pending.items() if now - at > VALIDATION_SNAPSHOT_TTL]:
+        del pending[serial]
+    pending[serial_number] = snapshot
+
+
 class WorcesterWaveConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Worcester Bosch Wave."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return WorcesterWaveOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
@@ -139,7 +182,10 @@ class WorcesterWaveConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # Check if already configured
             await self.async_set_unique_id(user_input[CONF_SERIAL_NUMBER])
             self._abort_if_unique_id_configured()
-            
+
+            _store_validation_snapshot(
+                self.hass, info[CONF_SERIAL_NUMBER], info["snapshot"]
+            )
             return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
@@ -152,3 +198,53 @@ class WorcesterWaveConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "password": "Your user password (4-digit, e.g., 3864)",
             }
         )
+
+
+class WorcesterWaveOptionsFlow(config_entries.OptionsFlow):
+    """Handle Worcester Bosch Wave options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_UPDATE_INTERVAL,
+                    default=options.get(CONF_UPDATE_INTERVAL, UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Optional(
+                    CONF_STALE_GRACE_PERIOD,
+                    default=options.get(
+                        CONF_STALE_GRACE_PERIOD, DEFAULT_STALE_GRACE_PERIOD
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Optional(
+                    CONF_TRACING,
+                    default=options.get(CONF_TRACING, False),
+                ): bool,
+                vol.Optional(
+                    CONF_WRITE_CONFIRMATION,
+                    default=options.get(
+                        CONF_WRITE_CONFIRMATION, DEFAULT_WRITE_CONFIRMATION
+                    ),
+                ): vol.In([CONFIRM_ENDPOINT, CONFIRM_STATUS]),
+                vol.Optional(
+                    CONF_SKIP_UNCHANGED_WRITES,
+                    default=options.get(CONF_SKIP_UNCHANGED_WRITES, True),
+                ): bool,
+                vol.Optional(
+                    CONF_GAS_USAGE,
+                    default=options.get(CONF_GAS_USAGE, True),
+                ): bool,
+            }),
+        )
@@ -7,6 +7,19 @@ CONF_SERIAL_NUMBER = "serial_number"
 CONF_ACCESS_CODE = "access_code"
 CONF_PASSWORD = "password"
 
+# Options
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_STALE_GRACE_PERIOD = "stale_grace_period"
+CONF_TRACING = "opentelemetry_tracing"
+CONF_WRITE_CONFIRMATION = "write_confirmation"
+CONF_GAS_USAGE = "gas_usage"
+CONF_SKIP_UNCHANGED_WRITES = "skip_unchanged_writes"
+
+# Write confirmation: read back only the written endpoints, or all of uiStatus
+CONFIRM_ENDPOINT = "endpoint"
+CONFIRM_STATUS = "status"
+DEFAULT_WRITE_CONFIRMATION = CONFIRM_ENDPOINT
+
 # Device information
 MANUFACTURER = "Worcester Bosch"
 MODEL = "Wave Smart Thermostat"
@@ -14,6 +27,60 @@ MODEL = "Wave Smart Thermostat"
 # Update intervals
 UPDATE_INTERVAL = 30  # seconds
 
+# How long the last good snapshot is served after polls start failing
+DEFAULT_STALE_GRACE_PERIOD = 300  # seconds
+
+# Refresh tiers: (name, endpoint, ttl seconds, merge key).
+# uiStatus carries every live value (IHT, BAI, TSP...) plus slow ones such as
+# BMR/FAH/HED_EN, so it is the fast tier; other endpoints change rarely.
+TIER_LIVE = "live"
+TIER_PROGRAM = "program"
+CACHE_TIERS = [
+    (TIER_LIVE, "/ecus/rrc/uiStatus", UPDATE_INTERVAL, None),
+    (TIER_PROGRAM, "/ecus/rrc/userprogram/activeprogram", 3600, "ACTIVE_PROGRAM"),
+]
+# A tier that returns nothing is retried after its TTL doubled per failure,
+# up to this long, so endpoints a model does not have stop being polled
+TIER_MAX_BACKOFF = 86400  # seconds
+
+# Shared hub (hass.data[DOMAIN][HUB]): one I/O loop for every entry
+HUB = "hub"
+MAX_CONCURRENT_SESSIONS = 4
+POLL_JITTER = 5  # seconds of random spread added to each entry's poll phase
+
+# Config-flow probe: shorter than the 30 s session timeout used for polling
+VALIDATION_TIMEOUT = 10  # seconds
+
+# Snapshots from config-flow validation, keyed by serial number, are handed
+# to the new entry's coordinator if it is set up within VALIDATION_SNAPSHOT_TTL
+VALIDATION_SNAPSHOTS = "validation_snapshots"
+VALIDATION_SNAPSHOT_TTL = 120  # seconds
+
+# Persisted snapshot (restored on startup so entities come up immediately)
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_INTERVAL = 300  # seconds between writes while polling
+SNAPSHOT_SAVE_DELAY = 10  # seconds; coalesces bursts such as write + refresh
+
+# Recent polls kept in memory for the diagnostics download
+POLL_HISTORY_SIZE = 50
+
+# In-memory uiStatus history (24 h at the default interval) and the trailing
+# window the temperature trend is fitted over; shorter spans are too noisy
+HISTORY_CAPACITY = 2880
+TREND_WINDOW = 3600  # seconds
+TREND_MIN_SPAN = 900  # seconds
+
+# Polls that change nothing skip entity updates, but not for longer than
+# this, so runtime, duty-cycle and age sensors keep moving
+NOTIFY_MAX_QUIET = 300  # seconds
+
+# Daily gas-usage recordings: synced once a day at GAS_USAGE_HOUR (local
+# time, minute spread per thermostat) and a few minutes after startup when
+# yesterday is missing; complete days go into long-term statistics
+GAS_USAGE_STORAGE_VERSION = 1
+GAS_USAGE_HOUR = 1
+GAS_USAGE_STARTUP_DELAY = 120  # seconds
+
 # Error messages
 ERROR_CANNOT_CONNECT = "cannot_connect"
 ERROR_INVALID_AUTH = "invalid_auth"
@@ -4,19 +4,41 @@ Data update coordinator for Worcester Bosch Wave thermostat.
 
 import asyncio
 import logging
-from datetime import timedelta
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .const import (
+    CACHE_TIERS,
+    CONFIRM_ENDPOINT,
+    DEFAULT_STALE_GRACE_PERIOD,
+    DEFAULT_WRITE_CONFIRMATION,
+    HISTORY_CAPACITY,
+    NOTIFY_MAX_QUIET,
+    POLL_HISTORY_SIZE,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_SAVE_INTERVAL,
+    TIER_LIVE,
+    TIER_MAX_BACKOFF,
+    TREND_MIN_SPAN,
+    TREND_WINDOW,
+)
+from .worcester_bosch_wave import tracing
+from .worcester_bosch_wave.cache import CacheTier, TieredCache
+from .worcester_bosch_wave.history import StatusHistory
+from .worcester_bosch_wave.io_loop import WaveIOLoop
+from .worcester_bosch_wave.runtime import ACTIVE_STATES, MAX_GAP, BoilerRuntime
+from .worcester_bosch_wave.transaction import confirmed_status
 from .worcester_bosch_wave.wave_client import WorcesterWaveClient
 
 _LOGGER = logging.getLogger(__name__)
 
-# Update interval - thermostat data doesn't change very frequently
-UPDATE_INTERVAL = timedelta(seconds=30)
-
 
 class WorcesterWaveDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from Worcester Bosch Wave thermostat."""
@@ -27,18 +49,65 @@ class WorcesterWaveDataUpdateCoordinator(DataUpdateCoordinator):
         serial_number: str,
         access_code: str,
         password: str,
+        update_interval: float | None = None,
+        stale_grace_period: float = DEFAULT_STALE_GRACE_PERIOD,
+        snapshot_store: Store | None = None,
+        io_loop: WaveIOLoop | None = None,
+        write_confirmation: str = DEFAULT_WRITE_CONFIRMATION,
+        skip_unchanged_writes: bool = True,
     ) -> None:
         """Initialize the coordinator."""
         self.serial_number = serial_number
         self.access_code = access_code
         self.password = password
+        self._io_loop = io_loop
         self._client = None
-        
+        # How a write is confirmed: read back the written endpoints or all of uiStatus
+        self._write_confirmation = write_confirmation
+        # Whether writes the last uiStatus shows are in place are skipped
+        self._skip_unchanged_writes = skip_unchanged_writes
+        self._cache = TieredCache(
+            (CacheTier(name, path, ttl, key) for name, path, ttl, key in CACHE_TIERS),
+            max_backoff=TIER_MAX_BACKOFF,
+        )
+        if update_interval:
+            self._cache[TIER_LIVE].ttl = float(update_interval)
+
+        # Serve-stale state: the last good snapshot is kept for the grace
+        # period so a short cloud blip does not flap every entity
+        self.stale_grace_period = float(stale_grace_period)
+        self.last_success_at: float | None = None  # monotonic
+        self.last_success: datetime | None = None  # the same moment, UTC
+        self.is_stale = False
+
+        # (unix time, seconds, outcome, error) per poll, for diagnostics
+        self._poll_history: deque = deque(maxlen=POLL_HISTORY_SIZE)
+
+        # uiStatus samples of every successful poll, for trends and diagnostics
+        self.history = StatusHistory(HISTORY_CAPACITY)
+        self._trend: tuple[int, float | None] | None = None
+        # Boiler on-time and duty cycles from BAI, persisted with the snapshot.
+        # Gaps up to two poll intervals are credited, so slow polling still
+        # counts; options changes reload the entry and rebuild it
+        self._runtime_max_gap = max(MAX_GAP, 2 * self._cache[TIER_LIVE].ttl)
+        self.runtime = BoilerRuntime(self._runtime_max_gap)
+
+        # Set when a poll brought nothing new, so entities are not rewritten
+        self._fetch_unchanged = False
+        self._skip_notify = False
+        self._last_notified_at = 0.0
+        self.notifications_skipped = 0
+
+        # Persisted snapshot, throttled to one write per SNAPSHOT_SAVE_INTERVAL
+        self._store = snapshot_store
+        self._last_save_at: float | None = None
+
+        # Poll at the fastest tier's cadence; slower tiers are skipped until due
         super().__init__(
             hass,
             _LOGGER,
             name="Worcester Bosch Wave",
-            update_interval=UPDATE_INTERVAL,
+            update_interval=timedelta(seconds=self._cache.min_ttl),
         )
         try:
             masked_access = access_code[:4] + "…" + access_code[-4:]
@@ -48,42 +117,365 @@ class WorcesterWaveDataUpdateCoordinator(DataUpdateCoordinator):
             "Coordinator init serial=%s access=%s", self.serial_number, masked_access
         )
 
+    @property
+    def snapshot_age(self) -> float | None:
+        """Seconds since the snapshot was last refreshed successfully."""
+        if self.last_success_at is None:
+            return None
+        return round(time.monotonic() - self.last_success_at, 1)
+
+    def _set_last_success(self, at: float) -> None:
+        """Record a successful fetch at monotonic time ``at``."""
+        self.last_success_at = at
+        self.last_success = (
+            dt_util.utcnow() - timedelta(seconds=time.monotonic() - at)
+        ).replace(microsecond=0)
+
+    @property
+    def last_poll_duration(self) -> float | None:
+        """Milliseconds the last thermostat read took, including queueing."""
+        if self._client is None or self._client.last_poll_duration is None:
+            return None
+        return round(self._client.last_poll_duration * 1000)
+
+    @property
+    def poll_success_rate(self) -> float | None:
+        """Percentage of recent thermostat reads that returned data."""
+        return self._client.success_rate if self._client is not None else None
+
+    @property
+    def client(self) -> WorcesterWaveClient:
+        """The thermostat client, created on first use."""
+        if self._client is None:
+            self._client = WorcesterWaveClient(
+                serial_number=self.serial_number,
+                access_code=self.access_code,
+                password=self.password,
+                io_loop=self._io_loop,
+                skip_unchanged_writes=self._skip_unchanged_writes,
+            )
+            _LOGGER.debug("Client created")
+        return self._client
+
+    @property
+    def temperature_trend(self) -> float | None:
+        """Room temperature change in °C/h over the last TREND_WINDOW."""
+        # Computed once per sample, not once per entity read
+        count = self.history.count
+        if self._trend is None or self._trend[0] != count:
+            stats = self.history.window("IHT", TREND_WINDOW)
+            trend = None
+            if stats is not None and stats["slope"] is not None and stats["span"] >= TREND_MIN_SPAN:
+                trend = round(stats["slope"], 2)
+            self._trend = (count, trend)
+        return self._trend[1]
+
+    @property
+    def boiler_on_today(self) -> float:
+        """Minutes the boiler has been on today."""
+        return round(self.runtime.on_today / 60, 1)
+
+    @property
+    def heating_on_today(self) -> float:
+        """Minutes the boiler has been on for central heating today."""
+        return round(self.runtime.today["CH"] / 60, 1)
+
+    @property
+    def hot_water_on_today(self) -> float:
+        """Minutes the boiler has been on for hot water today."""
+        return round(self.runtime.today["HW"] / 60, 1)
+
+    @property
+    def duty_cycle_hour(self) -> float | None:
+        """Percentage of the last hour the boiler was on."""
+        return self.runtime.duty_cycle("hour")
+
+    @property
+    def duty_cycle_day(self) -> float | None:
+        """Percentage of the last 24 hours the boiler was on."""
+        return self.runtime.duty_cycle("day")
+
+    def phase_timing(self, phase: str) -> dict[str, Any] | None:
+        """Rolling p50/p95/max (ms) of one session phase, None before any session."""
+        if self._client is None or phase not in self._client.phase_stats:
+            return None
+        return self._client.phase_stats[phase].summary()
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the persisted snapshot so entities start with known values.
+
+        The restored data is flagged stale until the first live refresh.
+        """
+        if self._store is None:
+            return False
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Could not load stored snapshot: %s", err)
+            return False
+        if stored and stored.get("runtime"):
+            self.runtime = BoilerRuntime.from_dict(stored["runtime"], self._runtime_max_gap)
+        if not stored or not stored.get("data"):
+            return False
+
+        age = max(0.0, time.time() - stored.get("saved_at", 0))
+        self.data = stored["data"]
+        self._set_last_success(time.monotonic() - age)
+        self.is_stale = True
+        _LOGGER.debug("Restored snapshot saved %.0fs ago", age)
+        return True
+
+    def seed_snapshot(self, data: dict[str, Any], fetched_at: float) -> None:
+        """Use a fresh uiStatus payload fetched elsewhere (e.g. config flow validation).
+
+        The live tier counts as fetched at ``fetched_at`` (monotonic), so the
+        first refresh only fetches the remaining tiers.
+        """
+        self._cache.store(TIER_LIVE, dict(data), now=fetched_at)
+        self.data = self._cache.merged()
+        self._set_last_success(fetched_at)
+        self.is_stale = False
+
+    def _snapshot_to_store(self) -> dict[str, Any]:
+        return {
+            "saved_at": time.time() - (self.snapshot_age or 0),
+            "data": self.data,
+            "runtime": self.runtime.as_dict(),
+        }
+
+    def _schedule_snapshot_save(self) -> None:
+        now = time.monotonic()
+        if self._store is None:
+            return
+        if self._last_save_at is not None and now - self._last_save_at < SNAPSHOT_SAVE_INTERVAL:
+            return
+        self._last_save_at = now
+        self._store.async_delay_save(self._snapshot_to_store, SNAPSHOT_SAVE_DELAY)
+
+    async def async_refresh_later(self, delay: float) -> None:
+        """First refresh after ``delay`` seconds, to stagger polls across entries."""
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.async_refresh()
+
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from the thermostat."""
+        """Fetch data, serving the last good snapshot during short outages."""
+        started = time.monotonic()
+        self._skip_notify = False
+        with tracing.span("wave.refresh", serial=self.serial_number) as span:
+            try:
+                data = await self._async_fetch()
+            except UpdateFailed as err:
+                age = self.snapshot_age
+                if self.data and age is not None and age <= self.stale_grace_period:
+                    if not self.is_stale:
+                        _LOGGER.warning(
+                            "Serving stale thermostat data (age %.0fs): %s", age, err
+                        )
+                    self.is_stale = True
+                    self._record_poll(started, "stale", err)
+                    span.set_attribute("outcome", "stale")
+                    return self.data
+                self.is_stale = False
+                self._record_poll(started, "failed", err)
+                raise
+
+            self._record_poll(started, "ok")
+            span.set_attribute("outcome", "ok")
+
+        # Entities already show this data unless the last poll failed, but
+        # runtime sensors move while the boiler is on, and age sensors always
+        self._skip_notify = (
+            self._fetch_unchanged
+            and self.last_update_success
+            and not self.is_stale
+            and data.get("BAI") not in ACTIVE_STATES
+            and time.monotonic() - self._last_notified_at < NOTIFY_MAX_QUIET
+        )
+        if self.is_stale:
+            _LOGGER.info("Thermostat data is fresh again")
+        self.is_stale = False
+        self._set_last_success(time.monotonic())
+        self.history.append(data)
+        self.runtime.update(data.get("BAI"), day=dt_util.now().date().isoformat())
+        # Written lazily after SNAPSHOT_SAVE_DELAY, by which time self.data is set
+        self._schedule_snapshot_save()
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update entities, unless the poll that just finished changed nothing."""
+        if self._skip_notify:
+            self._skip_notify = False
+            self.notifications_skipped += 1
+            return
+        self._last_notified_at = time.monotonic()
+        super().async_update_listeners()
+
+    def _record_poll(self, started: float, outcome: str, error: Exception | None = None) -> None:
+        self._poll_history.append(
+            (time.time(), time.monotonic() - started, outcome, str(error) if error else None)
+        )
+
+    def diagnostics(self) -> dict[str, Any]:
+        """In-memory state for the diagnostics download; nothing is fetched."""
+        now = time.monotonic()
+        client = self._client
+        result: dict[str, Any] = {
+            "last_update_success": self.last_update_success,
+            "is_stale": self.is_stale,
+            "snapshot_age": self.snapshot_age,
+            "stale_grace_period": self.stale_grace_period,
+            "write_confirmation": self._write_confirmation,
+            "skip_unchanged_writes": self._skip_unchanged_writes,
+            "notifications_skipped": self.notifications_skipped,
+            "boiler_runtime": self.runtime.as_dict(),
+            "update_interval": self.update_interval.total_seconds() if self.update_interval else None,
+            "tiers": [
+                {
+                    "name": tier.name,
+                    "path": tier.path,
+                    "ttl": tier.ttl,
+                    "age": round(now - tier.fetched_at, 1) if tier.fetched_at is not None else None,
+                    "failures": tier.failures,
+                    "retry_after": tier.retry_after,
+                }
+                for tier in self._cache.tiers
+            ],
+            "snapshot": self.data,
+            "history": {
+                "samples": len(self.history),
+                "capacity": self.history.capacity,
+                "last_hour": self.history.summary(3600),
+                "last_day": self.history.summary(86400),
+            },
+            "poll_history": [
+                {
+                    "time": datetime.fromtimestamp(at, timezone.utc).isoformat(timespec="seconds"),
+                    "duration_ms": round(duration * 1000),
+                    "outcome": outcome,
+                    "error": error,
+                }
+                for at, duration, outcome, error in self._poll_history
+            ],
+            "client": None,
+        }
+        if client is not None:
+            result["client"] = {
+                "mode": "pooled" if self._io_loop is not None else "executor",
+                "counters": dict(client.counters),
+                "success_rate": client.success_rate,
+                "last_poll_duration_ms": self.last_poll_duration,
+                "last_phases_ms": {k: round(v * 1000, 1) for k, v in client.last_phases.items()},
+                "phase_timings_ms": client.timing_summary(),
+            }
+        if self._io_loop is not None:
+            result["io_loop"] = {
+                "running": self._io_loop.is_running,
+                "active_sessions": self._io_loop.active_sessions,
+                "queued_sessions": self._io_loop.queued_sessions,
+            }
+        return result
+
+    async def _async_fetch(self) -> dict[str, Any]:
+        """Fetch expired tiers from the thermostat and return the merged view."""
         try:
-            if self._client is None:
-                self._client = WorcesterWaveClient(
-                    serial_number=self.serial_number,
-                    access_code=self.access_code,
-                    password=self.password,
-                )
-                _LOGGER.debug("Client created")
-
-            # Get status data
-            _LOGGER.debug("Requesting status update…")
-            status_data = await self._client.get_status()
-            
-            if not status_data:
-                _LOGGER.warning("No data received from thermostat")
-                return {}
-                
-            _LOGGER.debug("Received thermostat data: %s", status_data)
-            return status_data
-            
+            client = self.client
+
+            # Unchanged when every tier fetched repeated its last response
+            # (apart from the thermostat clock)
+            self._fetch_unchanged = False
+            unchanged = True
+            for tier in self._cache.expired():
+                _LOGGER.debug("Refreshing tier %s (%s)…", tier.name, tier.path)
+                if tier.name == TIER_LIVE:
+                    had_value = tier.value is not None
+                    value = await client.get_status()
+                    if not value:
+                        raise UpdateFailed("No data received from thermostat")
+                    unchanged = unchanged and had_value and client.response_unchanged()
+                else:
+                    value = await client.get_endpoint(tier.path)
+                    if value is None:
+                        # Slow tiers are best effort: keep the old value and
+                        # back off, so an endpoint this model lacks is left alone
+                        self._cache.fail(tier.name)
+                        _LOGGER.debug(
+                            "Tier %s returned no data; next try in %d s",
+                            tier.name, tier.retry_after,
+                        )
+                        continue
+                    unchanged = False
+                self._cache.store(tier.name, value)
+            self._fetch_unchanged = unchanged
+
+            data = self._cache.merged()
+            _LOGGER.debug("Received thermostat data: %s", data)
+            return data
+
+        except UpdateFailed:
+            raise
         except Exception as err:
-            _LOGGER.error("Error communicating with thermostat: %s", err)
+            # The coordinator reports UpdateFailed once and logs the recovery
+            _LOGGER.debug("Error communicating with thermostat: %s", err)
             raise UpdateFailed(f"Error communicating with thermostat: {err}") from err
 
+    def _begin_write(self) -> int:
+        """Reset the client's record of acknowledged writes; returns PUTs sent so far."""
+        self.client.last_written.clear()
+        return self.client.counters["writes_sent"]
+
+    async def _async_after_write(self, sent_before: int, success: bool) -> None:
+        """Bring the snapshot in line with what a write changed."""
+        client = self.client
+        written = dict(client.last_written)
+        # Skipped no-op writes changed nothing; a failure that changed
+        # nothing needs no refresh either
+        if client.counters["writes_sent"] == sent_before or (not success and not written):
+            return
+        if (
+            success
+            and self._write_confirmation == CONFIRM_ENDPOINT
+            and await self._async_confirm_endpoints(written)
+        ):
+            return
+        # Trigger immediate update to reflect changes (a partial write that
+        # was rolled back may not have restored everything)
+        self._cache.invalidate(TIER_LIVE)
+        await self.async_request_refresh()
+
+    async def _async_confirm_endpoints(self, written: dict[str, Any]) -> bool:
+        """Read back just the written endpoints and patch them into the snapshot.
+
+        False when that is not enough, e.g. an endpoint did not answer or the
+        new set point follows the clock program, so the caller falls back to a
+        full uiStatus refresh.
+        """
+        live = self._cache[TIER_LIVE].value
+        if not isinstance(live, dict):
+            return False
+        values = await self.client.read_endpoints(list(written))
+        if len(values) != len(written):
+            return False
+        updates = confirmed_status(live, values)
+        if updates is None:
+            return False
+        self._cache.patch(TIER_LIVE, updates)
+        _LOGGER.debug("Confirmed write: %s", updates)
+        self.async_set_updated_data(self._cache.merged())
+        self._schedule_snapshot_save()
+        return True
+
     async def async_set_temperature(self, temperature: float) -> bool:
         """Set target temperature."""
         try:
-            if self._client is None:
-                raise UpdateFailed("Client not initialized")
-                
-            success = await self._client.set_temperature(temperature)
-            if success:
-                # Trigger immediate update to reflect changes
-                await self.async_request_refresh()
+            with tracing.span(
+                "wave.write", serial=self.serial_number, operation="set_temperature",
+                value=temperature,
+            ):
+                sent = self._begin_write()
+                success = await self.client.set_temperature(temperature)
+            await self._async_after_write(sent, success)
             return success
             
         except Exception as err:
@@ -93,21 +485,41 @@ class WorcesterWaveDataUpdateCoordinator(DataUpdateCoordinator):
     async def async_set_mode(self, mode: str) -> bool:
         """Set thermostat mode."""
         try:
-            if self._client is None:
-                raise UpdateFailed("Client not initialized")
-                
-            success = await self._client.set_mode(mode)
-            if success:
-                # Trigger immediate update to reflect changes
-                await self.async_request_refresh()
+            with tracing.span(
+                "wave.write", serial=self.serial_number, operation="set_mode", value=mode
+            ):
+                sent = self._begin_write()
+                success = await self.client.set_mode(mode)
+            await self._async_after_write(sent, success)
             return success
             
         except Exception as err:
             _LOGGER.error("Error setting mode: %s", err)
             raise UpdateFailed(f"Error setting mode: {err}") from err
 
+    async def async_set_mode_and_temperature(self, mode: str, temperature: float) -> bool:
+        """Set mode and target temperature together, rolling back on failure."""
+        try:
+            with tracing.span(
+                "wave.write", serial=self.serial_number,
+                operation="set_mode_and_temperature", value=f"{mode} {temperature}",
+            ):
+                sent = self._begin_write()
+                success = await self.client.set_mode_and_temperature(mode, temperature)
+            await self._async_after_write(sent, success)
+            return success
+
+        except Exception as err:
+            _LOGGER.error("Error setting mode and temperature: %s", err)
+            raise UpdateFailed(f"Error setting mode and temperature: {err}") from err
+
     async def async_shutdown(self) -> None:
         """Clean shutdown of the coordinator."""
+        if self._store is not None and self.data and not self.is_stale:
+            try:
+                await self._store.async_save(self._snapshot_to_store())
+            except Exception as err:
+                _LOGGER.debug("Could not save snapshot on shutdown: %s", err)
         if self._client:
             await self._client.close()
             self._client = None
\ No newline at end of file
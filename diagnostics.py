@@ -0,0 +1,38 @@
+"""
+Diagnostics support for Worcester Bosch Wave.
+Everything comes from the coordinator's in-memory state and ring buffers;
+producing the download never contacts the thermostat.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCESS_CODE, CONF_PASSWORD, CONF_SERIAL_NUMBER, DOMAIN
+
+TO_REDACT = {CONF_SERIAL_NUMBER, CONF_ACCESS_CODE, CONF_PASSWORD, "title"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    gas_usage = hass.data[DOMAIN][entry.entry_id].get("gas_usage")
+
+    return {
+        "entry": async_redact_data(
+            {
+                "title": entry.title,
+                "data": dict(entry.data),
+                "options": dict(entry.options),
+            },
+            TO_REDACT,
+        ),
+        "coordinator": coordinator.diagnostics(),
+        "gas_usage": gas_usage.diagnostics() if gas_usage is not None else None,
+    }
@@ -0,0 +1,260 @@
+"""
+Worcester Bosch Wave entity microbenchmark.
+Builds every entity the sensor, binary_sensor and climate platforms create
+against a fake coordinator, then times full "update all listeners" cycles
+(each entity's state properties evaluated against a fresh uiStatus payload)
+and counts allocations per cycle with tracemalloc.
+
+Run from the Home Assistant config directory, with Home Assistant installed:
+    python -m custom_components.worcester_bosch_wave.entity_benchmark --cycles 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from .binary_sensor import (
+    ALL_BINARY_SENSORS,
+    WorcesterWaveBinarySensor,
+    WorcesterWaveStaleBinarySensor,
+)
+from .climate import WorcesterWaveClimate
+from .const import CONF_ACCESS_CODE, CONF_PASSWORD, CONF_SERIAL_NUMBER, DOMAIN
+from .sensor import (
+    ALL_SENSORS,
+    COORDINATOR_SENSORS,
+    PHASE_SENSORS,
+    RUNTIME_SENSORS,
+    WorcesterWaveCoordinatorSensor,
+    WorcesterWavePhaseSensor,
+    WorcesterWaveSensor,
+)
+from .worcester_bosch_wave.local_gateway import DEFAULT_UI_STATUS
+from .worcester_bosch_wave.stats import percentile
+
+# Properties Home Assistant reads when an entity writes its state
+STATE_PROPERTIES = (
+    "native_value",
+    "is_on",
+    "current_temperature",
+    "target_temperature",
+    "hvac_mode",
+    "hvac_action",
+    "extra_state_attributes",
+    "device_info",
+)
+
+# Values cycled through the payloads so entities see realistic changes
+VARIANTS = {
+    "IHT": ["20.50", "20.60", "20.40", "21.00"],
+    "BAI": ["No", "CH", "CH", "HW"],
+    "UMD": ["clock", "clock", "manual", "clock"],
+    "TOR": ["off", "on", "off", "off"],
+    "DHW": ["on", "on", "off", "on"],
+}
+
+
+class FakeCoordinator:
+    """Just enough of the coordinator for CoordinatorEntity properties."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] | None = None
+        self.last_update_success = True
+        self.is_stale = False
+        self.snapshot_age: float | None = 0.0
+        self.last_success = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.stale_grace_period = 300
+        self.last_poll_duration: float | None = 1200
+        self.poll_success_rate: float | None = 98.0
+        self.temperature_trend: float | None = 0.4
+        self.boiler_on_today = 84.5
+        self.heating_on_today = 61.0
+        self.hot_water_on_today = 23.5
+        self.duty_cycle_hour: float | None = 25.0
+        self.duty_cycle_day: float | None = 12.5
+        self._timing = {"p50": 900.0, "p95": 1400.0, "max": 2100.0, "samples": 100}
+
+    def phase_timing(self, phase: str) -> dict[str, Any] | None:
+        return self._timing
+
+    def async_add_listener(self, update_callback, context=None) -> Callable[[], None]:
+        return lambda: None
+
+
+def build_payloads(count: int) -> list[dict[str, Any]]:
+    """uiStatus payloads as the coordinator would hand them out, one per cycle."""
+    payloads = []
+    for index in range(count):
+        data = copy.deepcopy(DEFAULT_UI_STATUS)
+        for key, values in VARIANTS.items():
+            data[key] = values[index % len(values)]
+        data["CTD"] = f"2025-09-22T18:{index // 60 % 60:02d}:{index % 60:02d}+01:00 Mo"
+        data["ACTIVE_PROGRAM"] = 0
+        payloads.append(data)
+    return payloads
+
+
+def build_entities(coordinator: FakeCoordinator, entries: int = 1) -> list:
+    """Every entity async_setup_entry creates, for ``entries`` thermostats."""
+    entities = []
+    for index in range(entries):
+        config_entry = SimpleNamespace(
+            entry_id=f"bench{index}",
+            data={
+                CONF_SERIAL_NUMBER: f"{100000000 + index}",
+                CONF_ACCESS_CODE: "AbCdEfGhIjKlMnOp",
+                CONF_PASSWORD: "benchmark",
+            },
+        )
+        entities.extend(WorcesterWaveSensor(coordinator, config_entry, c) for c in ALL_SENSORS)
+        entities.extend(
+            WorcesterWaveCoordinatorSensor(coordinator, config_entry, c)
+            for c in COORDINATOR_SENSORS
+        )
+        entities.extend(
+            WorcesterWaveCoordinatorSensor(coordinator, config_entry, c, entity_category=None)
+            for c in RUNTIME_SENSORS
+        )
+        entities.extend(
+            WorcesterWavePhaseSensor(coordinator, config_entry, c) for c in PHASE_SENSORS
+        )
+        entities.extend(
+            WorcesterWaveBinarySensor(coordinator, config_entry, c) for c in ALL_BINARY_SENSORS
+        )
+        entities.append(WorcesterWaveStaleBinarySensor(coordinator, config_entry))
+        entities.append(WorcesterWaveClimate(coordinator, config_entry))
+    return entities
+
+
+def state_readers(entities: list) -> list[tuple[str, list[str]]]:
+    """(class name, property names) per entity, resolved once up front."""
+    readers = []
+    for entity in entities:
+        names = [name for name in STATE_PROPERTIES if hasattr(type(entity), name)]
+        readers.append((type(entity).__name__, names))
+    return readers
+
+
+def run_cycle(entities: list, readers: list, timings: dict[str, float] | None = None) -> list:
+    """Evaluate every state property of every entity once; returns the values."""
+    values = []
+    for entity, (kind, names) in zip(entities, readers):
+        started = time.perf_counter() if timings is not None else 0.0
+        for name in names:
+            values.append(getattr(entity, name))
+        if timings is not None:
+            timings[kind] = timings.get(kind, 0.0) + time.perf_counter() - started
+    return values
+
+
+def run(cycles: int = 1000, entries: int = 1, top: int = 10) -> dict[str, Any]:
+    coordinator = FakeCoordinator()
+    entities = build_entities(coordinator, entries)
+    readers = state_readers(entities)
+    payloads = build_payloads(min(cycles, 240))
+
+    # Warm up lazily built class state before measuring
+    coordinator.data = payloads[0]
+    run_cycle(entities, readers)
+
+    durations = []
+    by_class: dict[str, float] = {}
+    for index in range(cycles):
+        coordinator.data = payloads[index % len(payloads)]
+        started = time.perf_counter()
+        run_cycle(entities, readers)
+        durations.append(time.perf_counter() - started)
+    # Class breakdown in a separate pass so its timer calls do not skew the totals
+    for index in range(cycles):
+        coordinator.data = payloads[index % len(payloads)]
+        run_cycle(entities, readers, by_class)
+
+    # Allocation pass: keep each cycle's values alive, as written states are
+    alloc_cycles = min(cycles, 200)
+    retained = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base_current, _ = tracemalloc.get_traced_memory()
+    for index in range(alloc_cycles):
+        coordinator.data = payloads[index % len(payloads)]
+        retained.append(run_cycle(entities, readers))
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "lineno")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    ms = [d * 1000 for d in durations]
+    return {
+        "entities": len(entities),
+        "properties_per_cycle": sum(len(names) for _, names in readers),
+        "cycles": cycles,
+        "cycle_ms": {
+            "mean": round(sum(ms) / len(ms), 4),
+            "p50": round(percentile(ms, 50), 4),
+            "p95": round(percentile(ms, 95), 4),
+            "max": round(max(ms), 4),
+        },
+        "per_class_us_per_cycle": {
+            kind: round(total / cycles * 1e6, 2)
+            for kind, total in sorted(by_class.items(), key=lambda item: -item[1])
+        },
+        "allocations_per_cycle": {
+            "blocks": round(blocks / alloc_cycles, 1),
+            "bytes": round((current - base_current) / alloc_cycles),
+            "cycles": alloc_cycles,
+            "peak_bytes": peak - base_current,
+        },
+        "top_allocation_sites": [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "blocks_per_cycle": round(stat.count_diff / alloc_cycles, 2),
+                "bytes_per_cycle": round(stat.size_diff / alloc_cycles),
+            }
+            for stat in stats[:top]
+            if stat.count_diff > 0
+        ],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Worcester Bosch Wave entity microbenchmark")
+    parser.add_argument("--cycles", type=int, default=1000, help="Update cycles to time")
+    parser.add_argument("--entries", type=int, default=1, help="Thermostats (config entries)")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to list")
+    parser.add_argument("-o", "--output", help="Also write the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.cycles, args.entries, args.top)
+    cycle = result["cycle_ms"]
+    allocs = result["allocations_per_cycle"]
+    print(f"{DOMAIN}: {result['entities']} entities, "
+          f"{result['properties_per_cycle']} property reads per cycle")
+    print(f"cycle: mean {cycle['mean']:.3f} ms  p50 {cycle['p50']:.3f} ms  "
+          f"p95 {cycle['p95']:.3f} ms  max {cycle['max']:.3f} ms")
+    for kind, micros in result["per_class_us_per_cycle"].items():
+        print(f"  {kind:<36}{micros:>10.1f} us/cycle")
+    print(f"allocations: {allocs['blocks']} blocks, {allocs['bytes']} bytes retained per cycle; "
+          f"peak {allocs['peak_bytes']} bytes over {allocs['cycles']} cycles")
+    for site in result["top_allocation_sites"]:
+        print(f"  {site['site']}: {site['blocks_per_cycle']} blocks, "
+              f"{site['bytes_per_cycle']} bytes per cycle")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
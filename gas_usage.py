@@ -0,0 +1,181 @@
+"""
+Gas-usage recordings for Worcester Bosch Wave.
+Keeps the thermostat's daily gas-usage pages in Home Assistant storage,
+syncs them once a day (usually a single session: the pointer plus the page
+being filled) and imports complete days into long-term statistics as
+external statistics, one per circuit, in one batch per sync.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    GAS_USAGE_HOUR,
+    GAS_USAGE_STARTUP_DELAY,
+    GAS_USAGE_STORAGE_VERSION,
+)
+from .coordinator import WorcesterWaveDataUpdateCoordinator
+from .worcester_bosch_wave.recordings import GasUsageRecordings
+
+_LOGGER = logging.getLogger(__name__)
+
+# (column in a recorded day, statistic suffix, name)
+STATISTICS = (
+    (1, "gas_heating", "Gas used for heating"),
+    (2, "gas_hot_water", "Gas used for hot water"),
+)
+
+
+def gas_usage_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, GAS_USAGE_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.gas_usage")
+
+
+def _local_day(start: datetime | float) -> str:
+    """Local calendar day of a statistics row's start."""
+    if not isinstance(start, datetime):
+        start = dt_util.utc_from_timestamp(start)
+    return dt_util.as_local(start).date().isoformat()
+
+
+class WorcesterWaveGasUsage:
+    """Daily gas-usage sync and statistics import for one thermostat."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: WorcesterWaveDataUpdateCoordinator,
+    ) -> None:
+        self.hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._store = gas_usage_store(hass, entry)
+        self._lock = asyncio.Lock()
+        self.recordings = GasUsageRecordings()
+        self.last_sync: datetime | None = None
+        self.last_imported: dict[str, int] = {}
+
+    async def async_load(self) -> None:
+        try:
+            self.recordings = GasUsageRecordings.from_dict(await self._store.async_load())
+        except Exception as err:
+            _LOGGER.warning("Could not load stored gas usage: %s", err)
+
+    @callback
+    def async_schedule(self) -> Callable[[], None]:
+        """Sync daily, and soon after startup if yesterday is missing; returns the unsubscriber."""
+        serial_number = self._coordinator.serial_number
+        # Spread thermostats over the hour so they do not all sync at once
+        minute = zlib.crc32(serial_number.encode()) % 60
+        unsubscribe = async_track_time_change(
+            self.hass, self._async_scheduled, hour=GAS_USAGE_HOUR, minute=minute, second=0
+        )
+        days = self.recordings.days()
+        yesterday = (dt_util.now().date() - timedelta(days=1)).isoformat()
+        if not days or days[-1][0] < yesterday:
+            self._entry.async_create_background_task(
+                self.hass, self._async_sync_later(GAS_USAGE_STARTUP_DELAY), f"{DOMAIN}_gas_usage"
+            )
+        return unsubscribe
+
+    async def _async_sync_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.async_sync()
+
+    async def _async_scheduled(self, now: datetime) -> None:
+        await self.async_sync()
+
+    async def async_sync(self) -> None:
+        """Read new recordings and import the complete days."""
+        async with self._lock:
+            changed = await self.recordings.sync(self._coordinator.client)
+            if changed is None:
+                _LOGGER.debug("Gas usage pointer unavailable; retrying at the next sync")
+                return
+            self.last_sync = dt_util.utcnow()
+            if changed:
+                _LOGGER.debug("Gas usage: %d day(s) new or changed", len(changed))
+                await self._store.async_save(self.recordings.as_dict())
+            await self._async_import_statistics()
+
+    async def _async_import_statistics(self) -> None:
+        """Add days after each statistic's last row, continuing its sum."""
+        if "recorder" not in self.hass.config.components:
+            return
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+            get_last_statistics,
+        )
+
+        # Today is still being recorded; it is imported tomorrow
+        today = dt_util.now().date().isoformat()
+        days = [row for row in self.recordings.days() if row[0] < today]
+        if not days:
+            return
+        # Statistic ids allow lowercase letters, digits and underscores only
+        serial_number = "".join(c for c in self._coordinator.serial_number.lower() if c.isalnum())
+        for column, suffix, name in STATISTICS:
+            statistic_id = f"{DOMAIN}:{serial_number}_{suffix}"
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+            )
+            total = 0.0
+            after = None
+            if last.get(statistic_id):
+                row = last[statistic_id][0]
+                total = row.get("sum") or 0.0
+                after = _local_day(row["start"])
+
+            statistics = []
+            for day in days:
+                if after is not None and day[0] <= after:
+                    continue
+                total += day[column]
+                statistics.append(
+                    StatisticData(
+                        start=dt_util.start_of_local_day(date.fromisoformat(day[0])),
+                        state=day[column],
+                        sum=total,
+                    )
+                )
+            if not statistics:
+                continue
+            metadata = StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"Worcester Wave {name}",
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            )
+            async_add_external_statistics(self.hass, metadata, statistics)
+            self.last_imported[suffix] = len(statistics)
+            _LOGGER.debug("Imported %d day(s) into %s", len(statistics), statistic_id)
+
+    def diagnostics(self) -> dict[str, Any]:
+        days = self.recordings.days()
+        return {
+            "pointer": self.recordings.pointer,
+            "pages": len(self.recordings.pages),
+            "complete_pages": len(self.recordings.complete),
+            "days": len(days),
+            "first_day": days[0][0] if days else None,
+            "last_day": days[-1][0] if days else None,
+            "last_sync": self.last_sync.isoformat() if self.last_sync else None,
+            "last_imported": self.last_imported,
+        }
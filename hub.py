@@ -0,0 +1,81 @@
+"""
+Shared hub for all Worcester Bosch Wave config entries.
+Owns the single I/O loop every thermostat's client runs on and spreads
+poll phases across serial numbers so entries do not poll in lockstep.
+"""
+
+import logging
+import random
+import zlib
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, HUB, MAX_CONCURRENT_SESSIONS, POLL_JITTER
+from .worcester_bosch_wave import tracing
+from .worcester_bosch_wave.io_loop import WaveIOLoop
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WorcesterWaveHub:
+    """I/O shared by every Wave thermostat on this Home Assistant instance."""
+
+    def __init__(self, hass: HomeAssistant, max_sessions: int = MAX_CONCURRENT_SESSIONS) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.io_loop = WaveIOLoop(max_sessions=max_sessions, name="worcester-wave-io")
+        self._entries: set[str] = set()
+        self._tracing_entries: set[str] = set()
+
+    async def async_register(self, entry_id: str) -> None:
+        """Track a config entry using the hub."""
+        self._entries.add(entry_id)
+        if not self.io_loop.is_running:
+            # start() waits for the loop thread; keep that off the event loop
+            await self.hass.async_add_executor_job(self.io_loop.start)
+
+    async def async_set_tracing(self, entry_id: str, enabled: bool) -> None:
+        """Export OpenTelemetry spans while any entry has tracing enabled.
+
+        Tracing is process-wide, so the hub owns it rather than each entry.
+        """
+        if enabled:
+            self._tracing_entries.add(entry_id)
+        else:
+            self._tracing_entries.discard(entry_id)
+
+        tracer = tracing.get_tracer()
+        if self._tracing_entries and tracer is None:
+            # Importing the OpenTelemetry API touches the filesystem
+            await self.hass.async_add_executor_job(tracing.enable_opentelemetry)
+        elif not self._tracing_entries and isinstance(tracer, tracing.OpenTelemetryTracer):
+            tracing.set_tracer(None)
+
+    async def async_unregister(self, entry_id: str) -> bool:
+        """Stop tracking an entry; returns True once the hub has shut down."""
+        self._entries.discard(entry_id)
+        await self.async_set_tracing(entry_id, False)
+        if self._entries:
+            return False
+        await self.hass.async_add_executor_job(self.io_loop.stop)
+        return True
+
+    @staticmethod
+    def poll_offset(serial_number: str, interval: float) -> float:
+        """Delay before an entry's first poll.
+
+        A stable per-serial phase spreads thermostats across the interval;
+        jitter keeps entries with colliding phases apart.
+        """
+        phase = (zlib.crc32(str(serial_number).encode()) % 1000) / 1000 * interval
+        return phase + random.uniform(0, POLL_JITTER)
+
+
+def async_get_hub(hass: HomeAssistant) -> WorcesterWaveHub:
+    """Return the hub, creating it for the first config entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    hub = domain_data.get(HUB)
+    if hub is None:
+        hub = domain_data[HUB] = WorcesterWaveHub(hass)
+        _LOGGER.debug("Created Worcester Wave hub")
+    return hub
@@ -12,6 +12,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import (
+    EntityCategory,
     UnitOfTemperature,
     UnitOfTime,
     PERCENTAGE,
@@ -168,6 +169,119 @@ DIAGNOSTIC_SENSORS = [
 
 ALL_SENSORS = TEMPERATURE_SENSORS + CONTROL_SENSORS + TIME_SENSORS + DIAGNOSTIC_SENSORS
 
+# Sensors reporting on the coordinator itself rather than on uiStatus keys;
+# "attribute" names the coordinator property that provides the value
+COORDINATOR_SENSORS = [
+    {
+        # A timestamp, so the front end shows the age as it grows; an age
+        # value would only change when the coordinator notifies
+        "attribute": "last_success",
+        "name": "Last Successful Update",
+        "entity_id": "last_success",
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "icon": "mdi:clock-check-outline",
+        "enabled_by_default": False,
+    },
+    {
+        "attribute": "last_poll_duration",
+        "name": "Last Poll Duration",
+        "entity_id": "last_poll_duration",
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "icon": "mdi:timer-sand",
+        "precision": 0,
+        "enabled_by_default": False,
+    },
+    {
+        "attribute": "poll_success_rate",
+        "name": "Poll Success Rate",
+        "entity_id": "poll_success_rate",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": PERCENTAGE,
+        "icon": "mdi:check-network-outline",
+        "precision": 0,
+        "enabled_by_default": False,
+    },
+    {
+        "attribute": "temperature_trend",
+        "name": "Temperature Trend",
+        "entity_id": "temperature_trend",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": "°C/h",
+        "icon": "mdi:chart-line-variant",
+        "precision": 2,
+        "enabled_by_default": False,
+    },
+]
+
+# Boiler runtime accumulated from BAI transitions by the coordinator
+RUNTIME_SENSORS = [
+    {
+        "attribute": "boiler_on_today",
+        "name": "Boiler On Time Today",
+        "entity_id": "boiler_on_today",
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": UnitOfTime.MINUTES,
+        "icon": "mdi:fire",
+        "precision": 0,
+    },
+    {
+        "attribute": "heating_on_today",
+        "name": "Heating On Time Today",
+        "entity_id": "heating_on_today",
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": UnitOfTime.MINUTES,
+        "icon": "mdi:radiator",
+        "precision": 0,
+    },
+    {
+        "attribute": "hot_water_on_today",
+        "name": "Hot Water On Time Today",
+        "entity_id": "hot_water_on_today",
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": UnitOfTime.MINUTES,
+        "icon": "mdi:water-boiler",
+        "precision": 0,
+    },
+    {
+        "attribute": "duty_cycle_hour",
+        "name": "Boiler Duty Cycle 1h",
+        "entity_id": "boiler_duty_cycle_1h",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": PERCENTAGE,
+        "icon": "mdi:percent-circle-outline",
+        "precision": 0,
+    },
+    {
+        "attribute": "duty_cycle_day",
+        "name": "Boiler Duty Cycle 24h",
+        "entity_id": "boiler_duty_cycle_24h",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": PERCENTAGE,
+        "icon": "mdi:percent-circle-outline",
+        "precision": 0,
+    },
+]
+
+# Rolling per-phase session timings from the client; the state is the p95,
+# p50/max/sample count are attributes. All disabled by default.
+PHASE_SENSORS = [
+    {"phase": "queue", "name": "Queue Time"},
+    {"phase": "setup", "name": "Session Setup Time"},
+    {"phase": "dns", "name": "DNS Lookup Time"},
+    {"phase": "connect", "name": "Connect Time"},
+    {"phase": "sasl", "name": "Authentication Time"},
+    {"phase": "session", "name": "Session Start Time"},
+    {"phase": "roster", "name": "Roster Time"},
+    {"phase": "request", "name": "Gateway Response Time"},
+    {"phase": "teardown", "name": "Teardown Time"},
+    {"phase": "total", "name": "Session Time"},
+]
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -187,6 +301,31 @@ async def async_setup_entry(
                 sensor_config,
             )
         )
+    for sensor_config in COORDINATOR_SENSORS:
+        sensors.append(
+            WorcesterWaveCoordinatorSensor(
+                coordinator,
+                config_entry,
+                sensor_config,
+            )
+        )
+    for sensor_config in RUNTIME_SENSORS:
+        sensors.append(
+            WorcesterWaveCoordinatorSensor(
+                coordinator,
+                config_entry,
+                sensor_config,
+                entity_category=None,
+            )
+        )
+    for sensor_config in PHASE_SENSORS:
+        sensors.append(
+            WorcesterWavePhaseSensor(
+                coordinator,
+                config_entry,
+                sensor_config,
+            )
+        )
     
     async_add_entities(sensors)
 
@@ -305,4 +444,107 @@ class WorcesterWaveSensor(CoordinatorEntity, SensorEntity):
         else:
             attrs["category"] = "diagnostic"
             
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class WorcesterWaveCoordinatorSensor(CoordinatorEntity, SensorEntity):
+    """Sensor backed by a coordinator property, diagnostic by default."""
+
+    def __init__(
+        self,
+        coordinator: WorcesterWaveDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        sensor_config: Dict[str, Any],
+        entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        self._attr_entity_category = entity_category
+
+        self._attribute = sensor_config["attribute"]
+        self._serial_number = config_entry.data[CONF_SERIAL_NUMBER]
+
+        self._attr_name = f"Worcester Wave {sensor_config['name']}"
+        self._attr_unique_id = f"{DOMAIN}_{self._serial_number}_{sensor_config['entity_id']}"
+
+        if "device_class" in sensor_config:
+            self._attr_device_class = sensor_config["device_class"]
+        if "state_class" in sensor_config:
+            self._attr_state_class = sensor_config["state_class"]
+        if "unit" in sensor_config:
+            self._attr_native_unit_of_measurement = sensor_config["unit"]
+        if "icon" in sensor_config:
+            self._attr_icon = sensor_config["icon"]
+        if "precision" in sensor_config:
+            self._attr_suggested_display_precision = sensor_config["precision"]
+        if sensor_config.get("enabled_by_default") is False:
+            self._attr_entity_registry_enabled_default = False
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._serial_number)},
+            name="Worcester Bosch Wave Thermostat",
+            manufacturer=MANUFACTURER,
+            model=MODEL,
+            sw_version="1.0",
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """Return the coordinator value."""
+        return getattr(self.coordinator, self._attribute, None)
+
+
+class WorcesterWavePhaseSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor with the rolling p95 of one session phase."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+    _attr_icon = "mdi:timer-cog-outline"
+
+    def __init__(
+        self,
+        coordinator: WorcesterWaveDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        sensor_config: Dict[str, Any],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        self._phase = sensor_config["phase"]
+        self._serial_number = config_entry.data[CONF_SERIAL_NUMBER]
+
+        self._attr_name = f"Worcester Wave {sensor_config['name']}"
+        self._attr_unique_id = f"{DOMAIN}_{self._serial_number}_phase_{self._phase}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._serial_number)},
+            name="Worcester Bosch Wave Thermostat",
+            manufacturer=MANUFACTURER,
+            model=MODEL,
+            sw_version="1.0",
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the rolling p95 in milliseconds."""
+        timing = self.coordinator.phase_timing(self._phase)
+        return timing["p95"] if timing else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return p50, max and the number of sessions in the window."""
+        timing = self.coordinator.phase_timing(self._phase)
+        if not timing:
+            return {}
+        return {"p50": timing["p50"], "max": timing["max"], "samples": timing["samples"]}
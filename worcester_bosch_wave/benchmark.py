@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Worcester Bosch Wave end-to-end latency benchmark.
+Runs the client read and write paths against an in-process LocalWaveGateway
+and records wall-clock time plus the per-phase breakdown of every session.
+
+Usage:
+    python -m worcester_bosch_wave.benchmark run -n 50 -o baseline.json
+    python -m worcester_bosch_wave.benchmark run -n 50 -o candidate.json
+    python -m worcester_bosch_wave.benchmark compare baseline.json candidate.json
+    python -m worcester_bosch_wave.benchmark imports
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess  # nosec B404 - runs this interpreter only
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import tracing
+from .io_loop import WaveIOLoop
+from .local_gateway import LocalWaveGateway, VirtualThermostat
+from .messenger import PHASES
+from .stats import percentile
+from .wave_client import WorcesterWaveClient
+
+BASELINE_VERSION = 1
+
+SERIAL = '100000001'
+ACCESS_CODE = 'AbCdEfGhIjKlMnOp'
+PASSWORD = 'benchmark'
+
+PHASE_NAMES = tuple(phase for phase, _, _ in PHASES) + ('total',)
+
+
+class _RecordingClient(WorcesterWaveClient):
+    """Client that keeps every messenger so its phase marks can be read."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.messengers: list = []
+
+    async def _run_session(self, factory, start):
+        messenger, result = await super()._run_session(factory, start)
+        self.messengers.append(messenger)
+        return messenger, result
+
+
+def _prepare_manual(device: VirtualThermostat) -> None:
+    device.ui_status.update(UMD='manual', TOR='off', TSP=device.ui_status['MMT'])
+
+
+def _prepare_clock(device: VirtualThermostat) -> None:
+    device.ui_status.update(UMD='clock', TOR='off', TSP=device.ui_status['TOT'])
+
+
+# name -> (device setup, operation); operations return truthy on success
+SCENARIOS: Dict[str, tuple] = {
+    'get_status': (_prepare_clock, lambda c: c.get_status()),
+    'set_temperature_manual': (_prepare_manual, lambda c: c.set_temperature(21.5)),
+    'set_temperature_clock': (_prepare_clock, lambda c: c.set_temperature(21.5)),
+    'set_mode': (_prepare_clock, lambda c: c.set_mode('heat')),
+}
+
+
+def summarize(values: Sequence[float]) -> dict:
+    """Stats in milliseconds for a list of durations in seconds."""
+    if not values:
+        return {'n': 0}
+    ms = [v * 1000 for v in values]
+    return {
+        'n': len(ms),
+        'mean': round(sum(ms) / len(ms), 3),
+        'p50': round(percentile(ms, 50), 3),
+        'p95': round(percentile(ms, 95), 3),
+        'min': round(min(ms), 3),
+        'max': round(max(ms), 3),
+    }
+
+
+async def run_scenario(
+    client: _RecordingClient,
+    device: VirtualThermostat,
+    prepare: Callable[[VirtualThermostat], None],
+    operation: Callable[[WorcesterWaveClient], Awaitable],
+    iterations: int,
+    warmup: int,
+) -> dict:
+    """Run one scenario and summarize wall time and summed session phases."""
+    wall: List[float] = []
+    phases: Dict[str, List[float]] = {name: [] for name in PHASE_NAMES}
+    sessions: List[int] = []
+    failures = 0
+
+    for index in range(warmup + iterations):
+        prepare(device)
+        client.messengers = []
+        started = time.perf_counter()
+        ok = await operation(client)
+        elapsed = time.perf_counter() - started
+        if index < warmup:
+            continue
+        if not ok:
+            failures += 1
+            continue
+        wall.append(elapsed)
+        sessions.append(len(client.messengers))
+        # A write is several sessions back to back; charge each phase its sum
+        totals: Dict[str, float] = {}
+        for messenger in client.messengers:
+            for name, value in messenger.phases().items():
+                totals[name] = totals.get(name, 0.0) + value
+        for name in PHASE_NAMES:
+            if name in totals:
+                phases[name].append(totals[name])
+
+    return {
+        'sessions': max(sessions) if sessions else 0,
+        'failures': failures,
+        'wall_ms': summarize(wall),
+        'phases_ms': {name: summarize(values) for name, values in phases.items() if values},
+    }
+
+
+async def run_benchmark(
+    iterations: int = 30,
+    warmup: int = 3,
+    mode: str = 'executor',
+    latency: float = 0.0,
+    scenarios: Optional[Sequence[str]] = None,
+) -> dict:
+    """Run the selected scenarios and return a baseline document."""
+    io_loop = WaveIOLoop(max_sessions=1, name='wave-benchmark-io') if mode == 'pooled' else None
+    results = {}
+    try:
+        async with LocalWaveGateway(latency=latency) as gateway:
+            device = gateway.add_device(SERIAL, ACCESS_CODE, PASSWORD)
+            # Every iteration must send its writes, and the scenarios change the
+            # device behind the client's back, so trust no earlier uiStatus
+            client = _RecordingClient(
+                SERIAL, ACCESS_CODE, PASSWORD,
+                io_loop=io_loop, host=gateway.host, port=gateway.port,
+                skip_unchanged_writes=False,
+            )
+            client.snapshot_max_age = 0
+            for name in scenarios or SCENARIOS:
+                prepare, operation = SCENARIOS[name]
+                results[name] = await run_scenario(
+                    client, device, prepare, operation, iterations, warmup
+                )
+    finally:
+        if io_loop is not None:
+            io_loop.stop()
+
+    try:
+        from importlib.metadata import version
+        slixmpp_version = version('slixmpp')
+    except Exception:
+        slixmpp_version = None
+
+    return {
+        'version': BASELINE_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'slixmpp': slixmpp_version,
+            'platform': platform.platform(),
+        },
+        'config': {
+            'iterations': iterations,
+            'warmup': warmup,
+            'mode': mode,
+            'latency': latency,
+        },
+        'scenarios': results,
+    }
+
+
+def _span_cost(iterations: int) -> float:
+    """Nanoseconds per ``with tracing.span(...)`` beyond an empty loop."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    empty = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with tracing.span('wave.bench', path='/ecus/rrc/uiStatus'):
+            pass
+    return max(0.0, time.perf_counter() - started - empty) / iterations * 1e9
+
+
+async def measure_tracing(iterations: int = 200000, sessions: int = 20) -> dict:
+    """Span cost with tracing off and with an in-memory tracer, per call and per read."""
+    previous = tracing.get_tracer()
+    recorder = tracing.RecordingTracer()
+    try:
+        tracing.set_tracer(None)
+        disabled_ns = _span_cost(iterations)
+        off = await run_benchmark(sessions, 3, scenarios=['get_status'])
+        tracing.set_tracer(recorder)
+        enabled_ns = _span_cost(iterations)
+        recorder.finished.clear()
+        on = await run_benchmark(sessions, 3, scenarios=['get_status'])
+    finally:
+        tracing.set_tracer(previous)
+
+    per_read = len(recorder.finished) / (sessions + 3)
+    return {
+        'disabled_span_ns': round(disabled_ns, 1),
+        'recording_span_ns': round(enabled_ns, 1),
+        'spans_per_read': round(per_read, 1),
+        'span_names': sorted({s.name for s in recorder.finished}),
+        'get_status_p50_ms': {
+            'tracing_off': off['scenarios']['get_status']['wall_ms']['p50'],
+            'recording': on['scenarios']['get_status']['wall_ms']['p50'],
+        },
+    }
+
+
+# Already loaded by Home Assistant before it imports an integration
+IMPORT_PRELOAD = ('asyncio', 'concurrent.futures', 'hashlib', 'json', 'logging')
+# What the integration imports at startup, and the protocol stack the
+# client loads with its first session
+IMPORT_TARGETS = ('wave_client', 'status')
+HEAVY_PACKAGES = ('slixmpp', 'Crypto')
+
+
+def _import_time(module: str, preload: Sequence[str]) -> Tuple[float, List[str]]:
+    """Cumulative ``-X importtime`` of ``module`` in a fresh interpreter, in ms,
+    and which of HEAVY_PACKAGES it pulled in."""
+    code = (
+        f"import {', '.join(preload)}\n" if preload else ''
+    ) + (
+        f"import sys, {module}\n"
+        f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules}} & {set(HEAVY_PACKAGES)!r})))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    proc = subprocess.run(  # nosec B603
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1]) / 1000
+    if cumulative is None:
+        raise RuntimeError(f'no importtime line for {module}')
+    heavy = [name for name in proc.stdout.strip().split(',') if name]
+    return cumulative, heavy
+
+
+def measure_imports(
+    modules: Optional[Sequence[str]] = None,
+    repeat: int = 7,
+    preload: Sequence[str] = IMPORT_PRELOAD,
+) -> dict:
+    """Median import time of each module, each run in a new interpreter."""
+    package = __package__ or 'worcester_bosch_wave'
+    modules = modules or [f'{package}.{name}' for name in IMPORT_TARGETS]
+    results = {}
+    for module in modules:
+        _import_time(module, preload)  # writes the .pyc files
+        samples = []
+        for _ in range(repeat):
+            ms, heavy = _import_time(module, preload)
+            samples.append(ms)
+        results[module] = {
+            'median_ms': round(statistics.median(samples), 1),
+            'min_ms': round(min(samples), 1),
+            'loads': heavy,
+        }
+    return {'preloaded': list(preload), 'repeat': repeat, 'modules': results}
+
+
+def format_report(doc: dict) -> str:
+    config = doc['config']
+    lines = [
+        f"mode={config['mode']} iterations={config['iterations']} latency={config['latency']}s",
+        f"{'scenario':<24}{'metric':<10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}",
+    ]
+    for name, result in doc['scenarios'].items():
+        rows = [('wall', result['wall_ms'])] + list(result['phases_ms'].items())
+        for metric, stats in rows:
+            if not stats.get('n'):
+                continue
+            lines.append(
+                f"{name:<24}{metric:<10}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['max']:>10.2f}"
+            )
+        if result['failures']:
+            lines.append(f"{name:<24}{'failures':<10}{result['failures']:>10}")
+    return '\n'.join(lines)
+
+
+def _change(base: float, new: float) -> str:
+    if not base:
+        return '     n/a'
+    return f'{(new - base) / base * 100:+7.1f}%'
+
+
+def compare(base: dict, new: dict, threshold: float = 10.0) -> tuple:
+    """Diff two baselines on p50/p95.
+
+    Returns (report text, scenarios whose wall-clock p95 regressed by more
+    than ``threshold`` percent).
+    """
+    lines = [
+        f"{'scenario':<24}{'metric':<10}{'p50 base':>10}{'p50 new':>10}{'change':>9}"
+        f"{'p95 base':>10}{'p95 new':>10}{'change':>9}",
+    ]
+    regressions = []
+    for name in base['scenarios']:
+        if name not in new['scenarios']:
+            lines.append(f'{name:<24}missing from new run')
+            continue
+        old_result, new_result = base['scenarios'][name], new['scenarios'][name]
+        metrics = [('wall', old_result['wall_ms'], new_result['wall_ms'])]
+        for phase, stats in old_result['phases_ms'].items():
+            if phase in new_result['phases_ms']:
+                metrics.append((phase, stats, new_result['phases_ms'][phase]))
+        for metric, old, cur in metrics:
+            if not old.get('n') or not cur.get('n'):
+                continue
+            lines.append(
+                f"{name:<24}{metric:<10}"
+                f"{old['p50']:>10.2f}{cur['p50']:>10.2f}{_change(old['p50'], cur['p50']):>9}"
+                f"{old['p95']:>10.2f}{cur['p95']:>10.2f}{_change(old['p95'], cur['p95']):>9}"
+            )
+        old_p95 = old_result['wall_ms'].get('p95')
+        new_p95 = new_result['wall_ms'].get('p95')
+        if old_p95 and new_p95 and (new_p95 - old_p95) / old_p95 * 100 > threshold:
+            regressions.append(name)
+    for name in new['scenarios']:
+        if name not in base['scenarios']:
+            lines.append(f'{name:<24}new scenario, no baseline')
+    return '\n'.join(lines), regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmark and write a JSON baseline')
+    run.add_argument('-n', '--iterations', type=int, default=30)
+    run.add_argument('--warmup', type=int, default=3)
+    run.add_argument('--mode', choices=('executor', 'pooled'), default='executor',
+                     help='Executor thread per session, or the shared I/O loop')
+    run.add_argument('--latency', type=float, default=0.0,
+                     help='Simulated gateway reply delay in seconds')
+    run.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                     help='Only run this scenario (repeatable)')
+    run.add_argument('-o', '--output', help='Write the baseline JSON here')
+
+    trace = commands.add_parser('tracing', help='Measure the cost of tracing spans')
+    trace.add_argument('-n', '--iterations', type=int, default=200000)
+    trace.add_argument('--sessions', type=int, default=20)
+
+    imports = commands.add_parser('imports', help='Measure module import time (-X importtime)')
+    imports.add_argument('-m', '--module', action='append',
+                         help='Module to import (repeatable, default: client and protocol stack)')
+    imports.add_argument('-r', '--repeat', type=int, default=7)
+
+    cmp = commands.add_parser('compare', help='Compare two baselines on p50/p95')
+    cmp.add_argument('base')
+    cmp.add_argument('new')
+    cmp.add_argument('--threshold', type=float, default=10.0,
+                     help='Fail when wall-clock p95 regresses by more than this percent')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        doc = asyncio.run(run_benchmark(
+            args.iterations, args.warmup, args.mode, args.latency, args.scenario
+        ))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(doc, f, indent=2)
+                f.write('\n')
+        print(format_report(doc))
+        return 0 if not any(r['failures'] for r in doc['scenarios'].values()) else 1
+
+    if args.command == 'tracing':
+        result = asyncio.run(measure_tracing(args.iterations, args.sessions))
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if args.command == 'imports':
+        result = measure_imports(args.module, args.repeat)
+        print(f"{'module':<44}{'median ms':>10}{'min ms':>10}  loads")
+        for module, stats in result['modules'].items():
+            print(f"{module:<44}{stats['median_ms']:>10.1f}{stats['min_ms']:>10.1f}  "
+                  f"{', '.join(stats['loads']) or '-'}")
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    report, regressions = compare(base, new, args.threshold)
+    print(report)
+    if regressions:
+        print(f"p95 regression over {args.threshold}%: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Tiered TTL cache for Worcester Bosch Wave endpoints.
+Each tier is backed by one endpoint and refreshed on its own cadence.
+A tier whose endpoint does not answer (e.g. one a model does not have) is
+retried after twice as long each time, up to a cap, until it answers.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_MAX_BACKOFF = 86400  # seconds between retries of a failing tier, at most
+
+
+class CacheTier:
+    """One endpoint with its own time-to-live."""
+
+    def __init__(self, name: str, path: str, ttl: float, key: Optional[str] = None):
+        """Initialize the tier.
+
+        :param name: Tier identifier
+        :param path: Endpoint fetched to refresh this tier
+        :param ttl: Seconds before the cached value expires
+        :param key: Key the value is merged under; dict values from tiers
+            without a key are merged at the top level
+        """
+        self.name = name
+        self.path = path
+        self.ttl = float(ttl)
+        self.key = key
+        self.value: Any = None
+        self.fetched_at: Optional[float] = None
+        self.failures = 0  # fetches in a row that returned nothing
+        self.max_backoff = DEFAULT_MAX_BACKOFF
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the next fetch: the TTL, doubled per failure in a row."""
+        if not self.failures:
+            return self.ttl
+        return min(self.ttl * 2 ** self.failures, max(self.ttl, self.max_backoff))
+
+    def is_expired(self, now: float, slack: float = 0.0) -> bool:
+        return self.fetched_at is None or now - self.fetched_at >= self.retry_after - slack
+
+    def __repr__(self) -> str:
+        return f'CacheTier({self.name!r}, {self.path!r}, ttl={self.ttl})'
+
+
+class TieredCache:
+    """Collection of tiers presenting a single merged view."""
+
+    def __init__(
+        self,
+        tiers: Iterable[CacheTier],
+        clock: Callable[[], float] = time.monotonic,
+        slack: float = 1.0,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+    ):
+        # ``slack`` absorbs scheduler jitter so a tier polled at exactly its
+        # TTL is not skipped for a whole extra cycle
+        self._slack = slack
+        self._tiers: Dict[str, CacheTier] = {}
+        for tier in tiers:
+            tier.max_backoff = max_backoff
+            self._tiers[tier.name] = tier
+        self._clock = clock
+
+    def __getitem__(self, name: str) -> CacheTier:
+        return self._tiers[name]
+
+    @property
+    def tiers(self) -> List[CacheTier]:
+        return list(self._tiers.values())
+
+    @property
+    def min_ttl(self) -> float:
+        """Shortest cadence, i.e. how often someone needs to poll."""
+        return min(tier.ttl for tier in self._tiers.values())
+
+    def expired(self, now: Optional[float] = None) -> List[CacheTier]:
+        """Tiers that need fetching, in declaration order."""
+        now = self._clock() if now is None else now
+        return [tier for tier in self._tiers.values() if tier.is_expired(now, self._slack)]
+
+    def store(self, name: str, value: Any, now: Optional[float] = None) -> None:
+        tier = self._tiers[name]
+        tier.value = value
+        tier.fetched_at = self._clock() if now is None else now
+        tier.failures = 0
+
+    def touch(self, name: str, now: Optional[float] = None) -> None:
+        """Restart a tier's TTL without replacing its value."""
+        self._tiers[name].fetched_at = self._clock() if now is None else now
+
+    def fail(self, name: str, now: Optional[float] = None) -> None:
+        """Record a fetch that returned nothing; the old value is kept.
+
+        The tier is retried after its TTL doubled per failure in a row (capped
+        at ``max_backoff``), so an endpoint that never answers is soon left
+        alone instead of costing a session timeout every TTL.
+        """
+        tier = self._tiers[name]
+        tier.failures += 1
+        tier.fetched_at = self._clock() if now is None else now
+
+    def patch(self, name: str, updates: Dict[str, Any]) -> bool:
+        """Update keys of a dict-valued tier without restarting its TTL.
+
+        Used when part of a tier is known to have changed (e.g. a confirmed
+        write); False if the tier has no dict value to patch.
+        """
+        tier = self._tiers[name]
+        if not isinstance(tier.value, dict):
+            return False
+        tier.value = {**tier.value, **updates}
+        return True
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Force one tier, or every tier, to be fetched on the next poll."""
+        tiers = self._tiers.values() if name is None else [self._tiers[name]]
+        for tier in tiers:
+            tier.fetched_at = None
+
+    def merged(self) -> Dict[str, Any]:
+        """Merged view across all tiers that have a value."""
+        data: Dict[str, Any] = {}
+        for tier in self._tiers.values():
+            if tier.value is None:
+                continue
+            if tier.key is not None:
+                data[tier.key] = tier.value
+            elif isinstance(tier.value, dict):
+                data.update(tier.value)
+        return data
@@ -1,8 +1,17 @@
 # Communication secret
 SECRET = b'X\xf1\x8dp\xf6g\xc9\xc7\x9e\xf7\xdeC[\xf0\xf9\xb1U;\xbbna\x81b\x12\xab\x80\xe5\xb0\xd3Q\xfb\xb1'
 
+# XMPP endpoint (override per messenger to target a local stand-in gateway)
+XMPP_DOMAIN = 'wa2-mz36-qrmzh6.bosch.de'
+XMPP_HOST = XMPP_DOMAIN
+XMPP_PORT = 5222
+
 # Command path base URI
 PATH_BASE = '/heatingCircuits/hc1/'
+DHW_PATH_BASE = '/dhwCircuits/dhwA/'
+
+# Live status endpoint: every value the thermostat reports in one payload
+UI_STATUS_PATH = '/ecus/rrc/uiStatus'
 
 # API Constants
 ON = 'on'
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Worcester Bosch Wave Prometheus exporter.
+Polls thermostats on its own cadence and serves the cached values on /metrics;
+scrapes never trigger a cloud round trip.
+
+Usage:
+    python -m worcester_bosch_wave.exporter devices.csv --port 9812 --interval 60
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .fleet import read_devices
+from .io_loop import WaveIOLoop
+from .log import RateLimitedLog, set_protocol_trace
+from .wave_client import WorcesterWaveClient
+
+_LOGGER = logging.getLogger(__name__)
+
+errors = RateLimitedLog(_LOGGER)
+
+# uiStatus key -> (metric name, help text)
+GAUGES = {
+    'IHT': ('wave_current_temperature_celsius', 'Room temperature measured by the thermostat'),
+    'TSP': ('wave_target_temperature_celsius', 'Temperature set point'),
+    'MMT': ('wave_manual_temperature_celsius', 'Manual mode temperature'),
+    'CSP': ('wave_switch_point_temperature_celsius', 'Current switch point temperature'),
+    'TOT': ('wave_schedule_temperature_celsius', 'Schedule temperature'),
+    'TOD': ('wave_override_duration_hours', 'Remaining temperature override duration'),
+}
+
+# uiStatus key -> (metric name, help text); 1 when the value is "on"
+FLAGS = {
+    'DHW': ('wave_hot_water_enabled', 'Hot water enabled'),
+    'TOR': ('wave_temperature_override_active', 'Temperature override active'),
+    'HMD': ('wave_holiday_mode', 'Holiday mode active'),
+}
+
+BOILER_STATES = ('No', 'CH', 'HW')
+
+
+class DeviceState:
+    """Cached values and client metrics for one thermostat."""
+
+    def __init__(self, client: WorcesterWaveClient):
+        self.client = client
+        self.data: Optional[dict] = None
+        self.last_ok = False
+        self.last_success: Optional[float] = None  # unix time
+        self.last_duration: Optional[float] = None
+        self.duration_sum = 0.0
+        self.polls = 0
+        self.failures = 0
+
+
+class WaveExporter:
+    """Polls thermostats in the background and renders Prometheus text."""
+
+    def __init__(
+        self,
+        devices: Iterable[Tuple[str, str, str]],
+        interval: float = 60,
+        max_sessions: int = 4,
+    ):
+        self.interval = interval
+        self.io_loop = WaveIOLoop(max_sessions=max_sessions, name='wave-exporter-io')
+        self.devices: Dict[str, DeviceState] = {}
+        for serial, access, password in devices:
+            client = WorcesterWaveClient(serial, access, password, io_loop=self.io_loop)
+            self.devices[serial] = DeviceState(client)
+        self._tasks: List[asyncio.Task] = []
+
+    async def poll_once(self, state: DeviceState) -> None:
+        started = time.perf_counter()
+        data = await state.client.get_status()
+        duration = time.perf_counter() - started
+
+        state.polls += 1
+        state.last_duration = duration
+        state.duration_sum += duration
+        state.last_ok = bool(data)
+        if data:
+            state.data = data
+            state.last_success = time.time()
+            errors.resolved(('poll', state.client.serial_number))
+        else:
+            # get_status() reports its own errors by returning None
+            state.failures += 1
+            errors.warning(
+                ('poll', state.client.serial_number),
+                'Poll of %s returned no data', state.client.serial_number,
+            )
+
+    async def _poll_forever(self, state: DeviceState, offset: float) -> None:
+        await asyncio.sleep(offset)
+        while True:
+            started = time.monotonic()
+            try:
+                await self.poll_once(state)
+            except Exception as e:
+                state.failures += 1
+                state.last_ok = False
+                errors.warning(
+                    ('poll', state.client.serial_number),
+                    'Poll of %s failed: %s', state.client.serial_number, e,
+                )
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        # Spread devices evenly over one interval so they do not poll in lockstep
+        count = max(1, len(self.devices))
+        for index, state in enumerate(self.devices.values()):
+            offset = self.interval * index / count
+            self._tasks.append(asyncio.ensure_future(self._poll_forever(state, offset)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.get_event_loop().run_in_executor(None, self.io_loop.stop)
+
+    def render(self) -> str:
+        """Prometheus text exposition of the cached state."""
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+        def sample(name: str, kind: str, help_text: str, line: str) -> None:
+            families.setdefault(name, (kind, help_text, []))[2].append(line)
+
+        for serial, state in self.devices.items():
+            label = f'serial="{serial}"'
+            data = state.data or {}
+            for key, (name, help_text) in GAUGES.items():
+                value = _to_float(data.get(key))
+                if value is not None:
+                    sample(name, 'gauge', help_text, f'{name}{{{label}}} {value}')
+            for key, (name, help_text) in FLAGS.items():
+                if key in data:
+                    sample(name, 'gauge', help_text, f'{name}{{{label}}} {int(data[key] == "on")}')
+            if 'BAI' in data:
+                bai = data['BAI']
+                sample(
+                    'wave_boiler_active', 'gauge', 'Boiler firing (BAI is CH or HW)',
+                    f'wave_boiler_active{{{label}}} {int(bai in ("CH", "HW"))}',
+                )
+                for value in BOILER_STATES:
+                    sample(
+                        'wave_boiler_state', 'gauge', 'Boiler state by BAI value',
+                        f'wave_boiler_state{{{label},state="{value}"}} {int(bai == value)}',
+                    )
+
+            sample('wave_up', 'gauge', 'Whether the last poll succeeded',
+                   f'wave_up{{{label}}} {int(state.last_ok)}')
+            if state.last_success is not None:
+                sample('wave_last_success_timestamp_seconds', 'gauge',
+                       'Unix time of the last successful poll',
+                       f'wave_last_success_timestamp_seconds{{{label}}} {state.last_success:.3f}')
+            sample('wave_poll_duration_seconds', 'summary', 'Client round trip time per poll',
+                   f'wave_poll_duration_seconds_sum{{{label}}} {state.duration_sum:.6f}')
+            sample('wave_poll_duration_seconds', 'summary', 'Client round trip time per poll',
+                   f'wave_poll_duration_seconds_count{{{label}}} {state.polls}')
+            if state.last_duration is not None:
+                sample('wave_last_poll_duration_seconds', 'gauge',
+                       'Client round trip time of the last poll',
+                       f'wave_last_poll_duration_seconds{{{label}}} {state.last_duration:.6f}')
+            sample('wave_poll_failures_total', 'counter', 'Polls that returned no data',
+                   f'wave_poll_failures_total{{{label}}} {state.failures}')
+
+        sample('wave_io_active_sessions', 'gauge', 'XMPP sessions currently open',
+               f'wave_io_active_sessions {self.io_loop.active_sessions}')
+        sample('wave_io_queued_sessions', 'gauge', 'Sessions waiting for a free slot',
+               f'wave_io_queued_sessions {self.io_loop.queued_sessions}')
+
+        lines: List[str] = []
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+    async def handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.0 handler: GET /metrics, everything else 404."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            # Drain headers
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                body = self.render().encode()
+                status = '200 OK'
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                body = b'Not Found\n'
+                status = '404 Not Found'
+                content_type = 'text/plain'
+            writer.write(
+                (
+                    f'HTTP/1.0 {status}\r\n'
+                    f'Content-Type: {content_type}\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    'Connection: close\r\n\r\n'
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def serve(exporter: WaveExporter, host: str, port: int) -> None:
+    server = await asyncio.start_server(exporter.handle_http, host, port)
+    exporter.start()
+    _LOGGER.info('Serving metrics for %d thermostat(s) on %s:%d', len(exporter.devices), host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await exporter.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Prometheus exporter for Worcester Bosch Wave thermostats')
+    parser.add_argument('csv', help='CSV of serial_number,access_code,password')
+    parser.add_argument('--host', default='0.0.0.0', help='Listen address')  # nosec B104
+    parser.add_argument('--port', type=int, default=9812, help='Listen port')
+    parser.add_argument('--interval', type=float, default=60, help='Seconds between polls per thermostat')
+    parser.add_argument('--max-sessions', type=int, default=4, help='Concurrent XMPP sessions')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    parser.add_argument('--protocol-trace', action='store_true',
+                        help='Log raw requests and decoded responses (very verbose)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+    )
+    set_protocol_trace(args.protocol_trace)
+    with open(args.csv, newline='') as f:
+        devices = list(read_devices(csv.reader(f)))
+    if not devices:
+        parser.error('no devices in CSV')
+
+    exporter = WaveExporter(devices, interval=args.interval, max_sessions=args.max_sessions)
+    try:
+        asyncio.run(serve(exporter, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
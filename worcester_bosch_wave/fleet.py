@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Worcester Bosch Wave fleet poller.
+Polls many thermostats concurrently and streams one NDJSON record each.
+
+Usage:
+    python -m worcester_bosch_wave.fleet devices.csv --concurrency 16 > audit.ndjson
+
+The CSV holds serial_number,access_code,password per row (header optional).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .io_loop import WaveIOLoop
+from .wave_client import WorcesterWaveClient
+
+# uiStatus keys included in each record unless --full is given
+SUMMARY_KEYS = ('IHT', 'TSP', 'UMD', 'BAI', 'DHW', 'TOR', 'TOD', 'CTD')
+
+HEADER_FIELDS = ('serial_number', 'access_code', 'password')
+
+
+def read_devices(rows: Iterable[List[str]]) -> Iterator[Tuple[str, str, str]]:
+    """Yield (serial, access code, password) triples, skipping a header and blanks."""
+    for row in rows:
+        fields = [field.strip() for field in row]
+        if len(fields) < 3 or not fields[0] or fields[0].startswith('#'):
+            continue
+        if fields[0].lower() == HEADER_FIELDS[0]:
+            continue
+        yield fields[0].replace(' ', ''), fields[1].replace(' ', ''), fields[2]
+
+
+async def poll_device(
+    client: WorcesterWaveClient,
+    semaphore: asyncio.Semaphore,
+    full: bool = False,
+) -> dict:
+    """Poll one thermostat and build its record."""
+    started = time.perf_counter()
+    async with semaphore:
+        acquired = time.perf_counter()
+        data = await client.get_status()
+    finished = time.perf_counter()
+
+    record = {
+        'serial_number': client.serial_number,
+        'ok': bool(data),
+        'queued_ms': round((acquired - started) * 1000, 1),
+        'session_ms': round((finished - acquired) * 1000, 1),
+        'total_ms': round((finished - started) * 1000, 1),
+        'phases_ms': {k: round(v * 1000, 1) for k, v in client.last_phases.items()},
+    }
+    if data:
+        record['data'] = data if full else {k: data.get(k) for k in SUMMARY_KEYS}
+    else:
+        record['error'] = 'no response'
+    return record
+
+
+async def poll_fleet(
+    devices: Iterable[Tuple[str, str, str]],
+    out: TextIO,
+    concurrency: int = 8,
+    full: bool = False,
+) -> Tuple[int, int]:
+    """Poll every device, writing records to ``out`` as they complete.
+
+    Returns (succeeded, failed).
+    """
+    io_loop = WaveIOLoop(max_sessions=concurrency, name='wave-fleet-io')
+    semaphore = asyncio.Semaphore(concurrency)
+    clients = [
+        WorcesterWaveClient(serial, access, password, io_loop=io_loop)
+        for serial, access, password in devices
+    ]
+    ok = failed = 0
+    try:
+        tasks = [asyncio.ensure_future(poll_device(c, semaphore, full)) for c in clients]
+        for task in asyncio.as_completed(tasks):
+            record = await task
+            if record['ok']:
+                ok += 1
+            else:
+                failed += 1
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            out.flush()
+    finally:
+        io_loop.stop()
+    return ok, failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('csv', help='CSV of serial_number,access_code,password ("-" for stdin)')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Sessions in flight at once')
+    parser.add_argument('-o', '--output', help='Write NDJSON here instead of stdout')
+    parser.add_argument('--full', action='store_true', help='Include the full uiStatus payload')
+    args = parser.parse_args(argv)
+
+    if args.csv == '-':
+        devices = list(read_devices(csv.reader(sys.stdin)))
+    else:
+        with open(args.csv, newline='') as f:
+            devices = list(read_devices(csv.reader(f)))
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        ok, failed = asyncio.run(poll_fleet(devices, out, args.concurrency, args.full))
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f'{ok + failed} thermostats polled in {elapsed:.1f}s: {ok} ok, {failed} failed',
+        file=sys.stderr,
+    )
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
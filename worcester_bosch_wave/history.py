@@ -0,0 +1,152 @@
+"""
+Fixed-capacity status history for Wave thermostats.
+
+Samples are stored column by column in preallocated ``array('d')`` buffers
+used as a ring, so an append is a handful of slot assignments with nothing
+kept per sample, and memory stays at ``capacity`` samples. Reductions
+(min/max/mean and a least-squares slope) run over a trailing time window,
+found by binary search because timestamps never decrease.
+"""
+
+import math
+import time
+from array import array
+from typing import Any, Mapping, Optional
+
+# uiStatus keys kept per sample, besides the timestamp
+COLUMNS = ('IHT', 'TSP', 'BAI', 'TOD')
+# Boiler activity (BAI) is stored as a code
+BAI_CODES = {'No': 0.0, 'CH': 1.0, 'HW': 2.0}
+
+
+def _number(key: str, value: Any) -> float:
+    """``value`` as stored in column ``key``; NaN when missing or invalid."""
+    if key == 'BAI':
+        return BAI_CODES.get(value, math.nan)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class StatusHistory:
+    """The last ``capacity`` uiStatus samples of one thermostat."""
+
+    def __init__(self, capacity: int = 2880):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self._time = array('d', bytes(8 * capacity))
+        self._columns = {key: array('d', bytes(8 * capacity)) for key in COLUMNS}
+        self._next = 0  # slot the next sample goes into
+        self._size = 0
+        self.count = 0  # samples ever appended, including overwritten ones
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, index: int) -> int:
+        """Ring slot of the ``index``-th oldest sample held."""
+        return (self._next - self._size + index) % self.capacity
+
+    def append(self, status: Mapping[str, Any], at: Optional[float] = None) -> None:
+        """Add a sample of ``status`` taken at ``at`` (unix time, default now).
+
+        A timestamp older than the newest sample is moved up to it, so the
+        window search stays valid if the wall clock steps back.
+        """
+        at = time.time() if at is None else at
+        slot = self._next
+        if self._size:
+            at = max(at, self._time[(slot - 1) % self.capacity])
+        self._time[slot] = at
+        for key, column in self._columns.items():
+            column[slot] = _number(key, status.get(key))
+        self._next = (slot + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self.count += 1
+
+    def latest(self, key: str) -> Optional[float]:
+        """Newest value of column ``key``, or None."""
+        if not self._size:
+            return None
+        value = self._columns[key][(self._next - 1) % self.capacity]
+        return None if math.isnan(value) else value
+
+    def _first_in_window(self, since: float) -> int:
+        """Index of the oldest sample taken at or after ``since``."""
+        times = self._time
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if times[self._slot(middle)] < since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def window(self, key: str, seconds: float, now: Optional[float] = None) -> Optional[dict]:
+        """min/max/mean and slope (per hour) of ``key`` over the last ``seconds``.
+
+        ``span`` is the time in seconds between the oldest and newest sample
+        used; callers wanting a meaningful slope should check it. None when
+        the window holds no valid value.
+        """
+        now = time.time() if now is None else now
+        times = self._time
+        column = self._columns[key]
+        count = 0
+        low = high = total = 0.0
+        first = last = 0.0
+        # Sums for the least-squares slope, with time relative to the first
+        # sample to keep the products small
+        sum_t = sum_tt = sum_tv = 0.0
+        for index in range(self._first_in_window(now - seconds), self._size):
+            slot = self._slot(index)
+            value = column[slot]
+            if math.isnan(value):
+                continue
+            if count == 0:
+                first = times[slot]
+                low = high = value
+            elif value < low:
+                low = value
+            elif value > high:
+                high = value
+            t = times[slot] - first
+            last = times[slot]
+            count += 1
+            total += value
+            sum_t += t
+            sum_tt += t * t
+            sum_tv += t * value
+        if count == 0:
+            return None
+        denominator = count * sum_tt - sum_t * sum_t
+        slope = None
+        if denominator > 0:
+            slope = (count * sum_tv - sum_t * total) / denominator * 3600
+        return {
+            'min': low,
+            'max': high,
+            'mean': total / count,
+            'slope': slope,
+            'samples': count,
+            'span': last - first,
+        }
+
+    def summary(self, seconds: float, now: Optional[float] = None, digits: int = 2) -> dict:
+        """``window()`` of every numeric column, rounded, for diagnostics."""
+        result = {}
+        for key in COLUMNS:
+            if key == 'BAI':
+                continue
+            stats = self.window(key, seconds, now)
+            if stats is not None:
+                stats = {
+                    name: round(value, digits) if isinstance(value, float) else value
+                    for name, value in stats.items()
+                }
+            result[key] = stats
+        return result
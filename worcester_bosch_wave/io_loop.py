@@ -0,0 +1,110 @@
+"""
+Shared I/O loop for Worcester Bosch Wave sessions.
+One background thread runs one asyncio loop for every client that uses it,
+with a cap on how many XMPP sessions are open at once.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_SESSIONS = 4
+
+
+class WaveIOLoop:
+    """Background event loop shared by many WorcesterWaveClient instances."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, name: str = 'wave-io'):
+        self.max_sessions = max_sessions
+        self.name = name
+        self.active_sessions = 0
+        self.queued_sessions = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the loop thread (idempotent)."""
+        with self._lock:
+            if self.is_running:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(ready,), name=self.name, daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+        _LOGGER.debug("Wave I/O loop started (max %d sessions)", self.max_sessions)
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_sessions)
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            try:
+                pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            except Exception as e:
+                _LOGGER.debug("I/O loop cleanup error: %s", e)
+            asyncio.set_event_loop(None)
+            loop.close()
+            self._loop = None
+
+    def stop(self, timeout: float = 10) -> None:
+        """Stop the loop and join its thread. Blocking; call from an executor."""
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        _LOGGER.debug("Wave I/O loop stopped")
+
+    async def _bounded(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self.queued_sessions += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued_sessions -= 1
+        self.active_sessions += 1
+        try:
+            return await factory()
+        finally:
+            self.active_sessions -= 1
+            self._semaphore.release()
+
+    def submit(self, factory: Callable[[], Awaitable[Any]]) -> Future:
+        """Schedule ``factory()`` on the I/O loop; thread-safe.
+
+        ``factory`` is called inside the loop thread, so messengers it builds
+        bind to the shared loop.
+        """
+        if not self.is_running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self._bounded(factory), self._loop)
+
+    async def run(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``factory()`` on the I/O loop from any other event loop."""
+        return await asyncio.wrap_future(self.submit(factory))
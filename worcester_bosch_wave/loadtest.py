@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Worcester Bosch Wave load-test harness.
+Hosts N virtual thermostats on an in-process LocalWaveGateway, drives N
+clients at a fixed poll rate and reports throughput, tail latency and the
+resources the client stack consumed, for the executor and pooled modes.
+
+Usage:
+    python -m worcester_bosch_wave.loadtest -n 50 -n 200 --interval 10 --duration 60
+    python -m worcester_bosch_wave.loadtest -n 300 --mode pooled --max-sessions 16 -o load.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Iterator, List, Optional, Sequence
+
+from .io_loop import WaveIOLoop
+from .local_gateway import LocalWaveGateway
+from .stats import percentile
+from .wave_client import SESSION_TIMEOUT, WorcesterWaveClient
+
+SAMPLE_INTERVAL = 0.1  # seconds between resource samples
+
+
+def _fd_count() -> Optional[int]:
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+class ResourceSampler:
+    """Tracks peak threads, file descriptors and RSS while a run is going."""
+
+    def __init__(self):
+        self.baseline_threads = threading.active_count()
+        self.baseline_fds = _fd_count()
+        self.peak_threads = self.baseline_threads
+        self.peak_fds = self.baseline_fds
+        self.peak_rss = _rss_bytes()
+
+    def sample(self) -> None:
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+        fds = _fd_count()
+        if fds is not None:
+            self.peak_fds = max(self.peak_fds or 0, fds)
+        rss = _rss_bytes()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+class _LoopCounter:
+    created = 0
+
+
+@contextlib.contextmanager
+def count_event_loops() -> Iterator[_LoopCounter]:
+    """Count asyncio.new_event_loop() calls made while the block runs."""
+    counter = _LoopCounter()
+    original = asyncio.new_event_loop
+
+    def _counting_new_event_loop():
+        counter.created += 1
+        return original()
+
+    asyncio.new_event_loop = _counting_new_event_loop
+    try:
+        yield counter
+    finally:
+        asyncio.new_event_loop = original
+
+
+def device_credentials(index: int) -> tuple:
+    return f'{200000000 + index}', f'Load{index:012d}', f'pw{index}'
+
+
+async def _poller(
+    client: WorcesterWaveClient,
+    offset: float,
+    interval: float,
+    deadline: float,
+    latencies: List[float],
+    counts: dict,
+) -> None:
+    """Poll on a fixed cadence until ``deadline``; late polls start at once."""
+    next_at = time.monotonic() + offset
+    while next_at < deadline:
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            counts['late'] += 1
+        started = time.perf_counter()
+        data = await client.get_status()
+        latencies.append(time.perf_counter() - started)
+        counts['ok' if data else 'failed'] += 1
+        next_at += interval
+
+
+async def run_load(
+    clients: int,
+    interval: float = 10.0,
+    duration: float = 30.0,
+    mode: str = 'executor',
+    max_sessions: int = 8,
+    latency: float = 0.0,
+) -> dict:
+    """One load run; returns the result row."""
+    sampler = ResourceSampler()
+    latencies: List[float] = []
+    counts = {'ok': 0, 'failed': 0, 'late': 0}
+    peak_sessions = 0
+
+    with count_event_loops() as loops:
+        io_loop = WaveIOLoop(max_sessions=max_sessions, name='wave-load-io') if mode == 'pooled' else None
+        stop = asyncio.Event()
+        sampling = asyncio.ensure_future(sampler.run(stop))
+        started = time.monotonic()
+        try:
+            async with LocalWaveGateway(latency=latency) as gateway:
+                pollers = []
+                for index in range(clients):
+                    serial, access, password = device_credentials(index)
+                    gateway.add_device(serial, access, password)
+                    client = WorcesterWaveClient(
+                        serial, access, password,
+                        io_loop=io_loop, host=gateway.host, port=gateway.port,
+                    )
+                    # Spread first polls evenly over one interval
+                    offset = interval * index / clients
+                    pollers.append(_poller(
+                        client, offset, interval, started + duration, latencies, counts
+                    ))
+
+                async def _watch_sessions():
+                    nonlocal peak_sessions
+                    while not stop.is_set():
+                        peak_sessions = max(peak_sessions, gateway.active_sessions)
+                        await asyncio.sleep(SAMPLE_INTERVAL)
+
+                watching = asyncio.ensure_future(_watch_sessions())
+                # Polls already in flight at the deadline are allowed to finish
+                await asyncio.wait_for(
+                    asyncio.gather(*pollers), duration + SESSION_TIMEOUT * 2
+                )
+                elapsed = time.monotonic() - started
+                stop.set()
+                await watching
+        finally:
+            stop.set()
+            await sampling
+            if io_loop is not None:
+                await asyncio.get_event_loop().run_in_executor(None, io_loop.stop)
+
+    polls = counts['ok'] + counts['failed']
+    ms = [v * 1000 for v in latencies]
+
+    def _pct(p: float) -> Optional[float]:
+        return round(percentile(ms, p), 1) if ms else None
+
+    return {
+        'mode': mode,
+        'clients': clients,
+        'interval': interval,
+        'duration': round(elapsed, 1),
+        'offered_per_s': round(clients / interval, 2),
+        'achieved_per_s': round(polls / elapsed, 2) if elapsed else 0.0,
+        'polls': polls,
+        'failed': counts['failed'],
+        'late': counts['late'],
+        'p50_ms': _pct(50),
+        'p95_ms': _pct(95),
+        'p99_ms': _pct(99),
+        'max_ms': round(max(ms), 1) if ms else None,
+        'peak_gateway_sessions': peak_sessions,
+        'baseline_threads': sampler.baseline_threads,
+        'peak_threads': sampler.peak_threads,
+        'baseline_fds': sampler.baseline_fds,
+        'peak_fds': sampler.peak_fds,
+        'event_loops_created': loops.created,
+        'peak_rss_mb': round(sampler.peak_rss / 2**20, 1) if sampler.peak_rss else None,
+    }
+
+
+COLUMNS = (
+    ('mode', 'mode', 9), ('clients', 'clients', 8), ('offered_per_s', 'offer/s', 9),
+    ('achieved_per_s', 'done/s', 9), ('failed', 'failed', 7), ('late', 'late', 6),
+    ('p50_ms', 'p50 ms', 9), ('p95_ms', 'p95 ms', 9), ('p99_ms', 'p99 ms', 9),
+    ('max_ms', 'max ms', 9), ('peak_gateway_sessions', 'sessions', 9),
+    ('peak_threads', 'threads', 8), ('peak_fds', 'fds', 6),
+    ('event_loops_created', 'loops', 7), ('peak_rss_mb', 'rss MB', 8),
+)
+
+
+def format_table(rows: Sequence[dict]) -> str:
+    lines = [''.join(f'{title:>{width}}' for _, title, width in COLUMNS)]
+    for row in rows:
+        lines.append(''.join(
+            f"{'-' if row[key] is None else row[key]!s:>{width}}" for key, _, width in COLUMNS
+        ))
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--clients', type=int, action='append',
+                        help='Number of thermostats/clients (repeatable, default 50)')
+    parser.add_argument('--interval', type=float, default=10.0, help='Seconds between polls per client')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to keep issuing polls')
+    parser.add_argument('--mode', choices=('executor', 'pooled', 'both'), default='both')
+    parser.add_argument('--max-sessions', type=int, default=8, help='Session limit in pooled mode')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated gateway reply delay')
+    parser.add_argument('-o', '--output', help='Also write the result rows as JSON')
+    args = parser.parse_args(argv)
+
+    modes = ('executor', 'pooled') if args.mode == 'both' else (args.mode,)
+    rows = []
+    for clients in args.clients or [50]:
+        for mode in modes:
+            # A fresh event loop per run so executor threads do not carry over
+            rows.append(asyncio.run(run_load(
+                clients, args.interval, args.duration, mode, args.max_sessions, args.latency
+            )))
+            print(format_table(rows[-1:]).splitlines()[-1], file=sys.stderr)
+
+    print(format_table(rows))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bosch rrcgateway XMPP service.
+Accepts rrccontact_<serial> / Ct7ZR03b_<access> logins, answers NefitEasy
+GET/PUT requests with AES-encrypted bodies and keeps per-device state, so
+the client stack can be exercised and benchmarked without the real cloud.
+
+Usage:
+    python -m worcester_bosch_wave.local_gateway --device 123456789:AbCdEfGhIjKlMnOp:1234
+"""
+
+import argparse
+import asyncio
+import base64
+import copy
+import json
+import logging
+import random
+import sys
+import uuid
+import xml.etree.ElementTree as ET  # nosec B405 - parses local test traffic only
+from typing import Callable, Dict, Optional, Union
+from xml.sax.saxutils import escape
+
+from Crypto.Cipher import AES
+
+from .constants import PATH_BASE, SECRET
+from .recordings import GAS_USAGE_POINTER, RECORDS_PER_PAGE
+from .utils import get_md5
+
+_LOGGER = logging.getLogger(__name__)
+
+NS_STREAM = 'http://etherx.jabber.org/streams'
+NS_CLIENT = 'jabber:client'
+NS_SASL = 'urn:ietf:params:xml:ns:xmpp-sasl'
+NS_BIND = 'urn:ietf:params:xml:ns:xmpp-bind'
+NS_SESSION = 'urn:ietf:params:xml:ns:xmpp-session'
+NS_ROSTER = 'jabber:iq:roster'
+
+USER_PREFIX = 'rrccontact_'
+GATEWAY_PREFIX = 'rrcgateway_'
+PASSWORD_PREFIX = 'Ct7ZR03b_'
+
+# Realistic uiStatus payload as returned by a Wave in clock mode
+DEFAULT_UI_STATUS = {
+    'CTD': '2025-09-22T18:33:30+01:00 Mo',
+    'CTR': 'room',
+    'UMD': 'clock',
+    'MMT': '21.0',
+    'CPM': 'auto',
+    'CSP': '31',
+    'TOR': 'off',
+    'TOA': '0',
+    'DOT': 'false',
+    'TOT': '21.0',
+    'TOD': '0',
+    'RS': 'off',
+    'FPA': 'off',
+    'ESI': 'off',
+    'BAI': 'No',
+    'BLE': 'false',
+    'BBE': 'false',
+    'BMR': 'false',
+    'PMR': 'false',
+    'RS_': 'off',
+    'DAS': 'off',
+    'TAS': 'off',
+    'HMD': 'off',
+    'HED_EN': 'false',
+    'HED_DEV': 'false',
+    'FAH': 'false',
+    'DHW': 'on',
+    'IHT': '20.50',
+    'IHS': 'ok',
+    'ARS': 'init',
+    'TSP': '21.0',
+}
+
+# Other endpoints a device answers GETs for
+DEFAULT_ENDPOINTS = {
+    '/ecus/rrc/userprogram/activeprogram': 0,
+}
+
+Latency = Union[float, Callable[[], float]]
+
+
+class VirtualThermostat:
+    """State of one emulated thermostat."""
+
+    def __init__(self, serial_number: str, access_code: str, password: str):
+        self.serial_number = serial_number
+        self.access_code = access_code
+        self.password = password
+        self.key = get_md5(access_code.encode() + SECRET) + get_md5(SECRET + password.encode())
+        self.ui_status = copy.deepcopy(DEFAULT_UI_STATUS)
+        self.endpoints = copy.deepcopy(DEFAULT_ENDPOINTS)
+        # Daily gas-usage records ({'d', 'ch', 'hw', 'T'}), oldest first
+        self.gas_usage: list = []
+        self.puts: list = []
+
+    def encrypt(self, text: str) -> str:
+        raw = text.encode('utf-8')
+        if len(raw) % 16:
+            raw += b'\x00' * (16 - len(raw) % 16)
+        return base64.b64encode(AES.new(self.key, AES.MODE_ECB).encrypt(raw)).decode()
+
+    def decrypt(self, b64: str) -> str:
+        raw = AES.new(self.key, AES.MODE_ECB).decrypt(base64.b64decode(b64))
+        return raw.replace(b'\x00', b'').decode('utf-8')
+
+    def get(self, path: str):
+        if path == '/ecus/rrc/uiStatus':
+            return self.ui_status
+        if path.startswith(PATH_BASE) and path[len(PATH_BASE):] in _HC1_READBACK:
+            key = _HC1_READBACK[path[len(PATH_BASE):]]
+            value = self.ui_status.get(key)
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return value
+        if path == GAS_USAGE_POINTER:
+            return len(self.gas_usage) + 1
+        if path.startswith(_GAS_USAGE_PAGE):
+            try:
+                page = int(path[len(_GAS_USAGE_PAGE):])
+            except ValueError:
+                return None
+            start = (page - 1) * RECORDS_PER_PAGE
+            records = self.gas_usage[start:start + RECORDS_PER_PAGE] if page > 0 else []
+            return records + [_EMPTY_RECORD] * (RECORDS_PER_PAGE - len(records))
+        return self.endpoints.get(path)
+
+    def put(self, path: str, value) -> bool:
+        """Apply a PUT; False means the gateway answers 400."""
+        self.puts.append((path, value))
+        if not path.startswith(PATH_BASE):
+            self.endpoints[path] = value
+            return True
+        leaf = path[len(PATH_BASE):]
+        status = self.ui_status
+        if leaf == 'usermode':
+            if value not in ('manual', 'clock'):
+                return False
+            status['UMD'] = value
+            status['TSP'] = status['MMT'] if value == 'manual' else status['TOT']
+        elif leaf == 'temperatureRoomManual':
+            status['MMT'] = f'{float(value):.1f}'
+            if status['UMD'] == 'manual':
+                status['TSP'] = status['MMT']
+        elif leaf == 'manualTempOverride/temperature':
+            status['TOT'] = f'{float(value):.1f}'
+            if status['TOR'] == 'on':
+                status['TSP'] = status['TOT']
+        elif leaf == 'manualTempOverride/status':
+            if value not in ('on', 'off'):
+                return False
+            status['TOR'] = value
+            if value == 'on':
+                status['TSP'] = status['TOT']
+        else:
+            self.endpoints[path] = value
+        return True
+
+
+_GAS_USAGE_PAGE = '/ecus/rrc/recordings/gasusage?page='
+# Unused recording slots
+_EMPTY_RECORD = {'d': '255-256-65535', 'hw': 6553.5, 'ch': 6553.5, 'T': -3276.8}
+
+# hc1 endpoints readable on their own, mapped to the uiStatus key they mirror
+_HC1_READBACK = {
+    'usermode': 'UMD',
+    'temperatureRoomManual': 'MMT',
+    'manualTempOverride/temperature': 'TOT',
+    'manualTempOverride/status': 'TOR',
+}
+
+
+class LocalWaveGateway:
+    """Minimal XMPP server speaking just enough of the Bosch dialect."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: Latency = 0.0,
+        domain: str = 'wa2-mz36-qrmzh6.bosch.de',
+    ):
+        """Initialize the gateway.
+
+        :param port: 0 picks a free port; read it back from ``port`` after start()
+        :param latency: Seconds (or a callable returning seconds) the virtual
+            gateway takes to answer each request
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.domain = domain
+        self.devices: Dict[str, VirtualThermostat] = {}
+        self.sessions = 0
+        self.active_sessions = 0
+        self.requests = 0
+        self.auth_failures = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def add_device(self, serial_number: str, access_code: str, password: str) -> VirtualThermostat:
+        device = VirtualThermostat(serial_number, access_code, password)
+        self.devices[serial_number] = device
+        return device
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.debug('Local gateway listening on %s:%d', self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> 'LocalWaveGateway':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def _delay(self) -> float:
+        return self.latency() if callable(self.latency) else self.latency
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.sessions += 1
+        self.active_sessions += 1
+        session = _Session(self, writer)
+        try:
+            while not session.closed:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                await session.feed(chunk)
+        except (ConnectionError, ET.ParseError) as e:
+            _LOGGER.debug('Gateway session ended: %s', e)
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+
+class _Session:
+    """One client connection: stream negotiation, then request/response."""
+
+    def __init__(self, gateway: LocalWaveGateway, writer: asyncio.StreamWriter):
+        self.gateway = gateway
+        self.writer = writer
+        self.device: Optional[VirtualThermostat] = None
+        self.jid = ''
+        self.closed = False
+        self._new_parser()
+
+    def _new_parser(self) -> None:
+        self.parser = ET.XMLPullParser(events=('start', 'end'))
+        self.depth = 0
+
+    def send(self, data: str) -> None:
+        self.writer.write(data.encode('utf-8'))
+
+    async def feed(self, chunk: bytes) -> None:
+        self.parser.feed(chunk)
+        for event, elem in self.parser.read_events():
+            if event == 'start':
+                self.depth += 1
+                if self.depth == 1:
+                    self._open_stream()
+            else:
+                self.depth -= 1
+                if self.depth == 1:
+                    restart = await self._stanza(elem)
+                    if restart:
+                        # SASL success: the client opens a fresh stream
+                        self._new_parser()
+                        break
+                elif self.depth == 0:
+                    self.send('</stream:stream>')
+                    self.closed = True
+                    break
+        await self.writer.drain()
+
+    def _open_stream(self) -> None:
+        self.send(
+            "<?xml version='1.0'?>"
+            f"<stream:stream xmlns='{NS_CLIENT}' xmlns:stream='{NS_STREAM}' "
+            f"from='{self.gateway.domain}' id='{uuid.uuid4().hex}' version='1.0'>"
+        )
+        if self.device is None:
+            self.send(
+                '<stream:features>'
+                f"<mechanisms xmlns='{NS_SASL}'><mechanism>PLAIN</mechanism></mechanisms>"
+                '</stream:features>'
+            )
+        else:
+            self.send(
+                '<stream:features>'
+                f"<bind xmlns='{NS_BIND}'/><session xmlns='{NS_SESSION}'/>"
+                '</stream:features>'
+            )
+
+    async def _stanza(self, elem: ET.Element) -> bool:
+        tag = elem.tag
+        if tag == f'{{{NS_SASL}}}auth':
+            return self._auth(elem)
+        if tag == f'{{{NS_CLIENT}}}iq':
+            self._iq(elem)
+        elif tag == f'{{{NS_CLIENT}}}message':
+            await self._message(elem)
+        return False
+
+    def _auth(self, elem: ET.Element) -> bool:
+        try:
+            _, user, password = base64.b64decode(elem.text or '').decode().split('\x00')
+        except ValueError:
+            user = password = ''
+        serial = user[len(USER_PREFIX):] if user.startswith(USER_PREFIX) else None
+        device = self.gateway.devices.get(serial) if serial else None
+        if device is None or password != PASSWORD_PREFIX + device.access_code:
+            self.gateway.auth_failures += 1
+            self.send(f"<failure xmlns='{NS_SASL}'><not-authorized/></failure>")
+            return False
+        self.device = device
+        self.jid = f'{user}@{self.gateway.domain}'
+        self.send(f"<success xmlns='{NS_SASL}'/>")
+        return True
+
+    def _iq(self, elem: ET.Element) -> None:
+        iq_id = escape(elem.get('id', ''), {"'": '&apos;'})
+        bind = elem.find(f'{{{NS_BIND}}}bind')
+        if bind is not None:
+            resource = bind.findtext(f'{{{NS_BIND}}}resource') or uuid.uuid4().hex[:8]
+            self.jid = f'{self.jid.split("/")[0]}/{resource}'
+            self.send(
+                f"<iq type='result' id='{iq_id}'><bind xmlns='{NS_BIND}'>"
+                f'<jid>{escape(self.jid)}</jid></bind></iq>'
+            )
+        elif elem.find(f'{{{NS_ROSTER}}}query') is not None:
+            self.send(f"<iq type='result' id='{iq_id}' to='{escape(self.jid)}'><query xmlns='{NS_ROSTER}'/></iq>")
+        else:
+            self.send(f"<iq type='result' id='{iq_id}'/>")
+
+    async def _message(self, elem: ET.Element) -> None:
+        device = self.device
+        body = elem.findtext(f'{{{NS_CLIENT}}}body')
+        if device is None or body is None:
+            return
+        if elem.get('to', '').split('@')[0] != GATEWAY_PREFIX + device.serial_number:
+            return
+        self.gateway.requests += 1
+
+        delay = self.gateway._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        reply = self._http(device, body)
+        self.send(
+            f"<message from='{GATEWAY_PREFIX}{device.serial_number}@{self.gateway.domain}' "
+            f"to='{escape(self.jid)}' type='chat'><body>{escape(reply)}</body></message>"
+        )
+
+    @staticmethod
+    def _http(device: VirtualThermostat, body: str) -> str:
+        request_line = body.split('\n', 1)[0].split()
+        if len(request_line) < 2:
+            return 'HTTP/1.0 400 Bad Request\n\n'
+        method, path = request_line[0], request_line[1]
+
+        if method == 'GET':
+            value = device.get(path)
+            if value is None:
+                return 'HTTP/1.0 404 Not Found\n\n'
+            payload = json.dumps({'id': path, 'type': 'uiUpdate', 'value': value}, separators=(',', ':'))
+            encrypted = device.encrypt(payload)
+            return (
+                'HTTP/1.0 200 OK\n'
+                f'Content-Length: {len(encrypted)}\n'
+                'Content-Type: application/json\n'
+                'connection: close\n\n'
+                f'{encrypted}'
+            )
+
+        if method == 'PUT':
+            encrypted = body.split('\n\n', 1)[-1].strip()
+            try:
+                value = json.loads(device.decrypt(encrypted))['value']
+            except Exception:
+                return 'HTTP/1.0 400 Bad Request\n\n'
+            if not device.put(path, value):
+                return 'HTTP/1.0 400 Bad Request\n\n'
+            return 'HTTP/1.0 204 No Content\n\n'
+
+        return 'HTTP/1.0 400 Bad Request\n\n'
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Local stand-in for the Wave rrcgateway')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5222)
+    parser.add_argument(
+        '--device', action='append', default=[], metavar='SERIAL:ACCESS:PASSWORD',
+        help='Virtual thermostat to host (repeatable)',
+    )
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before each reply')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds per reply')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    latency: Latency = args.latency
+    if args.jitter:
+        latency = lambda: args.latency + random.uniform(0, args.jitter)  # nosec B311  # noqa: E731
+
+    gateway = LocalWaveGateway(args.host, args.port, latency=latency)
+    for spec in args.device:
+        serial, access, password = spec.split(':', 2)
+        gateway.add_device(serial, access, password)
+
+    async def _serve():
+        await gateway.start()
+        _LOGGER.info('Serving %d device(s) on %s:%d', len(gateway.devices), gateway.host, gateway.port)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Logging helpers for the Wave library.
+
+Everything goes through the standard ``logging`` module with %-style
+arguments, so nothing is formatted unless a handler wants the record.
+
+Failures that repeat on every poll (DNS, connect, auth, decode) go through a
+RateLimitedLog: the first occurrence is logged in full, repeats within
+REPORT_INTERVAL are only counted and folded into one summary line per
+interval, and a recovery line says how many were suppressed.
+
+Raw protocol traffic (request lines, response bodies, decoded payloads) is
+logged on the ``worcester_bosch_wave.protocol`` logger. That logger sits at
+INFO by default, so it stays quiet even when debug logging is turned on for
+the package; enable it with ``set_protocol_trace(True)`` or by setting the
+logger to DEBUG (e.g. Home Assistant's ``logger:`` configuration).
+"""
+
+import logging
+import time
+from typing import Any, Dict, Hashable, List
+
+REPORT_INTERVAL = 300  # seconds between summaries of a repeating failure
+PROTOCOL_LOGGER_NAME = 'worcester_bosch_wave.protocol'
+PROTOCOL_PREVIEW = 200  # characters of a body logged by the protocol trace
+
+PROTOCOL_LOGGER = logging.getLogger(PROTOCOL_LOGGER_NAME)
+if PROTOCOL_LOGGER.level == logging.NOTSET:
+    PROTOCOL_LOGGER.setLevel(logging.INFO)
+
+
+def set_protocol_trace(enabled: bool) -> None:
+    """Log raw protocol traffic at DEBUG (True) or keep it off (False)."""
+    PROTOCOL_LOGGER.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def protocol_trace_enabled() -> bool:
+    return PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG)
+
+
+def preview(text: Any, limit: int = PROTOCOL_PREVIEW) -> str:
+    """``text`` cut to ``limit`` characters for a log line."""
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return f'{text[:limit]}… ({len(text)} chars)'
+
+
+class RateLimitedLog:
+    """Logs each distinct failure in full once, then periodic summaries.
+
+    ``key`` identifies "the same problem" (e.g. ``('dns', host)``); callers
+    call ``resolved(key)`` once the operation succeeds again.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = REPORT_INTERVAL):
+        self.logger = logger
+        self.interval = interval
+        # key -> [time of the last line logged, occurrences since, total]
+        self._active: Dict[Hashable, List] = {}
+
+    def log(self, level: int, key: Hashable, msg: str, *args, exc_info=None) -> None:
+        now = time.monotonic()
+        state = self._active.get(key)
+        if state is None:
+            self._active[key] = [now, 0, 1]
+            self.logger.log(level, msg, *args, exc_info=exc_info)
+            return
+        state[1] += 1
+        state[2] += 1
+        elapsed = now - state[0]
+        if elapsed < self.interval:
+            return
+        if self.logger.isEnabledFor(level):
+            self.logger.log(
+                level, msg + ' (%d times in the last %.0fs, %d in total)',
+                *args, state[1], elapsed, state[2],
+            )
+        state[0] = now
+        state[1] = 0
+
+    def error(self, key: Hashable, msg: str, *args, exc_info=None) -> None:
+        self.log(logging.ERROR, key, msg, *args, exc_info=exc_info)
+
+    def warning(self, key: Hashable, msg: str, *args, exc_info=None) -> None:
+        self.log(logging.WARNING, key, msg, *args, exc_info=exc_info)
+
+    def resolved(self, key: Hashable) -> None:
+        """Forget ``key``; logs a recovery line if it had repeated."""
+        if not self._active:
+            return
+        state = self._active.pop(key, None)
+        if state is not None and state[2] > 1:
+            label = ' '.join(map(str, key)) if isinstance(key, tuple) else key
+            self.logger.info('Recovered after %d failures: %s', state[2], label)
+
+    def reset(self) -> None:
+        self._active.clear()
@@ -1,36 +1,170 @@
+import asyncio
 import base64
+import functools
+import inspect
 import json
+import socket
 import time
 import logging
 import slixmpp
 from Crypto.Cipher import AES
+from . import tracing
+from .log import PROTOCOL_LOGGER, RateLimitedLog, preview
 from .utils import get_md5
 
-from .constants import SECRET
+from .constants import CLOCK, MANUAL, OFF, ON, SECRET, XMPP_DOMAIN, XMPP_HOST, XMPP_PORT
 
 _LOGGER = logging.getLogger(__name__)
 
+# Shared by all sessions, so a thermostat that fails on every poll is
+# reported once per REPORT_INTERVAL rather than once per poll
+errors = RateLimitedLog(_LOGGER)
+
+# (phase, start mark, end mark) as recorded in WaveMessenger.marks;
+# 'submitted' is set by the client when it queues the session
+PHASES = (
+    ('queue', 'submitted', 'created'),
+    ('setup', 'created', 'ready'),
+    ('dns', 'start', 'resolved'),
+    ('connect', 'resolved', 'connected'),
+    ('sasl', 'connected', 'authenticated'),
+    ('session', 'authenticated', 'session_start'),
+    ('roster', 'session_start', 'roster'),
+    ('request', 'sent', 'response'),
+    ('teardown', 'response', 'disconnected'),
+    ('cleanup', 'disconnected', 'finished'),
+)
+
+# Child spans of a traced session, opened and closed by the same marks
+TRACE_SPANS = (
+    ('wave.dns', 'start', 'resolved'),
+    ('wave.connect', 'resolved', 'connected'),
+    ('wave.auth', 'connected', 'authenticated'),
+    ('wave.request', 'sent', 'response'),
+)
+
+# Every value the climate entity writes: 5.0-35.0 °C in 0.5 steps, plus the
+# mode/override enums. Their PUT bodies are encrypted once per AES key.
+PUT_TEMPERATURES = tuple(5.0 + 0.5 * step for step in range(61))
+PUT_ENUMS = (ON, OFF, MANUAL, CLOCK)
+PUT_TABLES = 64  # AES keys (thermostats) whose encoded payloads are kept
+
+
+def _encrypt(key, s):
+    a = AES.new(key, AES.MODE_ECB)
+    if isinstance(s, str):
+        s = s.encode('utf-8')
+    res = a.encrypt(s)
+    return base64.b64encode(res)
+
+
+def _encode_put_value(key, value):
+    """Encrypted JSON body for ``value`` and the Content-Length to send."""
+    # Build minimal JSON with proper quoting for strings
+    try:
+        j = json.dumps({"value": value}, separators=(",", ":"))
+    except Exception:
+        # Fallback to string formatting
+        if isinstance(value, str):
+            j = '{"value":"%s"}' % value
+        else:
+            j = '{"value":%s}' % value
+    remainder = len(j) % 16
+    if remainder:
+        j = j + '\x00' * (16 - remainder)
+    enc = _encrypt(key, j).decode('utf-8')
+    # Content-Length quirks: numbers worked reliably with fixed 25; strings need exact length
+    if isinstance(value, (int, float)):
+        content_length = 25
+    else:
+        content_length = len(enc)
+    return enc, content_length
+
+
+def _format_put(url, enc, content_length):
+    return (
+        'PUT {} HTTP:/1.0\n'
+        'Content-Type: application/json\n'
+        'Content-Length: {}\n'
+        'User-Agent: NefitEasy\n'
+        '\n\n\n\n{}\n'
+    ).format(url, content_length, enc)
+
+
+class PutPayloads:
+    """Encoded PUT messages for one AES key.
+
+    Bodies for PUT_TEMPERATURES and PUT_ENUMS are encrypted together on first
+    use and each finished message is kept per (url, value), so repeat writes
+    cost a dictionary lookup. Other values are encoded live every time.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        # Keyed by (type, value): 21 and 21.0 are equal but encode differently
+        self.bodies = {
+            (type(value), value): _encode_put_value(key, value)
+            for value in PUT_TEMPERATURES + PUT_ENUMS
+        }
+        self.messages = {}
+
+    def message(self, url, value):
+        if type(value) not in (float, str):
+            return _format_put(url, *_encode_put_value(self.key, value))
+        lookup = (url, type(value), value)
+        msg = self.messages.get(lookup)
+        if msg is None:
+            body = self.bodies.get(lookup[1:])
+            if body is None:
+                return _format_put(url, *_encode_put_value(self.key, value))
+            msg = self.messages[lookup] = _format_put(url, *body)
+        return msg
+
+
+@functools.lru_cache(maxsize=PUT_TABLES)
+def put_payloads(key):
+    """The shared PutPayloads for AES ``key``, built on first use."""
+    return PutPayloads(key)
+
 
 class WaveMessenger(slixmpp.ClientXMPP):
     """Low-level XMPP messenger for Worcester Bosch Wave."""
 
-    def __init__(self, serial_number, access_code, password, message):
+    def __init__(self, serial_number, access_code, password, message, host=None, port=None):
+        created = time.perf_counter()
         # Clean inputs
         serial_number = serial_number.replace(' ', '').strip('"')
         access_code = access_code.replace(' ', '').strip('"')
         password = password.strip('"')
 
-        jid = f'rrccontact_{serial_number}@wa2-mz36-qrmzh6.bosch.de'
+        jid = f'rrccontact_{serial_number}@{XMPP_DOMAIN}'
         connection_password = f'Ct7ZR03b_{access_code}'
 
-        super().__init__(jid, connection_password)
-
-        self.recipient = f'rrcgateway_{serial_number}@wa2-mz36-qrmzh6.bosch.de'
+        # Without TLS slixmpp refuses every SASL mechanism unless allowed
+        super().__init__(
+            jid,
+            connection_password,
+            plugin_config={
+                'feature_mechanisms': {
+                    'unencrypted_plain': True,
+                    'unencrypted_digest': True,
+                },
+            },
+        )
+
+        self.recipient = f'rrcgateway_{serial_number}@{XMPP_DOMAIN}'
         self.msg = message
+        self.host = host or XMPP_HOST
+        self.port = port or XMPP_PORT
+        self._addresses = []  # resolved addresses of host, see _resolve()
 
         # Bosch turned off SSL/TLS in 2018
         self.use_tls = False
         self.use_ssl = False
+        # slixmpp >= 1.8 names: otherwise a direct-TLS attempt is made first
+        self.enable_direct_tls = False
+        self.enable_starttls = False
+        self.enable_plaintext = True
         self.auto_reconnect = False
 
         # State flags
@@ -39,86 +173,140 @@ class WaveMessenger(slixmpp.ClientXMPP):
         self.message_sent = False
         self.response_received = False
         self.auth_failed = False
+        self.timed_out = False
+        self.bad_request = False
+        self.reconnects = 0
+
+        # perf_counter() timestamps of protocol milestones, see PHASES
+        self.marks = {'created': created}
+        # Session span while tracing is enabled, see TRACE_SPANS
+        self._trace = None
+        self._trace_children = {}
 
         # Event handlers
         self.add_event_handler('session_start', self._on_session_start)
+        self.add_event_handler('message', self._on_message_mark)
         self.add_event_handler('message', self.message)  # overridden in subclass
+        self.add_event_handler('auth_success', self._on_auth_success)
         self.add_event_handler('connected', self._on_connected)
         self.add_event_handler('disconnected', self._on_disconnected)
         self.add_event_handler('failed_auth', self._on_failed_auth)
         self.add_event_handler('stream_error', self._on_stream_error)
+        self.add_event_handler('reconnect_delay', self._on_reconnect_delay)
 
         # Crypto key
         abyte_1 = get_md5(access_code.encode() + SECRET)
         abyte_2 = get_md5(SECRET + password.encode())
         self.key = abyte_1 + abyte_2
+        self._mark('ready')
+
+    # ---- Timing ----
+    def _reset_marks(self):
+        self.marks = {
+            k: self.marks[k] for k in ('submitted', 'created', 'ready') if k in self.marks
+        }
+        if tracing.is_enabled():
+            request_line = (self.msg or '').split('\n', 1)[0]
+            self._trace = tracing.start_span(
+                'wave.session', attributes={'host': self.host, 'request': request_line}
+            )
+            self._trace_children = {}
+        self._mark('start')
+
+    def _mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter()
+            if self._trace is not None:
+                self._trace_mark(name)
+
+    def _trace_mark(self, name):
+        children = self._trace_children
+        for span_name, start, end in TRACE_SPANS:
+            if end == name and span_name in children:
+                children.pop(span_name).end()
+            if start == name:
+                children[span_name] = tracing.start_span(span_name, parent=self._trace)
+        if name == 'finished':
+            for child in children.values():
+                child.end()
+            children.clear()
+            trace, self._trace = self._trace, None
+            trace.set_attribute('response_received', self.response_received)
+            trace.set_attribute('auth_failed', self.auth_failed)
+            trace.set_attribute('timed_out', self.timed_out)
+            trace.end()
+
+    def phases(self):
+        """Seconds spent in each protocol phase reached during the last run."""
+        result = {}
+        for phase, start, end in PHASES:
+            if start in self.marks and end in self.marks:
+                result[phase] = self.marks[end] - self.marks[start]
+        if len(self.marks) > 1:
+            result['total'] = max(self.marks.values()) - min(self.marks.values())
+        return result
 
     # ---- Event handlers ----
     def _on_connected(self, event):
         _LOGGER.debug("XMPP connected: %s", event)
+        self._mark('connected')
+        errors.resolved(('connect', self.host))
         self.connected = True
 
     def _on_disconnected(self, event):
         _LOGGER.debug("XMPP disconnected: %s", event)
+        self._mark('disconnected')
         self.connected = False
 
+    def _on_auth_success(self, event):
+        self._mark('authenticated')
+        errors.resolved(('auth', self.recipient))
+
+    def _on_message_mark(self, msg):
+        self._mark('response')
+
     def _on_failed_auth(self, event):
-        _LOGGER.warning("XMPP authentication failed: %s", event)
+        errors.warning(('auth', self.recipient), "XMPP authentication failed for %s: %s",
+                       self.recipient, event)
         self.auth_failed = True
 
     def _on_stream_error(self, event):
-        _LOGGER.error("XMPP stream error: %s", event)
+        errors.error(('stream', self.recipient), "XMPP stream error from %s: %s",
+                     self.recipient, event)
+
+    def _on_reconnect_delay(self, event):
+        # slixmpp retries a failed connection attempt after this delay
+        self.reconnects += 1
 
     async def _on_session_start(self, event):
         _LOGGER.debug("XMPP session started")
+        self._mark('session_start')
         self.session_started = True
         self.send_presence()
         try:
             await self.get_roster()
         except Exception as e:
             _LOGGER.debug("get_roster failed: %s", e)
+        self._mark('roster')
         self._send()
 
     # ---- Messaging ----
     def _send(self):
         _LOGGER.debug("Sending message to %s", self.recipient)
+        if PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG):
+            PROTOCOL_LOGGER.debug('>> %s %s', self.recipient, preview(self.msg))
+        self._mark('sent')
         self.send_message(mto=self.recipient, mbody=self.msg, mtype='chat')
         self.message_sent = True
         _LOGGER.debug("Message sent, waiting for response…")
 
     def set_message(self, url, value):
-        # Build minimal JSON with proper quoting for strings
-        try:
-            j = json.dumps({"value": value}, separators=(",", ":"))
-        except Exception:
-            # Fallback to string formatting
-            if isinstance(value, str):
-                j = '{"value":"%s"}' % value
-            else:
-                j = '{"value":%s}' % value
-        remainder = len(j) % 16
-        if remainder:
-            j = j + '\x00' * (16 - remainder)
-        enc = self.encode(j).decode('utf-8')
-        # Content-Length quirks: numbers worked reliably with fixed 25; strings need exact length
-        if isinstance(value, (int, float)):
-            content_length = 25
-        else:
-            content_length = len(enc)
-        self.msg = (
-            'PUT {} HTTP:/1.0\n'
-            'Content-Type: application/json\n'
-            'Content-Length: {}\n'
-            'User-Agent: NefitEasy\n'
-            '\n\n\n\n{}\n'
-        ).format(url, content_length, enc)
+        if PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG):
+            PROTOCOL_LOGGER.debug('>> PUT %s %r', url, value)
+        self.msg = put_payloads(self.key).message(url, value)
 
     def encode(self, s):
-        a = AES.new(self.key, AES.MODE_ECB)
-        if isinstance(s, str):
-            s = s.encode('utf-8')
-        res = a.encrypt(s)
-        return base64.b64encode(res)
+        return _encrypt(self.key, s)
 
     def decode(self, data):
         decoded = base64.b64decode(data)
@@ -126,6 +314,39 @@ class WaveMessenger(slixmpp.ClientXMPP):
         return a.decrypt(decoded)
 
     # ---- Runner ----
+    async def _resolve(self):
+        """Look up the server up front so DNS is timed, and fails, on its own.
+
+        Every address found is kept: get_dns_records() hands them to slixmpp,
+        which tries them in order without a second lookup.
+        """
+        try:
+            infos = await self.loop.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            errors.error(('dns', self.host), "DNS lookup for %s failed: %s", self.host, e)
+            return None
+        self._mark('resolved')
+        errors.resolved(('dns', self.host))
+        # One entry per address, in the resolver's order
+        self._addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        return self._addresses
+
+    async def get_dns_records(self, domain, port=None):
+        """The addresses _resolve() found for our server, as slixmpp records."""
+        if not self._addresses:
+            return await super().get_dns_records(domain, port)
+        return [('', domain, address, self.port) for address in self._addresses]
+
+    def _start_connect(self):
+        """Begin connecting to host:port across slixmpp API generations."""
+        params = inspect.signature(super().connect).parameters
+        if 'host' in params:
+            # Without an address slixmpp asks get_dns_records() what to try
+            return super().connect()
+        # Older slixmpp takes a single address tuple
+        address = self._addresses[0] if self._addresses else self.host
+        return super().connect((address, self.port))
+
     def run(self, timeout: int = 30):
         """Blocking runner used by sync contexts.
 
@@ -138,11 +359,25 @@ class WaveMessenger(slixmpp.ClientXMPP):
         self.auth_failed = False
         self.session_started = False
         self.message_sent = False
+        self.timed_out = False
+        self.bad_request = False
+        self.reconnects = 0
+        self._reset_marks()
+
+        try:
+            resolved = self.loop.run_until_complete(
+                asyncio.wait_for(self._resolve(), timeout)
+            )
+        except asyncio.TimeoutError:
+            errors.error(('dns', self.host), "DNS lookup for %s timed out", self.host)
+            resolved = False
+        if not resolved:
+            self._mark('finished')
+            return False
 
         # Start connection; slixmpp will finalize during process()
         try:
-            # Use positional argument for broader slixmpp compatibility
-            result = super().connect(('wa2-mz36-qrmzh6.bosch.de', 5222))
+            result = self._start_connect()
             # Some slixmpp versions return a coroutine for connect(); await it on our loop
             try:
                 import asyncio as _asyncio
@@ -154,11 +389,14 @@ class WaveMessenger(slixmpp.ClientXMPP):
             except Exception:
                 success = bool(result)
         except Exception as e:
-            _LOGGER.error("Connect error: %s", e)
+            errors.error(('connect', self.host), "Connect to %s:%s failed: %s",
+                         self.host, self.port, e)
+            self._mark('finished')
             return False
 
         _LOGGER.debug("Connect initiated: %s", success)
         if not success:
+            self._mark('finished')
             return False
 
         # Enforce timeout by scheduling a disconnect after N seconds
@@ -203,14 +441,80 @@ class WaveMessenger(slixmpp.ClientXMPP):
         except Exception as e:
             _LOGGER.debug("Cleanup step encountered an error: %s", e)
 
+        self._mark('finished')
         if self.auth_failed:
-            _LOGGER.warning("Authentication failed during XMPP session")
+            _LOGGER.debug("Authentication failed during XMPP session")
             return False
 
         _LOGGER.debug("Finished processing. Response received: %s", self.response_received)
         return self.response_received
 
-    def _timeout_disconnect(self):
-        if not self.response_received and self.is_connected():
+    async def run_async(self, timeout: float = 30):
+        """Run one session on the already running event loop.
+
+        Used when many messengers share a long-lived I/O loop instead of
+        each spinning up its own loop in an executor thread. Must be called
+        from the loop the messenger was constructed on.
+        Returns True if a response was received.
+        """
+        self.response_received = False
+        self.auth_failed = False
+        self.session_started = False
+        self.message_sent = False
+        self.timed_out = False
+        self.bad_request = False
+        self.reconnects = 0
+        self._reset_marks()
+
+        started = time.monotonic()
+        try:
+            resolved = await asyncio.wait_for(self._resolve(), timeout)
+        except asyncio.TimeoutError:
+            errors.error(('dns', self.host), "DNS lookup for %s timed out", self.host)
+            resolved = False
+        if not resolved:
+            self._mark('finished')
+            return False
+        timeout = max(0.0, timeout - (time.monotonic() - started))
+
+        disconnected = self.disconnected
+        try:
+            self._start_connect()
+        except Exception as e:
+            errors.error(('connect', self.host), "Connect to %s:%s failed: %s",
+                         self.host, self.port, e)
+            self._mark('finished')
+            return False
+
+        try:
+            await asyncio.wait_for(asyncio.shield(disconnected), timeout)
+        except asyncio.TimeoutError:
             _LOGGER.debug("Timeout reached, disconnecting…")
-            self.disconnect()
+            self.timed_out = True
+            self.cancel_connection_attempt()
+            try:
+                await asyncio.wait_for(self.disconnect(wait=1), 2)
+            except Exception:
+                self.abort()
+        finally:
+            # The loop outlives this session, so stop the per-stream tasks
+            run_filters = getattr(self, '_run_out_filters', None)
+            if run_filters is not None:
+                run_filters.cancel()
+            self._mark('finished')
+
+        if self.auth_failed:
+            _LOGGER.debug("Authentication failed during XMPP session")
+            return False
+        return self.response_received
+
+    def _timeout_disconnect(self):
+        if self.response_received:
+            return
+        _LOGGER.debug("Timeout reached, disconnecting…")
+        self.timed_out = True
+        if not self.is_connected():
+            # Still connecting (e.g. host unreachable): stop retrying so the
+            # disconnected future resolves instead of waiting forever
+            self.cancel_connection_attempt()
+        self.disconnect()
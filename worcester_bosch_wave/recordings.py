@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Daily gas-usage recordings kept by the thermostat.
+
+The gateway stores one record per day (``d`` date as dd-mm-yyyy, ``ch``
+central heating and ``hw`` hot water in kWh, ``T`` outdoor temperature) in
+pages of RECORDS_PER_PAGE, read from ``/ecus/rrc/recordings/gasusage?page=N``
+(pages count from 1). ``gasusagePointer`` is the 1-based slot the next
+record goes into, so it names the page still being filled.
+
+Pages before the pointer's page never change again. GasUsageRecordings
+keeps them once read and on each sync re-reads only the pointer and the
+current page, in one session while the pointer stays on that page. The
+cache serializes to a compact JSON document (one short list per day), for
+Home Assistant's storage or a file.
+
+Usage:
+    python -m worcester_bosch_wave.recordings 123456789 AbCdEfGhIjKlMnOp pw --cache gas.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+GAS_USAGE_POINTER = '/ecus/rrc/recordings/gasusagePointer'
+GAS_USAGE_PAGE = '/ecus/rrc/recordings/gasusage?page={}'
+RECORDS_PER_PAGE = 32
+PAGES_PER_SESSION = 8  # page reads batched into one session while backfilling
+CACHE_VERSION = 1
+
+
+def page_path(page: int) -> str:
+    return GAS_USAGE_PAGE.format(page)
+
+
+def page_of(pointer: int) -> int:
+    """Page the record slot ``pointer`` (1-based) falls on."""
+    return (max(pointer, 1) - 1) // RECORDS_PER_PAGE + 1
+
+
+def parse_record(entry: Any) -> Optional[list]:
+    """``[iso date, ch, hw, T]`` for a recording entry; None for empty slots.
+
+    Unused slots carry an impossible date such as ``255-256-65535``.
+    """
+    if not isinstance(entry, dict):
+        return None
+    try:
+        day = datetime.strptime(str(entry['d']), '%d-%m-%Y').date()
+        return [
+            day.isoformat(),
+            round(float(entry.get('ch', 0.0)), 3),
+            round(float(entry.get('hw', 0.0)), 3),
+            round(float(entry['T']), 1) if entry.get('T') is not None else None,
+        ]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class GasUsageRecordings:
+    """Pages of gas-usage recordings read so far, and which are final."""
+
+    def __init__(self):
+        self.pointer: Optional[int] = None
+        self.pages: Dict[int, List[list]] = {}
+        self.complete: Set[int] = set()  # pages read after they filled up
+
+    # ---- Cache ----
+    def store_page(self, page: int, entries: Any, pointer: int) -> None:
+        """Keep ``entries`` read for ``page`` while the pointer stood at ``pointer``."""
+        rows = [row for row in map(parse_record, entries or ()) if row is not None]
+        self.pages[page] = rows
+        if page < page_of(pointer):
+            self.complete.add(page)
+        else:
+            self.complete.discard(page)
+
+    def missing_pages(self, pointer: int) -> List[int]:
+        """Pages to read at ``pointer``: the current one and any not final yet."""
+        return [page for page in range(1, page_of(pointer) + 1) if page not in self.complete]
+
+    def _set_pointer(self, pointer: int) -> None:
+        if self.pointer is not None and pointer < self.pointer:
+            # The gateway wrapped around or was reset: nothing is final any more
+            self.complete.clear()
+        self.pointer = pointer
+
+    def days(self) -> List[list]:
+        """``[iso date, ch, hw, T]`` per recorded day, oldest first."""
+        by_day = {}
+        for page in sorted(self.pages):
+            for row in self.pages[page]:
+                by_day[row[0]] = row
+        return [by_day[day] for day in sorted(by_day)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'version': CACHE_VERSION,
+            'pointer': self.pointer,
+            'complete': sorted(self.complete),
+            'pages': {str(page): rows for page, rows in self.pages.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'GasUsageRecordings':
+        recordings = cls()
+        if not data or data.get('version') != CACHE_VERSION:
+            return recordings
+        recordings.pointer = data.get('pointer')
+        recordings.pages = {int(page): rows for page, rows in (data.get('pages') or {}).items()}
+        recordings.complete = set(data.get('complete') or ()) & set(recordings.pages)
+        return recordings
+
+    @classmethod
+    def load(cls, path: str) -> 'GasUsageRecordings':
+        try:
+            with open(path) as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, path: str) -> None:
+        """Write the cache to ``path`` atomically."""
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self.as_dict(), f, separators=(',', ':'))
+        os.replace(temporary, path)
+
+    # ---- Fetching ----
+    async def sync(self, client, pages_per_session: int = PAGES_PER_SESSION) -> Optional[List[str]]:
+        """Read the pages that can have changed through ``client``.
+
+        Returns the dates of days added or changed, or None when the pointer
+        could not be read. Pages that do not answer are retried next sync.
+        """
+        before = {row[0]: row for row in self.days()}
+        # Usually the pointer is still on the page read last time, and one
+        # session covers both
+        paths = [GAS_USAGE_POINTER]
+        guess = page_of(self.pointer) if self.pointer else None
+        if guess is not None:
+            paths.append(page_path(guess))
+        values = await client.read_endpoints(paths)
+        try:
+            pointer = int(values[GAS_USAGE_POINTER])
+        except (KeyError, TypeError, ValueError):
+            return None
+        self._set_pointer(pointer)
+        fetched = set()
+        if guess is not None and page_path(guess) in values:
+            self.store_page(guess, values[page_path(guess)], pointer)
+            fetched.add(guess)
+
+        missing = [page for page in self.missing_pages(pointer) if page not in fetched]
+        for start in range(0, len(missing), pages_per_session):
+            chunk = missing[start:start + pages_per_session]
+            values = await client.read_endpoints([page_path(page) for page in chunk])
+            for page in chunk:
+                if page_path(page) in values:
+                    self.store_page(page, values[page_path(page)], pointer)
+
+        return [row[0] for row in self.days() if before.get(row[0]) != row]
+
+
+async def _run(args) -> int:
+    from .wave_client import WorcesterWaveClient
+
+    recordings = GasUsageRecordings.load(args.cache) if args.cache else GasUsageRecordings()
+    client = WorcesterWaveClient(
+        args.serial_number, args.access_code, args.password, host=args.server, port=args.port,
+    )
+    changed = await recordings.sync(client)
+    if changed is None:
+        print('Could not read the gas usage pointer', file=sys.stderr)
+        return 1
+    if args.cache:
+        recordings.save(args.cache)
+    print(f'{len(changed)} day(s) new or changed, {client.counters["sessions"]} session(s)',
+          file=sys.stderr)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(('date', 'central_heating_kwh', 'hot_water_kwh', 'outdoor_temperature'))
+    for row in recordings.days():
+        if args.all or row[0] in changed:
+            writer.writerow(row)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Read Worcester Bosch Wave gas-usage recordings')
+    parser.add_argument('serial_number')
+    parser.add_argument('access_code')
+    parser.add_argument('password')
+    parser.add_argument('--cache', help='JSON file keeping pages already read')
+    parser.add_argument('--all', action='store_true', help='Print every day, not just new ones')
+    parser.add_argument('--server', help='XMPP server override, e.g. a local gateway')
+    parser.add_argument('--port', type=int, help='XMPP server port')
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Boiler runtime and duty cycle from BAI (boiler activity) samples.
+
+BAI reads ``No``, ``CH`` (central heating) or ``HW`` (hot water). Each
+sample closes the interval since the previous one, which is credited to the
+state seen at its start, so every update costs O(1) no matter how long the
+history. Intervals longer than MAX_GAP (an outage, a restart) are not
+credited to either state, since nobody knows what the boiler did
+meanwhile; the duty cycles count them as off.
+
+Rolling duty cycles use fixed time buckets: on-time is added to the bucket
+it fell in and buckets leaving the window are subtracted from a running
+total. The oldest bucket is dropped whole, so a window can be off by up to
+one bucket's length of on-time.
+
+The accumulator round-trips through ``as_dict()``/``from_dict()`` so it can
+be persisted and survive restarts.
+"""
+
+import math
+import time
+from array import array
+from typing import Any, Dict, Optional
+
+ACTIVE_STATES = ('CH', 'HW')
+MAX_GAP = 900  # seconds; longer gaps between samples are not credited
+
+
+def _day(at: float) -> str:
+    return time.strftime('%Y-%m-%d', time.localtime(at))
+
+
+class RollingOnTime:
+    """On-time within a trailing window, kept in ``buckets`` time buckets."""
+
+    def __init__(self, window: float, buckets: int):
+        self.window = float(window)
+        self.width = self.window / buckets
+        self._buckets = array('d', bytes(8 * buckets))
+        self._head: Optional[int] = None  # absolute number of the newest bucket
+        self._total = 0.0
+        self.started: Optional[float] = None  # first time covered
+
+    def _advance(self, at: float) -> None:
+        """Move the window so it ends at ``at``, dropping expired buckets."""
+        number = int(at // self.width)
+        if self._head is None:
+            self._head = number
+            return
+        if number <= self._head:
+            return
+        size = len(self._buckets)
+        if number - self._head >= size:
+            self._buckets = array('d', bytes(8 * size))
+            self._total = 0.0
+        else:
+            for absolute in range(self._head + 1, number + 1):
+                slot = absolute % size
+                self._total -= self._buckets[slot]
+                self._buckets[slot] = 0.0
+        self._head = number
+
+    def add(self, start: float, end: float, on: bool) -> None:
+        """Account for the interval ``start``..``end``; on-time if ``on``."""
+        if self.started is None:
+            self.started = start
+        self._advance(end)
+        if not on:
+            return
+        size = len(self._buckets)
+        # Only buckets still in the window can take time
+        start = max(start, (self._head - size + 1) * self.width)
+        while start < end:
+            number = int(start // self.width)
+            boundary = min(end, (number + 1) * self.width)
+            seconds = boundary - start
+            self._buckets[number % size] += seconds
+            self._total += seconds
+            start = boundary
+
+    def seconds(self, now: float) -> float:
+        """On-time within the window ending at ``now``."""
+        if self._head is not None:
+            self._advance(now)
+        return max(0.0, self._total)
+
+    def duty(self, now: float) -> Optional[float]:
+        """Fraction (0..1) of the window, or of the time observed so far, spent on."""
+        if self.started is None:
+            return None
+        covered = min(self.window, now - self.started)
+        if covered <= 0:
+            return None
+        return min(1.0, self.seconds(now) / covered)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'head': self._head,
+            'started': self.started,
+            'buckets': list(self._buckets),
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        buckets = data.get('buckets') or []
+        if len(buckets) != len(self._buckets):
+            return
+        self._buckets = array('d', (float(value) for value in buckets))
+        self._total = math.fsum(self._buckets)
+        self._head = data.get('head')
+        self.started = data.get('started')
+
+
+class BoilerRuntime:
+    """Boiler on-time today (split into CH and HW) and 1 h / 24 h duty cycles."""
+
+    def __init__(self, max_gap: float = MAX_GAP):
+        self.max_gap = max_gap
+        self.state: Optional[str] = None
+        self.updated_at: Optional[float] = None
+        self.day: Optional[str] = None
+        self.today: Dict[str, float] = {state: 0.0 for state in ACTIVE_STATES}
+        self.hour = RollingOnTime(3600, 60)
+        self.day_window = RollingOnTime(86400, 96)
+
+    def update(self, state: Optional[str], at: Optional[float] = None,
+               day: Optional[str] = None) -> None:
+        """Record a BAI sample ``state`` taken at ``at`` (unix time).
+
+        ``day`` names the calendar day ``at`` falls on (default: local
+        date); today's totals restart when it changes. An interval spanning
+        midnight counts towards the new day.
+        """
+        at = time.time() if at is None else at
+        day = _day(at) if day is None else day
+        if day != self.day:
+            self.day = day
+            self.today = {key: 0.0 for key in ACTIVE_STATES}
+        previous, since = self.state, self.updated_at
+        if since is not None and 0 < at - since <= self.max_gap:
+            on = previous in ACTIVE_STATES
+            if on:
+                self.today[previous] += at - since
+            self.hour.add(since, at, on)
+            self.day_window.add(since, at, on)
+        self.state = state
+        self.updated_at = at
+
+    @property
+    def on_today(self) -> float:
+        """Seconds the boiler was on today."""
+        return sum(self.today.values())
+
+    def duty_cycle(self, window: str, now: Optional[float] = None) -> Optional[float]:
+        """Percentage of the ``'hour'`` or ``'day'`` window the boiler was on."""
+        rolling = self.hour if window == 'hour' else self.day_window
+        duty = rolling.duty(time.time() if now is None else now)
+        return None if duty is None else 100 * duty
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'updated_at': self.updated_at,
+            'day': self.day,
+            'today': dict(self.today),
+            'hour': self.hour.as_dict(),
+            'day_window': self.day_window.as_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_gap: float = MAX_GAP) -> 'BoilerRuntime':
+        runtime = cls(max_gap)
+        runtime.state = data.get('state')
+        runtime.updated_at = data.get('updated_at')
+        runtime.day = data.get('day')
+        today = data.get('today') or {}
+        runtime.today = {key: float(today.get(key, 0.0)) for key in ACTIVE_STATES}
+        runtime.hour.restore(data.get('hour') or {})
+        runtime.day_window.restore(data.get('day_window') or {})
+        return runtime
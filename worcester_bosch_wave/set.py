@@ -1,33 +1,113 @@
+import json
+import logging
+
+from .log import PROTOCOL_LOGGER, RateLimitedLog, preview
 from .messenger import WaveMessenger
 
+_LOGGER = logging.getLogger(__name__)
+
+errors = RateLimitedLog(_LOGGER)
+
 
 class WaveSet(WaveMessenger):
     current_temp = None
     set_point = None
     is_boiler_on = None
 
-    def __init__(self, serial_number, access_code, password):
-        super().__init__(serial_number, access_code, password, '')
+    def __init__(self, serial_number, access_code, password, host=None, port=None):
+        super().__init__(serial_number, access_code, password, '', host=host, port=port)
 
     def message(self, msg):
         """
         Process a message once it has been received
         """
         body = msg.get('body', '')
+        if PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG):
+            PROTOCOL_LOGGER.debug('<< %s', preview(body))
         if 'No Content' in body or 'OK' in body:
             # Successful PUT responses often return 204 No Content
             self.response_received = True
+            errors.resolved(('bad_request', self.recipient))
             self.disconnect()
         elif 'Bad Request' in body or '400' in body:
             # Log and disconnect; let caller interpret as failure
-            try:
-                import logging
-                logging.getLogger(__name__).warning('WaveSet Bad Request response: %s', body[:120])
-            except Exception:
-                pass
+            errors.warning(
+                ('bad_request', self.recipient), 'Bad Request from %s: %s',
+                self.recipient, preview(body, 120),
+            )
             self.response_received = False
+            self.bad_request = True
             self.disconnect()
 
     def post_message(self, url, value):
         self.set_message(url, value)
         return self.run()
+
+    async def post_message_async(self, url, value, timeout=30):
+        self.set_message(url, value)
+        return await self.run_async(timeout=timeout)
+
+
+class WaveBatch(WaveMessenger):
+    """Runs a request plan (WriteTransaction or ReadBatch): several requests,
+    one after another, in one session."""
+
+    def __init__(self, serial_number, access_code, password, host=None, port=None):
+        super().__init__(serial_number, access_code, password, '', host=host, port=port)
+        self.transaction = None
+
+    def _set_request(self, request):
+        method, path, value = request
+        if method == 'GET':
+            self.msg = f'GET {path} HTTP/1.0\nUser-Agent: NefitEasy'
+        else:
+            self.set_message(path, value)
+
+    def _decode_value(self, body):
+        parts = body.split('\n\n')
+        if len(parts) < 2 or not parts[1].strip():
+            return None
+        try:
+            data = self.decode(parts[1].strip()).replace(b'\x00', b'').decode('utf-8')
+            return json.loads(data)['value']
+        except Exception as e:
+            errors.warning(
+                ('decode', self.recipient), 'Could not decode reply from %s: %s', self.recipient, e,
+            )
+            return None
+
+    def message(self, msg):
+        """
+        Hand each reply to the plan and send the request it asks for next
+        """
+        transaction = self.transaction
+        body = msg.get('body', '')
+        if PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG):
+            PROTOCOL_LOGGER.debug('<< %s', preview(body))
+        status_line = body.split('\n', 1)[0].split()
+        code = status_line[1] if len(status_line) > 1 else ''
+        ok = code in ('200', '204')
+        value = self._decode_value(body) if code == '200' else None
+        if code == '400':
+            self.bad_request = True
+            errors.warning(
+                ('bad_request', self.recipient), 'Bad Request from %s: %s',
+                self.recipient, preview(body, 120),
+            )
+        request = transaction.reply(ok, value)
+        if request is not None:
+            self._set_request(request)
+            self._send()
+            return
+        self.response_received = True
+        self.disconnect()
+
+    def run_transaction(self, transaction, timeout=30):
+        self.transaction = transaction
+        self._set_request(transaction.first())
+        return self.run(timeout=timeout)
+
+    async def run_transaction_async(self, transaction, timeout=30):
+        self.transaction = transaction
+        self._set_request(transaction.first())
+        return await self.run_async(timeout=timeout)
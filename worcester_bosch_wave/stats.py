@@ -0,0 +1,57 @@
+"""
+Rolling timing statistics for Wave sessions.
+"""
+
+import math
+from collections import deque
+from typing import Optional, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linearly interpolated percentile of ``values`` (0 <= pct <= 100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return math.nan
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class RollingHistogram:
+    """The last ``size`` samples of one measurement, summarized on demand.
+
+    Memory is fixed at ``size`` floats; percentiles sort the window when
+    asked, which is cheap at the window sizes used here (~100).
+    """
+
+    def __init__(self, size: int = 100):
+        self._samples = deque(maxlen=size)
+        self.count = 0  # samples ever added, including evicted ones
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        return percentile(self._samples, pct)
+
+    @property
+    def max(self) -> Optional[float]:
+        return max(self._samples) if self._samples else None
+
+    def summary(self, scale: float = 1000.0, digits: int = 1) -> dict:
+        """p50/p95/max of the window, in milliseconds by default."""
+        if not self._samples:
+            return {'p50': None, 'p95': None, 'max': None, 'samples': 0}
+        return {
+            'p50': round(self.percentile(50) * scale, digits),
+            'p95': round(self.percentile(95) * scale, digits),
+            'max': round(self.max * scale, digits),
+            'samples': len(self._samples),
+        }
@@ -1,11 +1,61 @@
 import json
+import logging
+import re
 
+from . import tracing
+from .constants import UI_STATUS_PATH
+from .log import PROTOCOL_LOGGER, RateLimitedLog, preview
 from .messenger import WaveMessenger
 from .utils import parse_on_off
 
+_LOGGER = logging.getLogger(__name__)
+
+errors = RateLimitedLog(_LOGGER)
+
+# Keys whose values change on every response (the thermostat's clock) even
+# when nothing else has
+VOLATILE_KEYS = ('CTD',)
+_VOLATILE = re.compile(
+    rb'"(' + b'|'.join(re.escape(key.encode()) for key in VOLATILE_KEYS) + rb')"\s*:\s*"([^"]*)"'
+)
+
+# How a response compared with the previous one to the same path
+MATCH_BODY = 'body'  # identical encrypted body: nothing decoded
+MATCH_MASKED = 'masked'  # only volatile keys differ: not JSON-parsed
+MATCH_NONE = None
+
+
+class LastResponse:
+    """A decoded response, kept to recognise repeats of it cheaply.
+
+    ``body`` is the encrypted (base64) body as received and ``masked`` the
+    decrypted payload with VOLATILE_KEYS removed. ``data`` is shared with
+    whoever reads the response and must not be modified.
+    """
+
+    __slots__ = ('body', 'masked', 'data')
+
+    def __init__(self, body: str, masked: bytes, data):
+        self.body = body
+        self.masked = masked
+        self.data = data
+
+
+def _with_volatile(data, payload: bytes):
+    """``data`` with the volatile keys' values taken from ``payload``."""
+    if not isinstance(data, dict):
+        return data
+    data = dict(data)
+    for match in _VOLATILE.finditer(payload):
+        data[match.group(1).decode()] = match.group(2).decode('utf-8')
+    return data
+
 
 class WaveStatus(WaveMessenger):
     data = None
+    # LastResponse for this session's reply, and how it matched ``previous``
+    last_response = None
+    match = MATCH_NONE
 
     current_switch_point = None
     current_temp = None
@@ -19,65 +69,96 @@ class WaveStatus(WaveMessenger):
     set_point = None
     temp_override_duration = None
 
-    def __init__(self, serial_number, access_code, password):
+    def __init__(self, serial_number, access_code, password, path=UI_STATUS_PATH,
+                 host=None, port=None, previous=None):
+        """
+        :param previous: LastResponse to the same path from an earlier
+            session; a reply that repeats it skips decoding
+        """
+        self.path = path
+        self.previous = previous
         super().__init__(
             serial_number,
             access_code,
             password,
-            'GET /ecus/rrc/uiStatus HTTP/1.0\nUser-Agent: NefitEasy',
+            f'GET {path} HTTP/1.0\nUser-Agent: NefitEasy',
+            host=host,
+            port=port,
         )
 
     def message(self, msg):
         """
         Process a message once it has been received
         """
-        print(f"📨 Received message: {msg}")
-        print(f"📝 Message body: {msg['body'][:200]}...")
-        
-        spl = str(msg['body']).split('\n\n')
-        print(f"🔍 Split parts: {len(spl)} parts")
-        
+        body = str(msg['body'])
+        if PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG):
+            PROTOCOL_LOGGER.debug('<< %s %s', self.path, preview(body))
+
+        spl = body.split('\n\n')
         if len(spl) < 2:
             # Invalid message
-            print("❌ Invalid message - less than 2 parts")
+            errors.warning(
+                ('invalid', self.recipient, self.path),
+                'Invalid response to %s from %s: %s', self.path, self.recipient, preview(body, 80),
+            )
             return
         else:
             to_decode = spl[1].strip()
-            print(f"🔐 To decode: {len(to_decode)} characters")
+            previous = self.previous
+
+            # A byte-identical body decodes to the same value as last time
+            if previous is not None and to_decode == previous.body:
+                self._accept(previous, MATCH_BODY)
+                return
 
             # Decode the encrypted message
-            try:
-                data = self.decode(to_decode)
-                print(f"🔓 Decoded bytes: {len(data)} bytes")
-
-                # For some reason we have a load of null characters at the end
-                # of the message, so strip these out
-                data = data.replace(b'\x00', b'')
-                print(f"🧹 After null removal: {len(data)} bytes")
-
-                # 'decode' from bytes to str, with UTF-8 encoding
-                # (a different sort of 'decode' to above!)
-                data = data.decode('utf-8')
-                print(f"📄 UTF-8 decoded: {len(data)} characters")
-                
-                if len(data) > 0:
-                    json_data = json.loads(data)
-                    print(f"📋 JSON parsed successfully")
-                    
-                    self.data = json_data['value']
-                    print(f"✅ Final data extracted")
-                    self.set_updated_values(self.data)
-                    
-                    # Mark that we received a response
-                    self.response_received = True
-                    
-                    self.disconnect()
-                else:
-                    print("❌ Empty data after decoding")
-            except Exception as e:
-                print(f"❌ Decoding error: {e}")
-                import traceback
-                traceback.print_exc()
+            with tracing.span('wave.decode', parent=self._trace) as span:
+                try:
+                    payload = self.decode(to_decode)
+
+                    # For some reason we have a load of null characters at the end
+                    # of the message, so strip these out
+                    payload = payload.replace(b'\x00', b'')
+
+                    if len(payload) > 0:
+                        if PROTOCOL_LOGGER.isEnabledFor(logging.DEBUG):
+                            PROTOCOL_LOGGER.debug('<< %s decoded: %s', self.path, preview(payload))
+
+                        # Same payload apart from the clock: reuse the parsed value
+                        masked = _VOLATILE.sub(b'', payload)
+                        if previous is not None and masked == previous.masked:
+                            data = _with_volatile(previous.data, payload)
+                            self._accept(LastResponse(to_decode, masked, data), MATCH_MASKED)
+                            span.set_attribute('match', MATCH_MASKED)
+                            return
+
+                        # 'decode' from bytes to str, with UTF-8 encoding
+                        # (a different sort of 'decode' to above!)
+                        json_data = json.loads(payload.decode('utf-8'))
+                        self._accept(LastResponse(to_decode, masked, json_data['value']), MATCH_NONE)
+                    else:
+                        _LOGGER.debug('Empty payload for %s after decoding', self.path)
+                except Exception as e:
+                    span.record_exception(e)
+                    errors.error(
+                        ('decode', self.recipient, self.path),
+                        'Could not decode response to %s: %s', self.path, e, exc_info=True,
+                    )
+
+    def _accept(self, response, match):
+        """Take ``response`` as this session's result and end the session."""
+        self.last_response = response
+        self.match = match
+        self.data = response.data
+        # Only uiStatus carries the flat key/value payload
+        if self.path == UI_STATUS_PATH:
+            self.set_updated_values(self.data)
+
+        # Mark that we received a response
+        self.response_received = True
+        errors.resolved(('decode', self.recipient, self.path))
+
+        self.disconnect()
 
     def set_updated_values(self, data):
         # Temperature set point (ie. temperature it is aiming for)
@@ -109,5 +190,8 @@ class WaveStatus(WaveMessenger):
         elif data['BAI'] == 'CH' or data['BAI'] == 'HW':
             self.is_boiler_on = True
 
-    def update(self):
-        self.run()
+    def update(self, timeout=30):
+        return self.run(timeout=timeout)
+
+    async def update_async(self, timeout=30):
+        return await self.run_async(timeout=timeout)
@@ -0,0 +1,32 @@
+"""
+Shared setup for the library's unit tests.
+
+The repository root is the Home Assistant integration package, so pytest
+would import its ``__init__.py`` (and Home Assistant) to set up every test
+below it. The directories above the tests are collected as plain
+directories instead; the tests import the library from the repository root
+(``pythonpath`` in pyproject.toml).
+
+A conftest's hooks only apply below it, while the directories in question
+are above, so the hook is registered as a global plugin.
+"""
+
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class PlainDirectories:
+    """Collect the repository's package directories without importing them."""
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collect_directory(self, path, parent):
+        if path == ROOT or ROOT in path.parents:
+            return pytest.Dir.from_parent(parent, path=path)
+        return None
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(PlainDirectories(), 'worcester-wave-plain-directories')
@@ -0,0 +1,65 @@
+"""Tests for the tiered endpoint cache."""
+
+from worcester_bosch_wave.cache import CacheTier, TieredCache
+
+
+def _cache(**kwargs):
+    return TieredCache(
+        [CacheTier('live', '/live', 30), CacheTier('program', '/program', 3600, 'PROGRAM')],
+        clock=lambda: 0.0,
+        **kwargs,
+    )
+
+
+def test_tiers_expire_on_their_own_cadence():
+    cache = _cache()
+    assert [tier.name for tier in cache.expired(0)] == ['live', 'program']
+    cache.store('live', {'IHT': '20.0'}, now=0)
+    cache.store('program', 2, now=0)
+    assert cache.expired(10) == []
+    # Slack lets a poll at exactly the TTL through
+    assert [tier.name for tier in cache.expired(29.5)] == ['live']
+    assert [tier.name for tier in cache.expired(3600)] == ['live', 'program']
+    assert cache.min_ttl == 30
+
+
+def test_merged_view():
+    cache = _cache()
+    cache.store('live', {'IHT': '20.0'}, now=0)
+    cache.store('program', 2, now=0)
+    assert cache.merged() == {'IHT': '20.0', 'PROGRAM': 2}
+    assert cache.patch('live', {'TSP': '21.0'})
+    assert cache.merged() == {'IHT': '20.0', 'TSP': '21.0', 'PROGRAM': 2}
+    assert not cache.patch('program', {'x': 1})
+
+
+def test_failing_tier_backs_off_and_keeps_its_value():
+    cache = _cache(max_backoff=4 * 3600)
+    cache.store('program', 2, now=0)
+    cache.fail('program', now=3600)
+    assert cache['program'].retry_after == 7200
+    assert cache.merged() == {'PROGRAM': 2}
+    assert cache['program'] not in cache.expired(3600 + 3600)
+    assert cache['program'] in cache.expired(3600 + 7200)
+
+    cache.fail('program', now=10800)
+    assert cache['program'].retry_after == 4 * 3600
+    cache.fail('program', now=25200)
+    # Capped at max_backoff
+    assert cache['program'].retry_after == 4 * 3600
+
+
+def test_answer_resets_the_backoff():
+    cache = _cache()
+    cache.fail('program', now=0)
+    cache.fail('program', now=7200)
+    cache.store('program', 3, now=21600)
+    assert cache['program'].failures == 0
+    assert cache['program'].retry_after == 3600
+
+
+def test_invalidate_forces_a_fetch():
+    cache = _cache()
+    cache.store('live', {}, now=0)
+    cache.invalidate('live')
+    assert cache['live'] in cache.expired(1)
@@ -0,0 +1,56 @@
+"""Tests for the ring-buffer status history."""
+
+import pytest
+
+from worcester_bosch_wave.history import StatusHistory
+
+
+def _status(temperature, bai='No'):
+    return {'IHT': f'{temperature:.2f}', 'TSP': '21.0', 'BAI': bai, 'TOD': '0'}
+
+
+def test_ring_keeps_the_newest_samples():
+    history = StatusHistory(capacity=3)
+    for minute in range(5):
+        history.append(_status(20 + minute), at=60 * minute)
+    assert len(history) == 3
+    assert history.count == 5
+    assert history.latest('IHT') == 24.0
+    stats = history.window('IHT', 3600, now=240)
+    assert (stats['min'], stats['max'], stats['samples']) == (22.0, 24.0, 3)
+
+
+def test_window_statistics_and_slope():
+    history = StatusHistory(capacity=100)
+    # Rising 1 °C per hour, sampled every 15 minutes
+    for step in range(5):
+        history.append(_status(20 + step / 4), at=900 * step)
+    stats = history.window('IHT', 3600, now=3600)
+    assert stats['samples'] == 5
+    assert stats['span'] == 3600
+    assert stats['mean'] == pytest.approx(20.5)
+    assert stats['slope'] == pytest.approx(1.0)
+    # Only the last half hour
+    assert history.window('IHT', 1800, now=3600)['samples'] == 3
+
+
+def test_missing_values_are_skipped():
+    history = StatusHistory(capacity=10)
+    history.append({'IHT': 'n/a', 'BAI': 'CH'}, at=0)
+    assert history.latest('IHT') is None
+    assert history.latest('BAI') == 1.0
+    assert history.window('IHT', 60, now=0) is None
+
+
+def test_clock_stepping_back_keeps_times_ordered():
+    history = StatusHistory(capacity=10)
+    history.append(_status(20), at=100)
+    history.append(_status(21), at=50)
+    stats = history.window('IHT', 10, now=100)
+    assert stats['samples'] == 2
+    assert stats['slope'] is None
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        StatusHistory(capacity=0)
@@ -0,0 +1,74 @@
+"""Tests for the shared I/O loop."""
+
+import asyncio
+import threading
+
+from worcester_bosch_wave.io_loop import WaveIOLoop
+from worcester_bosch_wave.local_gateway import LocalWaveGateway
+from worcester_bosch_wave.wave_client import WorcesterWaveClient
+
+ACCESS_CODE = 'AbCdEfGhIjKlMnOp'
+PASSWORD = 'secret'
+
+
+def test_start_and_stop():
+    io_loop = WaveIOLoop(name='wave-test-io')
+    io_loop.start()
+    loop = io_loop.loop
+    io_loop.start()  # idempotent
+    assert io_loop.is_running and io_loop.loop is loop
+
+    async def thread_name():
+        return threading.current_thread().name
+
+    assert asyncio.run(io_loop.run(thread_name)) == 'wave-test-io'
+    io_loop.stop()
+    assert not io_loop.is_running
+    assert io_loop.loop is None
+
+
+def test_submit_starts_the_loop():
+    io_loop = WaveIOLoop()
+
+    async def answer():
+        return 42
+
+    try:
+        assert io_loop.submit(answer).result(timeout=5) == 42
+    finally:
+        io_loop.stop()
+
+
+def test_clients_share_the_session_cap():
+    peak = 0
+
+    async def main():
+        io_loop = WaveIOLoop(max_sessions=2, name='wave-test-io')
+        gateway = LocalWaveGateway()
+
+        def latency():
+            # Called while answering a request, i.e. inside a session
+            nonlocal peak
+            peak = max(peak, gateway.active_sessions)
+            return 0.05
+
+        gateway.latency = latency
+        try:
+            async with gateway:
+                clients = []
+                for index in range(6):
+                    serial = f'10000000{index}'
+                    gateway.add_device(serial, ACCESS_CODE, PASSWORD)
+                    clients.append(WorcesterWaveClient(
+                        serial, ACCESS_CODE, PASSWORD,
+                        io_loop=io_loop, host=gateway.host, port=gateway.port,
+                    ))
+                results = await asyncio.gather(*(client.get_status() for client in clients))
+                assert all(results)
+                assert gateway.sessions == 6
+                assert io_loop.active_sessions == io_loop.queued_sessions == 0
+        finally:
+            io_loop.stop()
+
+    asyncio.run(main())
+    assert peak == 2
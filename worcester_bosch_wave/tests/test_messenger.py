@@ -0,0 +1,53 @@
+"""Tests for the pre-encoded PUT payloads."""
+
+import base64
+import json
+
+from Crypto.Cipher import AES
+
+from worcester_bosch_wave.messenger import _encode_put_value, put_payloads
+
+KEY = bytes(range(32))
+URL = '/heatingCircuits/hc1/temperatureRoomManual'
+
+
+def _body(message):
+    encoded = message.rstrip('\n').rsplit('\n', 1)[-1]
+    raw = AES.new(KEY, AES.MODE_ECB).decrypt(base64.b64decode(encoded))
+    return json.loads(raw.rstrip(b'\x00'))
+
+
+def test_tables_are_shared_per_key():
+    assert put_payloads(KEY) is put_payloads(KEY)
+    assert put_payloads(KEY) is not put_payloads(bytes(32))
+
+
+def test_table_values_match_live_encoding():
+    payloads = put_payloads(KEY)
+    message = payloads.message(URL, 21.5)
+    assert message is payloads.message(URL, 21.5)
+    assert _body(message) == {'value': 21.5}
+    assert message.endswith(_encode_put_value(KEY, 21.5)[0] + '\n')
+    assert 'Content-Length: 25\n' in message
+
+
+def test_int_and_float_encode_differently():
+    payloads = put_payloads(KEY)
+    assert _body(payloads.message(URL, 21)) == {'value': 21}
+    assert _body(payloads.message(URL, 21.0)) == {'value': 21.0}
+    assert payloads.message(URL, 21) != payloads.message(URL, 21.0)
+
+
+def test_values_outside_the_table_are_encoded_live():
+    payloads = put_payloads(KEY)
+    message = payloads.message(URL, 21.25)
+    assert _body(message) == {'value': 21.25}
+    assert (URL, float, 21.25) not in payloads.messages
+
+
+def test_enums():
+    payloads = put_payloads(KEY)
+    message = payloads.message('/heatingCircuits/hc1/usermode', 'manual')
+    assert _body(message) == {'value': 'manual'}
+    encoded = message.rstrip('\n').rsplit('\n', 1)[-1]
+    assert f'Content-Length: {len(encoded)}\n' in message
@@ -0,0 +1,107 @@
+"""Tests for the gas-usage recordings cache."""
+
+import asyncio
+from datetime import date, timedelta
+
+from worcester_bosch_wave.recordings import (
+    GAS_USAGE_POINTER,
+    RECORDS_PER_PAGE,
+    GasUsageRecordings,
+    page_of,
+    page_path,
+)
+
+
+def _entry(day):
+    """Recording for the ``day``-th day of 2026 (1-based)."""
+    recorded = date(2026, 1, 1) + timedelta(days=day - 1)
+    return {'d': recorded.strftime('%d-%m-%Y'), 'ch': 1.5, 'hw': 0.5, 'T': 10.0}
+
+
+class FakeClient:
+    """Answers read_endpoints() from a dict and counts the sessions."""
+
+    def __init__(self, values):
+        self.values = values
+        self.sessions = []
+
+    async def read_endpoints(self, paths):
+        self.sessions.append(list(paths))
+        return {path: self.values[path] for path in paths if path in self.values}
+
+
+def test_page_of():
+    assert page_of(1) == 1
+    assert page_of(RECORDS_PER_PAGE) == 1
+    assert page_of(RECORDS_PER_PAGE + 1) == 2
+    assert page_of(0) == 1
+
+
+def test_pages_before_the_pointer_are_final():
+    recordings = GasUsageRecordings()
+    pointer = 2 * RECORDS_PER_PAGE + 5  # filling page 3
+    recordings._set_pointer(pointer)
+    assert recordings.missing_pages(pointer) == [1, 2, 3]
+    for page in (1, 2, 3):
+        recordings.store_page(page, [_entry(page)], pointer)
+    assert recordings.complete == {1, 2}
+    assert recordings.missing_pages(pointer) == [3]
+
+
+def test_wrap_around_makes_every_page_missing_again():
+    recordings = GasUsageRecordings()
+    pointer = 3 * RECORDS_PER_PAGE + 1
+    recordings._set_pointer(pointer)
+    for page in (1, 2, 3, 4):
+        recordings.store_page(page, [_entry(page)], pointer)
+    assert recordings.missing_pages(pointer) == [4]
+
+    # The gateway starts over at the first slot: old pages get overwritten
+    recordings._set_pointer(2)
+    assert recordings.pointer == 2
+    assert recordings.complete == set()
+    assert recordings.missing_pages(2) == [1]
+
+    # Once the pointer has moved past them the pages are final again
+    pointer = RECORDS_PER_PAGE + 1
+    recordings._set_pointer(pointer)
+    assert recordings.missing_pages(pointer) == [1, 2]
+
+
+def test_empty_slots_are_skipped():
+    recordings = GasUsageRecordings()
+    recordings.store_page(1, [_entry(1), {'d': '255-256-65535', 'ch': 0, 'hw': 0}, None], 5)
+    assert recordings.days() == [['2026-01-01', 1.5, 0.5, 10.0]]
+
+
+def test_sync_reads_the_pointer_and_current_page_in_one_session():
+    pointer = RECORDS_PER_PAGE + 3
+    client = FakeClient({
+        GAS_USAGE_POINTER: str(pointer),
+        page_path(1): [_entry(day) for day in range(1, RECORDS_PER_PAGE + 1)],
+        page_path(2): [_entry(RECORDS_PER_PAGE + 1)],
+    })
+    recordings = GasUsageRecordings()
+    changed = asyncio.run(recordings.sync(client))
+    assert len(changed) == RECORDS_PER_PAGE + 1
+    assert recordings.complete == {1}
+
+    client.sessions.clear()
+    assert asyncio.run(recordings.sync(client)) == []
+    assert client.sessions == [[GAS_USAGE_POINTER, page_path(2)]]
+
+
+def test_sync_without_pointer_changes_nothing():
+    recordings = GasUsageRecordings()
+    assert asyncio.run(recordings.sync(FakeClient({}))) is None
+    assert recordings.pointer is None
+
+
+def test_round_trip():
+    recordings = GasUsageRecordings()
+    recordings._set_pointer(RECORDS_PER_PAGE + 1)
+    recordings.store_page(1, [_entry(1)], RECORDS_PER_PAGE + 1)
+    restored = GasUsageRecordings.from_dict(recordings.as_dict())
+    assert restored.pointer == recordings.pointer
+    assert restored.complete == {1}
+    assert restored.days() == recordings.days()
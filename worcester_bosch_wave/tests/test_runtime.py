@@ -0,0 +1,87 @@
+"""Tests for boiler runtime and rolling duty cycles."""
+
+import pytest
+
+from worcester_bosch_wave.runtime import BoilerRuntime, RollingOnTime
+
+
+def test_on_time_is_split_across_buckets():
+    rolling = RollingOnTime(600, 10)  # 60 s buckets
+    rolling.add(30, 150, True)
+    assert rolling.seconds(150) == 120
+    assert rolling.duty(150) == pytest.approx(1.0)
+
+
+def test_buckets_expire_as_the_window_moves():
+    rolling = RollingOnTime(600, 10)
+    rolling.add(0, 60, True)
+    rolling.add(60, 120, False)
+    assert rolling.seconds(120) == 60
+    # Still inside the window
+    assert rolling.seconds(599) == 60
+    # The first bucket has left the window
+    assert rolling.seconds(600) == 0
+
+
+def test_gap_longer_than_the_window_clears_every_bucket():
+    rolling = RollingOnTime(600, 10)
+    rolling.add(0, 300, True)
+    # Off for longer than the window, then on again for a minute
+    rolling.add(300, 2000, False)
+    rolling.add(2000, 2060, True)
+    assert rolling.seconds(2060) == 60
+    assert rolling.duty(2060) == pytest.approx(0.1)
+
+
+def test_gap_shorter_than_the_window_drops_only_expired_buckets():
+    rolling = RollingOnTime(600, 10)
+    rolling.add(0, 120, True)  # buckets 0 and 1
+    rolling.add(120, 240, True)  # buckets 2 and 3
+    # The window now ends in bucket 11: buckets 0 and 1 expire, 2 and 3 stay
+    assert rolling.seconds(660) == 120
+
+
+def test_interval_older_than_the_window_is_clipped():
+    rolling = RollingOnTime(600, 10)
+    # Ends in bucket 19, so buckets 10..19 are in the window
+    rolling.add(0, 1190, True)
+    assert rolling.seconds(1190) == 590
+
+
+def test_restore_round_trip():
+    rolling = RollingOnTime(600, 10)
+    rolling.add(0, 90, True)
+    restored = RollingOnTime(600, 10)
+    restored.restore(rolling.as_dict())
+    assert restored.seconds(90) == 90
+    assert restored.started == 0
+
+
+def test_runtime_splits_heating_and_hot_water():
+    runtime = BoilerRuntime()
+    runtime.update('CH', at=0, day='d1')
+    runtime.update('HW', at=60, day='d1')
+    runtime.update('No', at=90, day='d1')
+    runtime.update('No', at=120, day='d1')
+    assert runtime.today == {'CH': 60, 'HW': 30}
+    assert runtime.duty_cycle('hour', now=120) == pytest.approx(75.0)
+
+
+def test_runtime_does_not_credit_long_gaps():
+    runtime = BoilerRuntime(max_gap=300)
+    runtime.update('CH', at=0, day='d1')
+    runtime.update('CH', at=1000, day='d1')
+    assert runtime.on_today == 0
+    runtime.update('No', at=1100, day='d1')
+    assert runtime.on_today == 100
+
+
+def test_runtime_resets_today_on_a_new_day():
+    runtime = BoilerRuntime()
+    runtime.update('CH', at=0, day='d1')
+    runtime.update('CH', at=60, day='d1')
+    runtime.update('No', at=120, day='d2')
+    assert runtime.today == {'CH': 60, 'HW': 0}
+    restored = BoilerRuntime.from_dict(runtime.as_dict())
+    assert restored.today == runtime.today
+    assert restored.duty_cycle('day', now=120) == runtime.duty_cycle('day', now=120)
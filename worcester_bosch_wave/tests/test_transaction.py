@@ -0,0 +1,82 @@
+"""Tests for multi-setting write transactions."""
+
+from worcester_bosch_wave.constants import CLOCK, MANUAL, OFF, ON, UI_STATUS_PATH
+from worcester_bosch_wave.transaction import (
+    OVERRIDE_STATUS,
+    TEMPERATURE_MANUAL,
+    USERMODE,
+    WriteTransaction,
+)
+
+STATUS = {'UMD': CLOCK, 'MMT': '19.0', 'TOR': OFF}
+
+
+def _transaction(rollback=True):
+    # Given out of order on purpose; usermode is applied first
+    return WriteTransaction(
+        {OVERRIDE_STATUS: ON, TEMPERATURE_MANUAL: 21.5, USERMODE: MANUAL}, rollback=rollback
+    )
+
+
+def test_failure_restores_earlier_writes_in_reverse_order():
+    transaction = _transaction()
+    assert transaction.first() == ('GET', UI_STATUS_PATH, None)
+    assert transaction.reply(True, dict(STATUS)) == ('PUT', USERMODE, MANUAL)
+    assert transaction.reply(True) == ('PUT', TEMPERATURE_MANUAL, 21.5)
+    assert transaction.reply(True) == ('PUT', OVERRIDE_STATUS, ON)
+
+    # The override switch fails: undo the temperature, then the mode
+    assert transaction.reply(False) == ('PUT', TEMPERATURE_MANUAL, 19.0)
+    assert transaction.reply(True) == ('PUT', USERMODE, CLOCK)
+    assert transaction.reply(True) is None
+
+    assert not transaction.ok
+    assert transaction.failed.path == OVERRIDE_STATUS
+    assert transaction.rolled_back
+    assert transaction.results == {USERMODE: True, TEMPERATURE_MANUAL: True, OVERRIDE_STATUS: False}
+
+
+def test_failed_undo_is_not_reported_as_rolled_back():
+    transaction = _transaction()
+    transaction.first()
+    transaction.reply(True, dict(STATUS))
+    transaction.reply(True)
+    transaction.reply(False)  # temperature fails; only the mode is undone
+    assert transaction.reply(False) is None
+    assert not transaction.rolled_back
+
+
+def test_unchanged_values_are_not_restored():
+    transaction = _transaction()
+    transaction.first()
+    # Already manual: restoring the mode would be a no-op
+    transaction.reply(True, dict(STATUS, UMD=MANUAL))
+    transaction.reply(True)
+    assert transaction.reply(False) is None
+    assert not transaction.rolled_back
+
+
+def test_no_rollback_when_the_status_read_fails():
+    transaction = _transaction()
+    transaction.first()
+    assert transaction.reply(False) is None
+    assert transaction.status is None
+    assert transaction.failed is None
+    assert not transaction.rolled_back
+    assert transaction.results == {USERMODE: None, TEMPERATURE_MANUAL: None, OVERRIDE_STATUS: None}
+
+
+def test_no_rollback_when_the_status_is_not_a_dict():
+    transaction = _transaction()
+    transaction.first()
+    assert transaction.reply(True, 'not a status') is None
+    assert not transaction.ok
+
+
+def test_without_rollback_the_first_failure_stops():
+    transaction = _transaction(rollback=False)
+    assert transaction.first() == ('PUT', USERMODE, MANUAL)
+    assert transaction.reply(True) == ('PUT', TEMPERATURE_MANUAL, 21.5)
+    assert transaction.reply(False) is None
+    assert transaction.results == {USERMODE: True, TEMPERATURE_MANUAL: False, OVERRIDE_STATUS: None}
+    assert not transaction.rolled_back
@@ -0,0 +1,172 @@
+"""Client behaviour against the local gateway."""
+
+import asyncio
+
+import pytest
+
+from worcester_bosch_wave.constants import UI_STATUS_PATH
+from worcester_bosch_wave.io_loop import WaveIOLoop
+from worcester_bosch_wave.local_gateway import LocalWaveGateway
+from worcester_bosch_wave.transaction import (
+    OVERRIDE_STATUS,
+    OVERRIDE_TEMPERATURE,
+    TEMPERATURE_MANUAL,
+    confirmed_status,
+)
+from worcester_bosch_wave.wave_client import WorcesterWaveClient
+
+SERIAL = '123456789'
+ACCESS_CODE = 'AbCdEfGhIjKlMnOp'
+PASSWORD = 'secret'
+
+
+def run(test, pooled=False, **client_options):
+    """Run ``test(gateway, device, client)`` against a fresh local gateway."""
+
+    async def main():
+        io_loop = WaveIOLoop(max_sessions=2, name='wave-test-io') if pooled else None
+        try:
+            async with LocalWaveGateway() as gateway:
+                device = gateway.add_device(SERIAL, ACCESS_CODE, PASSWORD)
+                client = WorcesterWaveClient(
+                    SERIAL, ACCESS_CODE, PASSWORD,
+                    io_loop=io_loop, host=gateway.host, port=gateway.port,
+                    **client_options,
+                )
+                await test(gateway, device, client)
+        finally:
+            if io_loop is not None:
+                io_loop.stop()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('pooled', [False, True], ids=['executor', 'io_loop'])
+def test_get_status(pooled):
+    async def test(gateway, device, client):
+        device.ui_status['IHT'] = '19.50'
+        status = await client.get_status()
+        assert status['IHT'] == '19.50'
+        assert client.counters['sessions'] == gateway.sessions == 1
+        assert 'dns' in client.last_phases and 'connect' in client.last_phases
+
+    run(test, pooled=pooled)
+
+
+@pytest.mark.parametrize('pooled', [False, True], ids=['executor', 'io_loop'])
+def test_concurrent_reads_share_one_session(pooled):
+    async def test(gateway, device, client):
+        results = await asyncio.gather(*(client.get_status() for _ in range(5)))
+        assert all(result == results[0] for result in results)
+        assert gateway.sessions == 1
+        assert client.counters['reads_coalesced'] == 4
+        # Read batches are keyed by their paths
+        paths = [TEMPERATURE_MANUAL, OVERRIDE_STATUS]
+        values = await asyncio.gather(*(client.read_endpoints(paths) for _ in range(3)))
+        assert values[0] == {TEMPERATURE_MANUAL: 21.0, OVERRIDE_STATUS: 'off'}
+        assert gateway.sessions == 2
+
+    run(test, pooled=pooled)
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def test(gateway, device, client):
+        leader = asyncio.ensure_future(client.get_status())
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(client.get_status())
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert (await follower)['UMD'] == 'clock'
+        assert client._inflight == {}
+
+    run(test)
+
+
+def test_repeated_responses_are_recognised():
+    async def test(gateway, device, client):
+        await client.get_status()
+        assert not client.response_unchanged()
+
+        # Same encrypted body
+        await client.get_status()
+        assert client.response_unchanged()
+        assert client.counters['responses_unchanged_body'] == 1
+
+        # Only the thermostat clock moved
+        device.ui_status['CTD'] = '2025-09-22T18:34:00+01:00 Mo'
+        status = await client.get_status()
+        assert client.response_unchanged()
+        assert status['CTD'] == device.ui_status['CTD']
+        assert client.counters['responses_unchanged_masked'] == 1
+
+        device.ui_status['IHT'] = '19.00'
+        status = await client.get_status()
+        assert not client.response_unchanged()
+        assert status['IHT'] == '19.00'
+
+        # A write invalidates the previous response
+        assert await client.set_temperature(23.0)
+        await client.get_status()
+        assert not client.response_unchanged(UI_STATUS_PATH)
+
+    run(test)
+
+
+def test_clock_mode_temperature_sets_the_override():
+    async def test(gateway, device, client):
+        assert await client.set_temperature(22.5)
+        assert device.puts == [(OVERRIDE_TEMPERATURE, 22.5), (OVERRIDE_STATUS, 'on')]
+        assert device.ui_status['TSP'] == '22.5'
+
+    run(test)
+
+
+def test_writes_already_in_place_are_skipped():
+    async def test(gateway, device, client):
+        assert await client.set_temperature(22.5)
+        sessions = gateway.sessions
+        assert await client.set_temperature(22.5)
+        assert await client.set_mode('auto')
+        assert gateway.sessions == sessions
+        assert client.counters['writes_skipped'] == 3
+        assert len(device.puts) == 2
+
+    run(test)
+
+
+def test_skip_unchanged_writes_off_sends_every_write():
+    async def test(gateway, device, client):
+        assert await client.set_temperature(22.5)
+        assert await client.set_temperature(22.5)
+        assert client.counters['writes_skipped'] == 0
+        assert len(device.puts) == 4
+
+    run(test, skip_unchanged_writes=False)
+
+
+def test_written_endpoints_can_be_confirmed():
+    async def test(gateway, device, client):
+        device.ui_status.update(UMD='manual', TSP='21.0')
+        status = await client.get_status()
+        assert await client.set_temperature(19.5)
+        assert client.last_written == {TEMPERATURE_MANUAL: 19.5}
+
+        values = await client.read_endpoints(list(client.last_written))
+        assert values == {TEMPERATURE_MANUAL: 19.5}
+        assert confirmed_status(status, values) == {'MMT': '19.5', 'TSP': '19.5'}
+
+    run(test)
+
+
+def test_clock_program_set_point_needs_a_full_read():
+    status = {'UMD': 'clock', 'TOR': 'off', 'TOT': '21.0', 'TSP': '18.0'}
+    assert confirmed_status(status, {OVERRIDE_STATUS: 'off'}) is None
+    assert confirmed_status(status, {OVERRIDE_STATUS: 'on'}) == {'TOR': 'on', 'TSP': '21.0'}
+    assert confirmed_status(status, {'/unknown': 1}) is None
+
+
+def test_unknown_endpoint_reads_as_none():
+    async def test(gateway, device, client):
+        assert await client.get_endpoint('/ecus/rrc/unsupported') is None
+
+    run(test)
@@ -0,0 +1,222 @@
+"""
+Tracing hooks for Wave cloud operations.
+
+Spans are opened around client reads/writes, each XMPP session and its
+phases (DNS, connect, auth, request) and payload decoding. The current span
+lives in a contextvar so nested operations pick up their parent; sessions
+running in another thread receive the caller's context from the client.
+
+Tracing is off by default, and then ``span()`` returns a shared no-op
+context manager. Install a tracer with ``set_tracer()``, or call
+``enable_opentelemetry()`` to export through the OpenTelemetry API when it
+is installed.
+"""
+
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACER_NAME = 'worcester_bosch_wave'
+
+
+class Span:
+    """A span; this base class does nothing and doubles as the no-op span."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+class Tracer:
+    """Interface for tracer backends."""
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        return NOOP_SPAN
+
+
+NOOP_SPAN = Span()
+
+_tracer: Optional[Tracer] = None
+_current: ContextVar = ContextVar('wave_current_span', default=None)
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Install ``tracer`` for all Wave operations; None disables tracing."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(
+    name: str,
+    parent: Optional[Span] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Span:
+    """Start a span without making it current; the caller must end() it.
+
+    Used where work continues in callbacks (slixmpp event handlers) that do
+    not run in the context the span was started from.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start_span(name, parent if parent is not None else _current.get(), attributes)
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> Span:
+        return NOOP_SPAN
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+    __slots__ = ('_name', '_parent', '_attributes', '_span', '_token')
+
+    def __init__(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]):
+        self._name = name
+        self._parent = parent
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        self._span = start_span(self._name, self._parent, self._attributes)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self._span.record_exception(exc)
+        self._span.end()
+        _current.reset(self._token)
+        return False
+
+
+def span(name: str, parent: Optional[Span] = None, **attributes):
+    """Context manager running its block inside a new current span."""
+    if _tracer is None:
+        return _NOOP_SCOPE
+    return _SpanScope(name, parent, attributes)
+
+
+class RecordedSpan(Span):
+    """Span kept in memory by RecordingTracer."""
+
+    __slots__ = ('tracer', 'name', 'parent', 'attributes', 'start', 'finish', 'error')
+
+    def __init__(self, tracer: 'RecordingTracer', name: str, parent: Optional[Span],
+                 attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.start = time.perf_counter()
+        self.finish: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.finish is None else self.finish - self.start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = repr(exc)
+
+    def end(self) -> None:
+        if self.finish is None:
+            self.finish = time.perf_counter()
+            self.tracer.finished.append(self)
+
+
+class RecordingTracer(Tracer):
+    """Keeps the last ``size`` finished spans in memory, for debugging and benchmarks."""
+
+    def __init__(self, size: int = 1000):
+        self.finished: deque = deque(maxlen=size)
+
+    def start_span(self, name, parent=None, attributes=None) -> Span:
+        return RecordedSpan(self, name, parent, attributes)
+
+
+class _OpenTelemetrySpan(Span):
+    __slots__ = ('span',)
+
+    def __init__(self, span):
+        self.span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, exc: BaseException) -> None:
+        from opentelemetry.trace import Status, StatusCode
+        self.span.record_exception(exc)
+        self.span.set_status(Status(StatusCode.ERROR, str(exc)))
+
+    def end(self) -> None:
+        self.span.end()
+
+
+class OpenTelemetryTracer(Tracer):
+    """Exports spans through the OpenTelemetry API.
+
+    Spans without a Wave parent join whatever OpenTelemetry context is
+    current, so they nest under the caller's own spans.
+    """
+
+    def __init__(self, tracer_provider=None):
+        from opentelemetry import trace
+        self._trace = trace
+        self._tracer = trace.get_tracer(TRACER_NAME, tracer_provider=tracer_provider)
+
+    def start_span(self, name, parent=None, attributes=None) -> Span:
+        context = None
+        if isinstance(parent, _OpenTelemetrySpan):
+            context = self._trace.set_span_in_context(parent.span)
+        return _OpenTelemetrySpan(
+            self._tracer.start_span(name, context=context, attributes=attributes)
+        )
+
+
+def enable_opentelemetry(tracer_provider=None) -> bool:
+    """Export spans via OpenTelemetry; False if it is not installed."""
+    try:
+        tracer = OpenTelemetryTracer(tracer_provider)
+    except ImportError:
+        _LOGGER.warning('OpenTelemetry is not installed; Wave tracing stays disabled')
+        return False
+    set_tracer(tracer)
+    return True
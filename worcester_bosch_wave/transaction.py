@@ -0,0 +1,239 @@
+"""
+Multi-setting write transactions for Worcester Bosch Wave.
+
+A transaction is a set of endpoint -> value writes sent over one XMPP
+session. Writes are applied in WRITE_ORDER: the program mode first, since
+it decides which set point is active, then temperatures, then the override
+switch so it turns on with its temperature already in place, then hot
+water. The first failed write stops the transaction. With rollback
+enabled, the session starts with a uiStatus read, and the writes that
+already succeeded are restored in reverse order.
+
+A ReadBatch reads several single endpoints in one session, e.g. to confirm
+writes without fetching and decrypting the whole uiStatus payload.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .constants import DHW_PATH_BASE, MANUAL, ON, PATH_BASE, UI_STATUS_PATH
+
+USERMODE = f'{PATH_BASE}usermode'
+TEMPERATURE_MANUAL = f'{PATH_BASE}temperatureRoomManual'
+OVERRIDE_TEMPERATURE = f'{PATH_BASE}manualTempOverride/temperature'
+OVERRIDE_STATUS = f'{PATH_BASE}manualTempOverride/status'
+HOT_WATER_CLOCK = f'{DHW_PATH_BASE}dhwOperationClockMode'
+HOT_WATER_MANUAL = f'{DHW_PATH_BASE}dhwOperationManualMode'
+
+# Writable endpoints in the order they are applied, with the uiStatus key
+# holding each one's current value (read back for rollback)
+WRITE_ORDER = (
+    (USERMODE, 'UMD'),
+    (TEMPERATURE_MANUAL, 'MMT'),
+    (OVERRIDE_TEMPERATURE, 'TOT'),
+    (OVERRIDE_STATUS, 'TOR'),
+    (HOT_WATER_CLOCK, 'DHW'),
+    (HOT_WATER_MANUAL, 'DHW'),
+)
+_RANK = {path: index for index, (path, _) in enumerate(WRITE_ORDER)}
+STATUS_KEYS = dict(WRITE_ORDER)
+_NUMERIC = {TEMPERATURE_MANUAL, OVERRIDE_TEMPERATURE}
+
+# (method, path, value) sent as one request of the session
+Request = Tuple[str, str, Any]
+
+
+class WriteResult:
+    """Outcome of one write in a transaction.
+
+    ``ok`` is None when the write was never sent because an earlier one
+    failed. ``rolled_back`` is True once its previous value was restored.
+    """
+
+    def __init__(self, path: str, value: Any):
+        self.path = path
+        self.value = value
+        self.ok: Optional[bool] = None
+        self.previous: Any = None
+        self.rolled_back = False
+
+    def as_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'value': self.value,
+            'ok': self.ok,
+            'previous': self.previous,
+            'rolled_back': self.rolled_back,
+        }
+
+    def __repr__(self) -> str:
+        return f'WriteResult({self.path!r}, {self.value!r}, ok={self.ok})'
+
+
+def order_writes(writes: Mapping[str, Any]) -> List[Tuple[str, Any]]:
+    """``writes`` in WRITE_ORDER; other endpoints go last, in the order given."""
+    unknown = len(WRITE_ORDER)
+    return sorted(writes.items(), key=lambda item: _RANK.get(item[0], unknown))
+
+
+def current_value(path: str, status: Optional[dict]) -> Any:
+    """The value ``path`` holds according to uiStatus ``status``, or None."""
+    key = STATUS_KEYS.get(path)
+    if status is None or key is None or key not in status:
+        return None
+    value = status[key]
+    if path in _NUMERIC:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return value
+
+
+def is_applied(path: str, value: Any, status: Optional[dict]) -> bool:
+    """True when ``status`` shows ``path`` already holds ``value``."""
+    current = current_value(path, status)
+    if current is None:
+        return False
+    if path in _NUMERIC:
+        try:
+            return float(value) == current
+        except (TypeError, ValueError):
+            return False
+    return str(value) == current
+
+
+def apply_to_status(status: dict, path: str, value: Any) -> None:
+    """Update ``status`` in place as if ``path`` had been written with ``value``."""
+    key = STATUS_KEYS.get(path)
+    if key is None:
+        return
+    status[key] = f'{float(value):.1f}' if path in _NUMERIC else value
+
+
+def confirmed_status(status: dict, values: Mapping[str, Any]) -> Optional[dict]:
+    """uiStatus keys to update after reading back ``values`` (path -> value).
+
+    Includes the set point TSP the new values imply; None when it cannot be
+    derived (clock mode without override follows the program, which only a
+    full uiStatus read reveals) or a path has no uiStatus key.
+    """
+    patched = dict(status)
+    for path, value in values.items():
+        if path not in STATUS_KEYS:
+            return None
+        apply_to_status(patched, path, value)
+    if patched.get('UMD') == MANUAL:
+        source = 'MMT'
+    elif patched.get('TOR') == ON:
+        source = 'TOT'
+    else:
+        return None
+    if source not in patched:
+        return None
+    updates = {STATUS_KEYS[path]: patched[STATUS_KEYS[path]] for path in values}
+    updates['TSP'] = patched[source]
+    return updates
+
+
+class ReadBatch:
+    """Plans GETs of several endpoints in one session and collects the values."""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        if not self.paths:
+            raise ValueError('a read batch needs at least one path')
+        self.values: Dict[str, Any] = {}
+        self._index = 0
+
+    @property
+    def ok(self) -> bool:
+        return len(self.values) == len(self.paths)
+
+    def first(self) -> Request:
+        return 'GET', self.paths[0], None
+
+    def reply(self, ok: bool, value: Any = None) -> Optional[Request]:
+        if ok and value is not None:
+            self.values[self.paths[self._index]] = value
+        self._index += 1
+        if self._index < len(self.paths):
+            return 'GET', self.paths[self._index], None
+        return None
+
+
+class WriteTransaction:
+    """Plans the requests of one write session and records their results.
+
+    The messenger asks ``first()`` for the opening request and passes every
+    reply to ``reply()``, which returns the next request or None once the
+    session is done.
+    """
+
+    def __init__(self, writes: Mapping[str, Any], rollback: bool = False):
+        if not writes:
+            raise ValueError('a transaction needs at least one write')
+        self.writes = [WriteResult(path, value) for path, value in order_writes(writes)]
+        self.rollback = rollback
+        self.status: Optional[dict] = None  # uiStatus read before writing
+        self.failed: Optional[WriteResult] = None
+        self._undone: List[WriteResult] = []
+        self._queue: List[Tuple[Request, Optional[WriteResult], bool]] = []
+
+    @property
+    def ok(self) -> bool:
+        return all(write.ok for write in self.writes)
+
+    @property
+    def rolled_back(self) -> bool:
+        """True when a failure was followed by restoring every earlier write."""
+        return bool(self._undone) and all(write.rolled_back for write in self._undone)
+
+    @property
+    def results(self) -> Dict[str, Optional[bool]]:
+        return {write.path: write.ok for write in self.writes}
+
+    def first(self) -> Request:
+        if self.rollback:
+            self._queue = [(('GET', UI_STATUS_PATH, None), None, False)]
+        else:
+            self._queue = [self._put(write) for write in self.writes]
+        return self._queue[0][0]
+
+    def reply(self, ok: bool, value: Any = None) -> Optional[Request]:
+        """Record the reply to the current request; returns the next one."""
+        request, write, undo = self._queue.pop(0)
+        if request[0] == 'GET':
+            if not ok or not isinstance(value, dict):
+                # Without the current values nothing could be restored
+                return None
+            self.status = value
+            for write in self.writes:
+                write.previous = current_value(write.path, value)
+            self._queue = [self._put(write) for write in self.writes]
+        elif undo:
+            write.rolled_back = ok
+        elif ok:
+            write.ok = True
+        else:
+            write.ok = False
+            self.failed = write
+            self._queue = self._undo_queue() if self.rollback else []
+        return self._queue[0][0] if self._queue else None
+
+    @staticmethod
+    def _put(write: WriteResult):
+        return ('PUT', write.path, write.value), write, False
+
+    def _undo_queue(self):
+        self._undone = [
+            write for write in reversed(self.writes)
+            if write.ok and write.previous is not None and write.previous != write.value
+        ]
+        return [(('PUT', write.path, write.previous), write, True) for write in self._undone]
+
+    def summary(self) -> dict:
+        return {
+            'ok': self.ok,
+            'rolled_back': self.rolled_back,
+            'writes': [write.as_dict() for write in self.writes],
+        }
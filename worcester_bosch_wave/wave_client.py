@@ -4,205 +4,529 @@ Async wrapper for Worcester Bosch Wave library.
 """
 
 import asyncio
+import contextvars
 import logging
-from typing import Optional, Dict, Any
+import time
+from collections import Counter, deque
+from typing import Optional, Dict, Any, Callable, Hashable, Awaitable
 
-from .status import WaveStatus
-from .set import WaveSet
-from .constants import MANUAL, CLOCK, ON, OFF, PATH_BASE
+from .constants import MANUAL, CLOCK, ON, OFF, UI_STATUS_PATH
+from . import tracing
+from .io_loop import WaveIOLoop
+from .log import RateLimitedLog
+from .stats import RollingHistogram
+from .transaction import (
+    OVERRIDE_STATUS,
+    OVERRIDE_TEMPERATURE,
+    TEMPERATURE_MANUAL,
+    USERMODE,
+    ReadBatch,
+    WriteTransaction,
+    apply_to_status,
+    is_applied,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+errors = RateLimitedLog(_LOGGER)
+
+SESSION_TIMEOUT = 30  # seconds
+STATS_WINDOW = 100  # sessions/reads kept for rolling timing statistics
+SNAPSHOT_MAX_AGE = 60  # seconds a uiStatus snapshot is trusted to skip no-op writes
+
+
+# The messengers pull in slixmpp and pycryptodome, which take a few hundred
+# milliseconds to import. Loading them with the first session keeps this
+# module (and Home Assistant's integration import) light. Sessions are built
+# on the I/O loop or an executor thread, never on the caller's event loop.
+def _new_status(**kwargs):
+    from .status import WaveStatus
+    return WaveStatus(**kwargs)
+
+
+def _new_set(**kwargs):
+    from .set import WaveSet
+    return WaveSet(**kwargs)
+
+
+def _new_batch(**kwargs):
+    from .set import WaveBatch
+    return WaveBatch(**kwargs)
+
+
+# Home Assistant HVAC modes that map onto a Wave program mode
+WAVE_MODES = {"heat": MANUAL, "auto": CLOCK}
+
+
+def temperature_writes(temperature: float, program_mode: Optional[str]) -> Dict[str, Any]:
+    """Writes that make ``temperature`` the set point in ``program_mode``."""
+    if program_mode == MANUAL:
+        return {TEMPERATURE_MANUAL: temperature}
+    # Clock mode: override the program's set point
+    return {OVERRIDE_TEMPERATURE: temperature, OVERRIDE_STATUS: ON}
+
 
 class WorcesterWaveClient:
     """Async client for Worcester Bosch Wave thermostat."""
-    
-    def __init__(self, serial_number: str, access_code: str, password: str):
-        """Initialize the client."""
+
+    def __init__(
+        self,
+        serial_number: str,
+        access_code: str,
+        password: str,
+        io_loop: Optional[WaveIOLoop] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        skip_unchanged_writes: bool = True,
+    ):
+        """Initialize the client.
+
+        :param io_loop: Shared I/O loop to run sessions on. Without one every
+            session gets its own executor thread and event loop.
+        :param host: XMPP server override, e.g. a LocalWaveGateway
+        :param skip_unchanged_writes: Skip writes a recent uiStatus shows are
+            already in place; False sends every write
+        """
         self.serial_number = serial_number
         self.access_code = access_code
         self.password = password
-        
+        self._io_loop = io_loop
+        self.host = host
+        self.port = port
+
+        # Rolling per-phase session timings (seconds) and read outcomes
+        self.phase_stats: Dict[str, RollingHistogram] = {}
+        self.last_phases: Dict[str, float] = {}
+        self.last_poll_duration: Optional[float] = None
+        self._poll_results = deque(maxlen=STATS_WINDOW)
+        # Session outcomes since the client was created
+        self.counters: Counter = Counter()
+
+        # Last uiStatus read, kept up to date with our own writes; writes it
+        # shows are already in place are skipped while it is recent
+        self.snapshot_max_age = SNAPSHOT_MAX_AGE
+        self.skip_unchanged_writes = skip_unchanged_writes
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_at = 0.0
+        # Endpoint -> value of acknowledged writes, for callers confirming them
+        self.last_written: Dict[str, Any] = {}
+        # Reads in flight, shared by concurrent callers asking for the same thing
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Path -> last response (status.LastResponse), so a repeat of it is
+        # recognised before decoding; and whether the last read was a repeat
+        self._responses: Dict[str, Any] = {}
+        self._unchanged: Dict[str, bool] = {}
+        self._write_epoch = 0  # bumped by every write
+
         # No long-lived objects created on the event loop to avoid blocking
         self._initialized = True
         _LOGGER.debug("Wave client initialized for %s", self.serial_number)
-    
-    async def get_status(self) -> Optional[Dict[str, Any]]:
-        """Get current thermostat status."""
+
+    def _run_in_thread_loop(self, func):
+        """Run ``func`` inside a thread-local event loop (slixmpp needs one)."""
+        import asyncio as _asyncio
+        th_loop = _asyncio.new_event_loop()
         try:
-            # Run the synchronous update in an executor
+            _asyncio.set_event_loop(th_loop)
+            return func()
+        finally:
+            try:
+                th_loop.run_until_complete(th_loop.shutdown_asyncgens())
+            except Exception:
+                pass
+            _asyncio.set_event_loop(None)
+            th_loop.close()
+
+    async def _run_session(self, factory: Callable[[], Any], start: Callable[[Any], Any]):
+        """Build a messenger with ``factory`` and run one session with ``start``.
+
+        ``start(messenger)`` returns a coroutine on the shared I/O loop and a
+        plain result in executor mode. Returns ``(messenger, result)``.
+        """
+        submitted = time.perf_counter()
+
+        def _build():
+            messenger = factory()
+            messenger.marks['submitted'] = submitted
+            return messenger
+
+        if self._io_loop is not None:
+            async def _session():
+                messenger = _build()
+                return messenger, await start(messenger)
+
+            messenger, result = await self._io_loop.run(_session)
+        else:
+            def _sync_session():
+                messenger = _build()
+                return messenger, start(messenger)
+
+            # Executor threads do not inherit contextvars; carry the current
+            # span over so the session nests under it (the I/O loop's
+            # run_coroutine_threadsafe already copies the caller's context)
+            context = contextvars.copy_context()
             loop = asyncio.get_event_loop()
-            _LOGGER.debug("Wave client fetching status…")
-            def _sync_status():
-                import asyncio as _asyncio
-                th_loop = _asyncio.new_event_loop()
-                try:
-                    _asyncio.set_event_loop(th_loop)
-                    status = WaveStatus(
+            messenger, result = await loop.run_in_executor(
+                None, context.run, self._run_in_thread_loop, _sync_session
+            )
+        self._record_session(messenger)
+        return messenger, result
+
+    def _record_session(self, messenger) -> None:
+        marks = messenger.marks
+        counters = self.counters
+        counters['sessions'] += 1
+        if messenger.session_started:
+            counters['handshakes'] += 1
+        if 'resolved' not in marks:
+            counters['dns_failures'] += 1
+        elif 'connected' not in marks:
+            counters['connect_failures'] += 1
+        if messenger.auth_failed:
+            counters['auth_failures'] += 1
+        if messenger.timed_out:
+            counters['timeouts'] += 1
+        if messenger.bad_request:
+            counters['bad_requests'] += 1
+        counters['reconnects'] += messenger.reconnects
+
+        phases = messenger.phases()
+        self.last_phases = phases
+        for name, value in phases.items():
+            histogram = self.phase_stats.get(name)
+            if histogram is None:
+                histogram = self.phase_stats[name] = RollingHistogram(STATS_WINDOW)
+            histogram.add(value)
+
+    def timing_summary(self) -> Dict[str, dict]:
+        """Rolling p50/p95/max in milliseconds per session phase."""
+        return {name: histogram.summary() for name, histogram in self.phase_stats.items()}
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        """Percentage of the last STATS_WINDOW reads that returned data."""
+        if not self._poll_results:
+            return None
+        return round(100 * sum(self._poll_results) / len(self._poll_results), 1)
+
+    async def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch()`` once for all concurrent callers asking for ``key``.
+
+        Callers arriving while a read for ``key`` is in flight wait for it
+        and get its result instead of opening their own session. A caller
+        being cancelled does not cancel the read for the others.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters['reads_coalesced'] += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+
+        def _done(finished):
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    def _writes_done(self) -> None:
+        """Forget reads that may predate a write.
+
+        Later reads must not join one already in flight, nor be reported as
+        unchanged because they match a response from before the write.
+        """
+        self._write_epoch += 1
+        self._inflight.clear()
+        self._responses.clear()
+        self._unchanged.clear()
+
+    def response_unchanged(self, path: str = UI_STATUS_PATH) -> bool:
+        """True when the last read of ``path`` repeated the one before it.
+
+        Values under status.VOLATILE_KEYS (the thermostat clock) may still
+        differ. False after any write, until ``path`` is read twice again.
+        """
+        return self._unchanged.get(path, False)
+
+    async def get_endpoint(self, path: str) -> Any:
+        """GET a single endpoint and return its decoded ``value``.
+
+        Concurrent calls for the same path share one session and its result.
+        """
+        return await self._single_flight(path, lambda: self._get_endpoint(path))
+
+    async def _get_endpoint(self, path: str) -> Any:
+        started = time.perf_counter()
+        data = None
+        previous = self._responses.get(path)
+        epoch = self._write_epoch
+        with tracing.span('wave.get', serial=self.serial_number, path=path) as span:
+            try:
+                _LOGGER.debug("Wave client fetching %s…", path)
+                pooled = self._io_loop is not None
+                status, _ = await self._run_session(
+                    lambda: _new_status(
                         serial_number=self.serial_number,
                         access_code=self.access_code,
                         password=self.password,
-                    )
-                    status.update()
-                    return status.data
-                finally:
-                    try:
-                        th_loop.run_until_complete(th_loop.shutdown_asyncgens())
-                    except Exception:
-                        pass
-                    _asyncio.set_event_loop(None)
-                    th_loop.close()
-
-            data = await loop.run_in_executor(None, _sync_status)
-            if data:
-                _LOGGER.debug("Wave client received data keys: %s", list(data.keys()))
-                return dict(data)
-            return None
-            
-        except Exception as e:
-            _LOGGER.error("Failed to get status: %s", e)
+                        path=path,
+                        host=self.host,
+                        port=self.port,
+                        previous=previous,
+                    ),
+                    (lambda s: s.update_async(SESSION_TIMEOUT)) if pooled
+                    else (lambda s: s.update(SESSION_TIMEOUT)),
+                )
+                data = status.data
+                if data is not None:
+                    errors.resolved(('get', self.serial_number, path))
+                    self._record_response(path, epoch, status)
+                    span.set_attribute('match', status.match or 'none')
+                return data
+
+            except Exception as e:
+                errors.error(
+                    ('get', self.serial_number, path),
+                    "Failed to get %s from %s: %s", path, self.serial_number, e, exc_info=True,
+                )
+                span.record_exception(e)
+                return None
+            finally:
+                self.last_poll_duration = time.perf_counter() - started
+                self._poll_results.append(data is not None)
+                span.set_attribute('ok', data is not None)
+
+    def _record_response(self, path: str, epoch: int, status) -> None:
+        # The response may predate a write that completed during the read
+        if epoch != self._write_epoch:
+            return
+        self._responses[path] = status.last_response
+        self._unchanged[path] = status.match is not None
+        if status.match is None:
+            self.counters['responses_changed'] += 1
+        else:
+            self.counters[f'responses_unchanged_{status.match}'] += 1
+
+    async def get_status(self) -> Optional[Dict[str, Any]]:
+        """Get current thermostat status."""
+        data = await self.get_endpoint(UI_STATUS_PATH)
+        if data:
+            _LOGGER.debug("Wave client received data keys: %s", list(data.keys()))
+            self._set_snapshot(data)
+            return dict(data)
+        return None
+
+    def _set_snapshot(self, status: Optional[Dict[str, Any]]) -> None:
+        self._snapshot = dict(status) if status else None
+        self._snapshot_at = time.monotonic()
+
+    def fresh_snapshot(self) -> Optional[Dict[str, Any]]:
+        """The last uiStatus if younger than ``snapshot_max_age``, else None."""
+        if self._snapshot is None or time.monotonic() - self._snapshot_at > self.snapshot_max_age:
             return None
-    
+        return self._snapshot
+
+    def _changed_writes(self, writes: Dict[str, Any], status: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """``writes`` minus those ``status`` shows are already applied."""
+        if not status or not self.skip_unchanged_writes:
+            return dict(writes)
+        changed = {path: value for path, value in writes.items() if not is_applied(path, value, status)}
+        skipped = len(writes) - len(changed)
+        if skipped:
+            self.counters['writes_skipped'] += skipped
+            _LOGGER.debug("Skipping %d write(s) already in place: %s",
+                          skipped, [path for path in writes if path not in changed])
+        return changed
+
+    def _remember_writes(self, writes: Dict[str, Any]) -> None:
+        """Fold acknowledged writes into the snapshot."""
+        self.last_written.update(writes)
+        if self._snapshot is None:
+            return
+        for path, value in writes.items():
+            apply_to_status(self._snapshot, path, value)
+
+    async def _write(self, writes: Dict[str, Any]) -> bool:
+        """Send ``writes``: a single PUT session, or one transaction for several."""
+        if not writes:
+            return True
+        if len(writes) == 1:
+            (url, value), = writes.items()
+            return await self._put(url, value)
+        return (await self.transaction(writes)).ok
+
+    async def _put(self, url: str, value: Any) -> bool:
+        """PUT one value; True when the gateway acknowledged it."""
+        pooled = self._io_loop is not None
+        with tracing.span('wave.put', serial=self.serial_number, path=url, value=value) as span:
+            _, ok = await self._run_session(
+                lambda: _new_set(
+                    serial_number=self.serial_number,
+                    access_code=self.access_code,
+                    password=self.password,
+                    host=self.host,
+                    port=self.port,
+                ),
+                (lambda s: s.post_message_async(url, value, SESSION_TIMEOUT)) if pooled
+                else (lambda s: s.post_message(url, value)),
+            )
+            span.set_attribute('ok', bool(ok))
+        self.counters['writes_sent'] += 1
+        self._writes_done()
+        if ok:
+            self._remember_writes({url: value})
+        else:
+            # The thermostat's state is unknown until the next read
+            self._snapshot = None
+        return bool(ok)
+
+    async def read_endpoints(self, paths) -> Dict[str, Any]:
+        """GET several single endpoints in one session; path -> decoded value.
+
+        Endpoints that did not answer are missing from the result. Values of
+        endpoints mirrored in uiStatus also update the snapshot. Concurrent
+        reads of the same paths share one session.
+        """
+        paths = tuple(paths)
+        values = await self._single_flight(('read', paths), lambda: self._read_endpoints(paths))
+        return dict(values)
+
+    async def _read_endpoints(self, paths) -> Dict[str, Any]:
+        batch = ReadBatch(paths)
+        pooled = self._io_loop is not None
+        with tracing.span('wave.read', serial=self.serial_number, paths=len(batch.paths)) as span:
+            try:
+                await self._run_session(
+                    lambda: _new_batch(
+                        serial_number=self.serial_number,
+                        access_code=self.access_code,
+                        password=self.password,
+                        host=self.host,
+                        port=self.port,
+                    ),
+                    (lambda s: s.run_transaction_async(batch, SESSION_TIMEOUT)) if pooled
+                    else (lambda s: s.run_transaction(batch, SESSION_TIMEOUT)),
+                )
+            except Exception as e:
+                _LOGGER.error("Endpoint read failed: %s", e)
+                span.record_exception(e)
+            span.set_attribute('ok', batch.ok)
+        if self._snapshot is not None:
+            for path, value in batch.values.items():
+                apply_to_status(self._snapshot, path, value)
+        return batch.values
+
+    async def transaction(
+        self, writes: Dict[str, Any], rollback: bool = False
+    ) -> WriteTransaction:
+        """Apply several endpoint writes in one session.
+
+        Writes go out in transaction.WRITE_ORDER and stop at the first
+        failure; with ``rollback`` the current values are read first and
+        the writes that succeeded are restored. The returned transaction
+        holds each write's result; a session that failed outright leaves
+        the unsent writes with ``ok`` None.
+        """
+        transaction = WriteTransaction(writes, rollback=rollback)
+        pooled = self._io_loop is not None
+        with tracing.span(
+            'wave.transaction', serial=self.serial_number, writes=len(transaction.writes),
+            rollback=rollback,
+        ) as span:
+            try:
+                await self._run_session(
+                    lambda: _new_batch(
+                        serial_number=self.serial_number,
+                        access_code=self.access_code,
+                        password=self.password,
+                        host=self.host,
+                        port=self.port,
+                    ),
+                    (lambda s: s.run_transaction_async(transaction, SESSION_TIMEOUT)) if pooled
+                    else (lambda s: s.run_transaction(transaction, SESSION_TIMEOUT)),
+                )
+            except Exception as e:
+                _LOGGER.error("Write transaction failed: %s", e)
+                span.record_exception(e)
+            span.set_attribute('ok', transaction.ok)
+            span.set_attribute('rolled_back', transaction.rolled_back)
+        self.counters['writes_sent'] += sum(write.ok is not None for write in transaction.writes)
+        self._writes_done()
+        if transaction.ok:
+            if transaction.status is not None:
+                self._set_snapshot(transaction.status)
+            self._remember_writes(writes)
+        else:
+            self._snapshot = None
+        if not transaction.ok:
+            _LOGGER.warning("Write transaction incomplete: %s", transaction.summary())
+        return transaction
+
+    async def set_mode_and_temperature(
+        self, mode: str, temperature: float, rollback: bool = True
+    ) -> bool:
+        """Switch to ``mode`` ("heat" or "auto") at ``temperature`` in one session."""
+        wave_mode = WAVE_MODES.get(mode)
+        if wave_mode is None:
+            _LOGGER.warning("Unknown mode: %s", mode)
+            return False
+        writes = {USERMODE: wave_mode}
+        writes.update(temperature_writes(temperature, wave_mode))
+        writes = self._changed_writes(writes, self.fresh_snapshot())
+        if not writes:
+            return True
+        _LOGGER.debug("Setting mode %s at %s", mode, temperature)
+        transaction = await self.transaction(writes, rollback=rollback)
+        return transaction.ok
+
     async def set_temperature(self, temperature: float) -> bool:
         """Set target temperature."""
         try:
-            # Get current status to determine mode
-            current = await self.get_status()
-            
-            loop = asyncio.get_event_loop()
-            
+            # Current status determines the mode; a recent snapshot saves a read
+            current = self.fresh_snapshot()
+            if current is None:
+                current = await self.get_status()
+
             program_mode = None
             try:
                 program_mode = current.get('UMD') if isinstance(current, dict) else None
             except Exception:
                 program_mode = None
 
-            if program_mode == MANUAL:
-                # Manual mode - set manual temperature
-                _LOGGER.debug("Setting manual temperature to %s", temperature)
-                def _sync_set_manual():
-                    import asyncio as _asyncio
-                    th_loop = _asyncio.new_event_loop()
-                    try:
-                        _asyncio.set_event_loop(th_loop)
-                        setter = WaveSet(
-                            serial_number=self.serial_number,
-                            access_code=self.access_code,
-                            password=self.password,
-                        )
-                        return setter.post_message(f'{PATH_BASE}temperatureRoomManual', temperature)
-                    finally:
-                        try:
-                            th_loop.run_until_complete(th_loop.shutdown_asyncgens())
-                        except Exception:
-                            pass
-                        _asyncio.set_event_loop(None)
-                        th_loop.close()
-                ok = await loop.run_in_executor(None, _sync_set_manual)
-                if not ok:
-                    return False
-            else:
-                _LOGGER.debug("Setting override temperature to %s and enabling override", temperature)
-                # Auto mode - set override temperature
-                def _sync_set_override_temp():
-                    import asyncio as _asyncio
-                    th_loop = _asyncio.new_event_loop()
-                    try:
-                        _asyncio.set_event_loop(th_loop)
-                        setter = WaveSet(
-                            serial_number=self.serial_number,
-                            access_code=self.access_code,
-                            password=self.password,
-                        )
-                        return setter.post_message(f'{PATH_BASE}manualTempOverride/temperature', temperature)
-                    finally:
-                        try:
-                            th_loop.run_until_complete(th_loop.shutdown_asyncgens())
-                        except Exception:
-                            pass
-                        _asyncio.set_event_loop(None)
-                        th_loop.close()
-                ok = await loop.run_in_executor(None, _sync_set_override_temp)
-                if not ok:
-                    return False
-                # Enable override
-                def _sync_enable_override():
-                    import asyncio as _asyncio
-                    th_loop = _asyncio.new_event_loop()
-                    try:
-                        _asyncio.set_event_loop(th_loop)
-                        setter = WaveSet(
-                            serial_number=self.serial_number,
-                            access_code=self.access_code,
-                            password=self.password,
-                        )
-                        return setter.post_message(f'{PATH_BASE}manualTempOverride/status', ON)
-                    finally:
-                        try:
-                            th_loop.run_until_complete(th_loop.shutdown_asyncgens())
-                        except Exception:
-                            pass
-                        _asyncio.set_event_loop(None)
-                        th_loop.close()
-                ok2 = await loop.run_in_executor(None, _sync_enable_override)
-                if not ok2:
-                    return False
-            
-            return True
-            
+            # Manual mode sets the manual temperature; clock mode sets the
+            # override temperature and enables the override in one session
+            writes = self._changed_writes(temperature_writes(temperature, program_mode), current)
+            _LOGGER.debug("Setting temperature to %s in %s mode", temperature, program_mode)
+            return await self._write(writes)
+
         except Exception as e:
             _LOGGER.error("Failed to set temperature: %s", e)
             return False
-    
+
     async def set_mode(self, mode: str) -> bool:
         """Set thermostat mode."""
         try:
-            loop = asyncio.get_event_loop()
-            
             # Map HA modes to Wave modes
             _LOGGER.debug("Setting mode: %s", mode)
-            if mode == "heat":
-                wave_mode = MANUAL
-            elif mode == "auto":
-                wave_mode = CLOCK
-            elif mode == "off":
+            if mode == "off":
                 # Turn off by setting very low temperature
                 _LOGGER.debug("Setting off via low temperature")
                 await self.set_temperature(5.0)
                 return True
-            else:
+            wave_mode = WAVE_MODES.get(mode)
+            if wave_mode is None:
                 _LOGGER.warning("Unknown mode: %s", mode)
                 return False
-            
-            def _sync_set_mode():
-                import asyncio as _asyncio
-                th_loop = _asyncio.new_event_loop()
-                try:
-                    _asyncio.set_event_loop(th_loop)
-                    setter = WaveSet(
-                        serial_number=self.serial_number,
-                        access_code=self.access_code,
-                        password=self.password,
-                    )
-                    return setter.post_message(f'{PATH_BASE}usermode', wave_mode)
-                finally:
-                    try:
-                        th_loop.run_until_complete(th_loop.shutdown_asyncgens())
-                    except Exception:
-                        pass
-                    _asyncio.set_event_loop(None)
-                    th_loop.close()
-            ok = await loop.run_in_executor(None, _sync_set_mode)
-            if not ok:
-                return False
-            
-            return True
-            
+
+            return await self._write(self._changed_writes({USERMODE: wave_mode}, self.fresh_snapshot()))
+
         except Exception as e:
             _LOGGER.error("Failed to set mode: %s", e)
             return False
-    
+
     async def close(self) -> None:
         """Close the client connection."""
-        # Nothing persistent to close in this implementation
-        self._initialized = False
\ No newline at end of file
+        # Nothing persistent to close in this implementation; a shared I/O
+        # loop belongs to whoever created it
+        self._initialized = False